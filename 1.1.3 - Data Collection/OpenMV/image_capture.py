@@ -12,6 +12,7 @@ License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 import sensor
 import image
 import time
+import os
 
 # Settings
 save_path = "/"                         # Save images to root directory
@@ -22,6 +23,10 @@ countdown_delay = 1000                  # Milliseconds
 width = 96                              # Width of frame (pixels)
 height = 96                             # Height of frame (pixels)
 pixel_format = sensor.RGB565            # sensor.GRAYSCALE or sensor.RGB565
+use_index = False                       # Keep next file number in an index file (fast startup)
+shard_size = 0                          # Images per subfolder (0: no subfolders)
+index_file = "index.txt"                # Holds the next file number
+manifest_file = "manifest.csv"          # One line of metadata per saved image
 
 ####################################################################################################
 # Functions
@@ -54,6 +59,81 @@ def get_filepath():
 
     return filepath
 
+
+def read_index():
+    """
+    Returns the next file number from the index file, or None if there is no index yet
+    """
+    try:
+        with open(save_path + index_file, 'r') as f:
+            return int(f.read())
+    except:
+        return None
+
+
+def scan_next_number():
+    """
+    Returns one more than the highest numbered image in save_path and its numbered shard
+    subfolders (one directory listing per folder), or 0 if there are none
+    """
+    folders = [save_path]
+    for name in os.listdir(save_path):
+        if name.isdigit():
+            folders.append(save_path + name)
+    highest = -1
+    for folder in folders:
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            continue
+        for name in names:
+            stem = name[:-len(file_suffix)]
+            if name.endswith(file_suffix) and stem.isdigit():
+                highest = max(highest, int(stem))
+    return highest + 1
+
+
+def get_indexed_filepath():
+    """
+    Returns the next full path to image file using the index file (one read and one write instead
+    of opening every existing image). Creates a subfolder for each shard_size images.
+    """
+
+    global file_num
+
+    # Read the next number. Without an index, rebuild it by scanning the folders once.
+    num = read_index()
+    if num is None:
+        num = scan_next_number()
+
+    # Reserve this number for the next run
+    file_num = num
+    with open(save_path + index_file, 'w') as f:
+        f.write(str(num + 1))
+
+    # Put images in numbered subfolders
+    folder = save_path
+    if shard_size > 0:
+        folder = save_path + str(num // shard_size) + "/"
+        try:
+            os.mkdir(folder[:-1])
+        except OSError:
+            pass
+
+    return folder + str(num) + file_suffix
+
+
+def record_image(filepath):
+    """
+    Appends path, time, resolution and pixel format of a saved image to the manifest
+    """
+    if pixel_format == sensor.GRAYSCALE:
+        format_name = "GRAYSCALE"
+    else:
+        format_name = "RGB565"
+    with open(save_path + manifest_file, 'a') as f:
+        f.write("{},{},{},{},{}\n".format(filepath, time.time(), width, height, format_name))
+
 ####################################################################################################
 # Main
 
@@ -88,8 +168,13 @@ while(True):
 
             # When countdown hits 0, save image and flash viewfinder black
             if countdown == 0:
-                filepath = get_filepath()
-                img.save(filepath)
+                if use_index:
+                    filepath = get_indexed_filepath()
+                    img.save(filepath)
+                    record_image(filepath)
+                else:
+                    filepath = get_filepath()
+                    img.save(filepath)
                 img.draw_rectangle(0, 0, width, height, color=(0,0,0), fill=True)
                 time.sleep_ms(100)
                 print("Image saved to:", filepath)
@@ -3,7 +3,8 @@
 Raspberry Pi Camera Image Capture
 
 Displays image preview on screen. Counts down and saves image. Restart program 
-to take multiple photos.
+to take multiple photos, or set capture_mode to "burst" to save a series of
+images at target_fps after the countdown.
 
 Author: EdgeImpulse, Inc.
 Date: July 6, 2021
@@ -11,9 +12,19 @@ Updated: August 9, 2023
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 """
 
+import os, sys
 import cv2
-from picamera2 import Picamera2
-import time
+
+# Shared helper modules live in the Utilities folder at the root of this repo
+# (or copy them to the same folder as this program)
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "..", "..", "Utilities"))
+from frame_source import open_camera
+from pacing import FramePacer
+from image_writer import ImageWriter
+from headless import ShutdownFlag
+from capture_index import CaptureIndex
+from frame_shards import ShardWriter
 
 # Settings
 res_width = 96                          # Resolution of camera (width)
@@ -21,15 +32,26 @@ res_height = 96                         # Resolution of camera (height)
 target_fps = 15                         # Target FPS
 rotation = 0                            # Camera rotation (0, 90, 180, or 270)
 cam_format = "RGB888"                   # Color format
+frame_source = None                     # None for Pi Camera, or video/folder/.npy
+realtime_replay = False                 # Pace replayed frames like a camera
 draw_fps = False                        # Draw FPS on screen
 save_path = "./"                        # Save images to current directory
 file_num = 0                            # Starting point for filename
 file_suffix = ".png"                    # Extension for image file
 precountdown = 2                        # Seconds before starting countdown
 countdown = 5                           # Seconds to count down from
+capture_mode = "single"                 # "single" image or "burst" of images
+burst_frames = 100                      # Images per burst (None: until stopped)
+writer_threads = 2                      # Threads saving images in burst mode
+writer_queue_size = 32                  # Images waiting to be saved (then drop)
+capture_index = False                   # Keep index + manifest (fast filenames)
+shard_size = None                       # Images per subfolder (None: no folders)
+capture_format = "image"                # "image" files or raw "shards" (.npy)
+shard_folder = "shards"                 # Folder in save_path for shard files
+frames_per_shard = 1000                 # Frames in each shard file
 
-# Computed settings
-frame_interval = 1.0 / target_fps
+# Keeps the loop at target_fps using absolute deadlines (no drift)
+pacer = FramePacer(target_fps)
 
 # Initial framerate value
 fps = 0
@@ -57,22 +79,95 @@ def get_filepath():
 
     global file_num
 
+    # With an index, the next number is looked up instead of searched for
+    if index is not None:
+        return index.next_path()
+
     # Loop through possible file numbers to see if that file already exists
     filepath = save_path + str(file_num) + file_suffix
     while file_exists(filepath):
         file_num += 1
         filepath = save_path + str(file_num) + file_suffix
 
+    # Reserve this number (in burst mode the file is written later)
+    file_num += 1
+
     return filepath
 
+
+def record_image(filepath):
+    """
+    Adds the image's metadata to the manifest (if we keep an index). In burst
+    mode, the writer threads call this once the file has been written.
+    """
+    if index is not None:
+        index.record(filepath,
+                     width=res_width,
+                     height=res_height,
+                     rotation=rotation,
+                     format=cam_format)
+
+
+def save_image(img):
+    """
+    Appends img to the shard files, or saves it as the next image file (in the
+    background in burst mode). Returns False if the image was dropped.
+    """
+    global shards
+
+    # Raw frames are appended to the current shard (no compression)
+    if capture_format == "shards":
+        if shards is None:
+            shards = ShardWriter(os.path.join(save_path, shard_folder),
+                                 img.shape,
+                                 frames_per_shard)
+        shards.append(img)
+        return True
+
+    # Otherwise save one image file per frame
+    filepath = get_filepath()
+    if writer is not None:
+        return writer.submit(filepath, img)
+    if not cv2.imwrite(filepath, img):
+        print("ERROR: Could not save", filepath)
+        return False
+    print("Image saved to:", filepath)
+    record_image(filepath)
+    return True
+
 ################################################################################
 # Main
 
-# Figure out the name of the output image filename
-filepath = get_filepath()
+# Check the capture mode and format
+if capture_mode not in ("single", "burst"):
+    print("ERROR: capture_mode must be \"single\" or \"burst\"")
+    sys.exit(1)
+if capture_format not in ("image", "shards"):
+    print("ERROR: capture_format must be \"image\" or \"shards\"")
+    sys.exit(1)
+
+# Keep the next file number and a manifest of saved images in save_path
+index = None
+if capture_index:
+    index = CaptureIndex(save_path, file_suffix, shard_size, file_num)
 
-# Interface with camera
-with Picamera2() as camera:
+# In burst mode, image files are saved by background threads so that PNG
+# compression does not slow down capture. Stop early with 'q' or ctrl + c.
+writer = None
+if capture_mode == "burst" and capture_format == "image":
+    writer = ImageWriter(writer_threads,
+                         writer_queue_size,
+                         on_written=record_image)
+
+# Shard files are created when the first frame arrives (to get its shape)
+shards = None
+shutdown = ShutdownFlag()
+images_saved = 0
+
+# Interface with camera (or replay frames from a file if frame_source is set)
+with open_camera(frame_source,
+                 rotation=rotation,
+                 realtime=realtime_replay) as camera:
 
     # Configure camera settings
     config = camera.create_video_configuration(
@@ -85,8 +180,11 @@ with Picamera2() as camera:
     # Initial countdown timestamp
     countdown_timestamp = cv2.getTickCount()
 
+    # Set once the countdown finishes (quitting early saves nothing)
+    captured = False
+
     # Continuously capture frames
-    while True:
+    while not shutdown.is_set():
                                             
         # Get timestamp for calculating actual framerate
         timestamp = cv2.getTickCount()
@@ -111,19 +209,32 @@ with Picamera2() as camera:
         img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
        
         # Each second, decrement countdown
-        if (timestamp - countdown_timestamp) / cv2.getTickFrequency() > 1.0:
+        if countdown > 0 and \
+                (timestamp - countdown_timestamp) / cv2.getTickFrequency() > 1.0:
             countdown_timestamp = cv2.getTickCount()
             countdown -= 1
             
             # When countdown reaches 0, break out of loop to save image
             if countdown <= 0:
                 countdown = 0
-                break
+                if capture_mode == "single":
+                    captured = True
+                    break
                 
+        # Burst mode: hand every frame after the countdown to the writers
+        # (frames dropped because the writers are busy do not count)
+        if capture_mode == "burst" and countdown == 0:
+            if burst_frames is not None and images_saved >= burst_frames:
+                break
+            if save_image(img):
+                images_saved += 1
+
+            # Draw on a copy so the saved image stays clean
+            img = img.copy()
         
-        # Draw countdown on screen
+        # Draw countdown (or number of burst images) on screen
         cv2.putText(img,
-                    str(countdown),
+                    str(countdown if countdown > 0 else images_saved),
                     (int(round(res_width / 2) - 5),
                         int(round(res_height / 2))),
                     cv2.FONT_HERSHEY_PLAIN,
@@ -146,21 +257,28 @@ with Picamera2() as camera:
         frame_time = (cv2.getTickCount() - timestamp) / cv2.getTickFrequency()
         fps = 1 / frame_time
         
-        # Calculate sleep time
-        elapsed = (cv2.getTickCount() - timestamp) / cv2.getTickFrequency()
-        sleep_time = frame_interval - elapsed
-        
         # Quit if 'q' is pressed
-        if cv2.waitKey(max(1, int(sleep_time * 1000))) == ord('q'):
+        if cv2.waitKey(1) == ord('q'):
             break
 
-        # Then sleep the remainder
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        # Then sleep until the next frame is due
+        pacer.wait()
     
-    # Capture image
-    cv2.imwrite(filepath, img)
-    print("Image saved to:", filepath)
+    # Capture image (single mode) or wait for burst images to be written
+    if capture_mode == "single" and captured:
+        save_image(img)
+    if writer is not None:
+        writer.close()
+        print(writer.format_stats())
+    print(pacer.format_stats())
+
+# Close the manifest and shard files
+if index is not None:
+    index.close()
+if shards is not None:
+    shards.close()
+    print("Frames saved to:", shards.shard_path,
+          "(" + str(shards.frames_written) + " frames)")
 
 # Clean up
 cv2.destroyAllWindows()
@@ -15,24 +15,46 @@ Updated: August 9, 2023
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 """
 
+import os, sys
 import cv2
-from picamera2 import Picamera2
+
+# Shared helper modules live in the Utilities folder at the root of this repo
+# (or copy them to the same folder as this program)
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "..", "..", "Utilities"))
+from camera_capture import CameraCapture
+from frame_source import open_camera
+from pacing import FramePacer
+from profiler import StageProfiler
 
 # Settings
 res_width = 320                         # Resolution of camera (width)
 res_height = 320                        # Resolution of camera (height)
 rotation = 0                            # Image rotation (0, 90, 180, or 270)
 cam_format = "RGB888"                   # Color format
+frame_source = None                     # None for Pi Camera, or video/folder/.npy
+realtime_replay = False                 # Pace replayed frames like a camera
 target_fps = 15                         # Target FPS
+profile_stages = False                  # Time each stage, save summary on exit
+profile_file = "profile.json"           # Where to save the timing summary
+
+# Keeps the loop at target_fps using absolute deadlines (no drift)
+pacer = FramePacer(target_fps)
 
-# Computed settings
-frame_interval = 1.0 / target_fps
+# Times each stage of the loop (prints and saves a summary next to this
+# program on exit)
+dir_path = os.path.dirname(os.path.realpath(__file__))
+profiler = StageProfiler(enabled=profile_stages)
+if profile_stages:
+    profiler.dump_on_exit(os.path.join(dir_path, profile_file))
 
 # Initial framerate value
 fps = 0
 
-# Interface with camera
-with Picamera2() as camera:
+# Interface with camera (or replay frames from a file if frame_source is set)
+with open_camera(frame_source,
+                 rotation=rotation,
+                 realtime=realtime_replay) as camera:
 
     # Configure camera settings
     config = camera.create_video_configuration(
@@ -42,14 +64,21 @@ with Picamera2() as camera:
     # Start camera
     camera.start()
 
+    # Grab frames in a background thread (always keeps the newest frame)
+    capture = CameraCapture(camera)
+    capture.start()
+
     # Continuously capture frames
     while True:
                                             
         # Get timestamp for calculating actual framerate
         timestamp = cv2.getTickCount()
+        profiler.begin()
         
         # Get array that represents the image
-        img = camera.capture_array()
+        frame = capture.read()
+        img = frame.img
+        profiler.lap("capture")
         
         # Rotate image
         if rotation == 0:
@@ -64,8 +93,11 @@ with Picamera2() as camera:
             print("ERROR: rotation not supported. Must be 0, 90, 180, or 270.")
             break
 
+        profiler.lap("rotate")
+
         # Fix colors (as OpenCV works in BGR format)
         img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        profiler.lap("color")
         
         # Draw framerate on frame
         cv2.putText(img, 
@@ -75,19 +107,31 @@ with Picamera2() as camera:
                     1,
                     (255, 255, 255))
         
-        # Calculate framerate and sleep time
+        profiler.lap("draw")
+
+        # Show the frame
+        cv2.imshow("Frame", img)
+        profiler.lap("imshow")
+
+        # Calculate framerate
         frame_time = (cv2.getTickCount() - timestamp) / cv2.getTickFrequency()
         fps = 1 / frame_time
-        elapsed = (cv2.getTickCount() - timestamp) / cv2.getTickFrequency()
-        sleep_time = frame_interval - elapsed
 
         # Press 'q' to quit
-        if cv2.waitKey(max(1, int(sleep_time * 1000))) == ord('q'):
+        if cv2.waitKey(1) == ord('q'):
             break
 
-        # Sleep remaining frame time
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-            
+        profiler.lap("waitkey")
+
+        # Sleep until the next frame is due
+        pacer.wait()
+        profiler.lap("sleep")
+
+    # Stop background capture
+    capture.stop()
+
+# Report how steady the framerate was
+print(pacer.format_stats())
+
 # Clean up
 cv2.destroyAllWindows()
@@ -5,35 +5,77 @@ Raspberry Pi Live Image Inference
 Continuously captures image from Raspberry Pi Camera module and perform 
 inference using provided .eim model file. Outputs probabilities in console.
 
+Set pipeline_mode to True to run preprocessing and inference in their own
+threads so that they overlap with capture and display (faster on multi-core
+boards like the Pi 4).
+
+Set backend to "tflite" or "onnx" (and model_file to the exported .tflite or
+.onnx model, with labels.txt next to it) to run the model in this process
+instead of talking to a separate .eim process.
+
+Set int8_input to True with a quantized .tflite model to feed it the camera's
+uint8 pixels through a lookup table (made once from the model's input
+quantization) instead of converting them to floats first.
+
+Set model_server to the socket of a running model server (see
+Utilities/model_server.py) to attach to an already loaded model instead of
+loading it every time this program starts.
+
 Author: EdgeImpulse, Inc.
 Date: June 8, 2021
-Updated: August 9, 2023
+Updated: October 17, 2026
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 """
 
 import os, sys, time
 import cv2
-import numpy as np
-from picamera2 import Picamera2
-from edge_impulse_linux.runner import ImpulseRunner
+
+# Shared helper modules live in the Utilities folder at the root of this repo
+# (or copy them to the same folder as this program)
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "..", "Utilities"))
+from camera_capture import CameraCapture
+from frame_source import open_camera
+from pipeline import Pipeline
+from features import FeatureExtractor
+from profiler import StageProfiler
+from headless import ResultSink, ShutdownFlag
+from inference_backend import open_runner
 
 # Settings
 model_file = "modelfile.eim"            # Trained ML model from Edge Impulse
+backend = "eim"                         # "eim", or "tflite"/"onnx" in-process
+model_server = None                     # Model server socket (None: load here)
+int8_input = False                      # Feed quantized models uint8 pixels
 draw_fps = True                         # Draw FPS on screen
 res_width = 96                          # Resolution of camera (width)
 res_height = 96                         # Resolution of camera (height)
 rotation = 0                            # Camera rotation (0, 90, 180, or 270)
 cam_format = "RGB888"                   # Color format
+frame_source = None                     # None for Pi Camera, or video/folder/.npy
+realtime_replay = False                 # Pace replayed frames like a camera
 img_width = 28                          # Resize width to this for inference
 img_height = 28                         # Resize height to this for inference
+pipeline_mode = False                   # Run stages in parallel threads
+pipeline_queue_size = 2                 # Max frames waiting between stages
+pipeline_drop_policy = "drop_oldest"    # "block", "drop_oldest", "drop_newest"
+profile_stages = False                  # Time each stage, save summary on exit
+profile_file = "profile.json"           # Where to save the timing summary
+headless = False                        # No preview window (results to sink)
+results_file = None                     # JSON Lines results (None: console)
+
+# Make sure rotation is valid before we start
+if rotation not in (0, 90, 180, 270):
+    print("ERROR: rotation not supported. Must be 0, 90, 180, or 270.")
+    sys.exit(1)
 
 # The ImpulseRunner module will attempt to load files relative to its location,
 # so we make it load files relative to this program instead
 dir_path = os.path.dirname(os.path.realpath(__file__))
 model_path = os.path.join(dir_path, model_file)
 
-# Load the model file
-runner = ImpulseRunner(model_path)
+# Load the model file (.eim runner, or .tflite/.onnx model in this process)
+runner = open_runner(model_path, backend, server=model_server, int8=int8_input)
 
 # Initialize model
 try:
@@ -42,6 +84,8 @@ try:
     model_info = runner.init()
     print("Model name:", model_info['project']['name'])
     print("Model owner:", model_info['project']['owner'])
+    if model_server is not None:
+        print(runner.format_attach())
     
 # Exit if we cannot initialize the model
 except Exception as e:
@@ -50,12 +94,142 @@ except Exception as e:
     if (runner):
             runner.stop()
     sys.exit(1)
+
+# Resizes and normalizes images into preallocated buffers (in int8 mode, the
+# lookup table gives the quantized model input straight from the pixels)
+lut = getattr(runner, "pixel_lut", None) if int8_input else None
+extractor = FeatureExtractor(img_width, img_height, lut=lut)
+
+# Times each stage of the loop (prints and saves a summary on exit)
+profiler = StageProfiler(enabled=profile_stages)
+if profile_stages:
+    profiler.dump_on_exit(os.path.join(dir_path, profile_file))
+
+################################################################################
+# Functions
+
+def preprocess(img):
+    """
+    Rotates the camera image, converts it to grayscale and returns it along
+    with the feature list expected by the model
+    """
+
+    profiler.begin()
+
+    # Rotate image
+    if rotation == 90:
+        img = cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
+    elif rotation == 180:
+        img = cv2.rotate(img, cv2.ROTATE_180)
+    elif rotation == 270:
+        img = cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    profiler.lap("rotate")
+
+    # Convert image to grayscale (we also show this image in the preview)
+    img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    profiler.lap("color")
+    
+    # Resize and normalize into a preallocated 1D float32 vector
+    features = extractor.extract(img)
+    
+    # The .eim runner expects features in list format. Convert (or copy for
+    # in-process backends) so the extractor's buffer can be reused right away.
+    if backend == "eim":
+        features = features.tolist()
+    else:
+        features = features.copy()
+    profiler.lap("features")
+
+    return img, features
+
+
+def classify(item):
+    """
+    Performs inference on the features and returns the image with the result
+    (None if inference failed)
+    """
+    img, features = item
+    profiler.begin()
+
+    # Perform inference
+    res = None
+    try:
+        res = runner.classify(features)
+    except Exception as e:
+        print("ERROR: Could not perform inference")
+        print("Exception:", e)
+    profiler.lap("classify")
+
+    return img, res
+
+
+def render(img, res, fps):
+    """
+    Prints the result and draws the prediction and framerate on the preview
+    """
+    profiler.begin()
+
+    # Display predictions and timing data
+    print("Output:", res)
+    
+    # Display prediction on preview
+    if res is not None:
+    
+        # Find label with the highest probability
+        predictions = res['result']['classification']
+        max_label = ""
+        max_val = 0
+        for p in predictions:
+            if predictions[p] > max_val:
+                max_val = predictions[p]
+                max_label = p
+                
+        # Draw predicted label on bottom of preview
+        cv2.putText(img,
+                    max_label,
+                    (0, res_height - 20),
+                    cv2.FONT_HERSHEY_PLAIN,
+                    1,
+                    (255, 255, 255))
+                    
+        # Draw predicted class's confidence score (probability)
+        cv2.putText(img,
+                    str(round(max_val, 2)),
+                    (0, res_height - 2),
+                    cv2.FONT_HERSHEY_PLAIN,
+                    1,
+                    (255, 255, 255))
     
+    # Draw framerate on frame
+    if draw_fps:
+        cv2.putText(img, 
+                    "FPS: " + str(round(fps, 2)), 
+                    (0, 12),
+                    cv2.FONT_HERSHEY_PLAIN,
+                    1,
+                    (255, 255, 255))
+    
+    profiler.lap("draw")
+
+    # Show the frame
+    cv2.imshow("Frame", img)
+    profiler.lap("imshow")
+
+################################################################################
+# Main
+
+# Stop cleanly on ctrl + c or SIGTERM, and write results as JSON Lines when
+# running headless
+shutdown = ShutdownFlag()
+sink = ResultSink(results_file) if headless else None
+
 # Initial framerate value
 fps = 0
 
-# Interface with camera
-with Picamera2() as camera:
+# Interface with camera (or replay frames from a file if frame_source is set)
+with open_camera(frame_source,
+                 rotation=rotation,
+                 realtime=realtime_replay) as camera:
 
     
     # Configure camera settings
@@ -65,99 +239,68 @@ with Picamera2() as camera:
 
     # Start camera
     camera.start()
+
+    # Grab frames in a background thread (always keeps the newest frame)
+    capture = CameraCapture(camera)
+    capture.start()
+
+    # In pipeline mode, capture, preprocessing and inference each run in their
+    # own thread and the main thread only draws the results
+    pipeline = None
+    if pipeline_mode:
+        pipeline = Pipeline(capture.capture_array,
+                            [("preprocess", preprocess),
+                             ("classify", classify)],
+                            queue_size=pipeline_queue_size,
+                            drop_policy=pipeline_drop_policy)
+        pipeline.start()
     
+    # Get timestamp for calculating actual framerate
+    timestamp = cv2.getTickCount()
+
     # Continuously capture frames
-    while True:
-                                            
-        # Get timestamp for calculating actual framerate
-        timestamp = cv2.getTickCount()
-        
-        # Get array that represents the image
-        img = camera.capture_array()
-
-        # Rotate image
-        if rotation == 0:
-            pass
-        elif rotation == 90:
-            img = cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
-        elif rotation == 180:
-            img = cv2.rotate(img, cv2.ROTATE_180)
-        elif rotation == 270:
-            img = cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    while not shutdown.is_set():
+
+        # Get the next result from the pipeline, or run each step in turn
+        if pipeline is not None:
+            img, res = pipeline.get()
         else:
-            print("ERROR: rotation not supported. Must be 0, 90, 180, or 270.")
-            break
+            profiler.begin()
+            frame = capture.read()
+            profiler.lap("capture")
+            img, res = classify(preprocess(frame.img))
 
-        # Convert image to grayscale
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-        
-        # Resize captured image
-        img_resize = cv2.resize(img, (img_width, img_height))
-        
-        # Convert image to 1D vector of floating point numbers
-        features = np.reshape(img_resize, (img_width * img_height)) / 255
-        
-        # Edge Impulse model expects features in list format
-        features = features.tolist()
-        
-        # Perform inference
-        res = None
-        try:
-            res = runner.classify(features)
-        except Exception as e:
-            print("ERROR: Could not perform inference")
-            print("Exception:", e)
-            
-        # Display predictions and timing data
-        print("Output:", res)
-        
-        # Display prediction on preview
-        if res is not None:
-        
-            # Find label with the highest probability
-            predictions = res['result']['classification']
-            max_label = ""
-            max_val = 0
-            for p in predictions:
-                if predictions[p] > max_val:
-                    max_val = predictions[p]
-                    max_label = p
-                    
-            # Draw predicted label on bottom of preview
-            cv2.putText(img,
-                        max_label,
-                        (0, res_height - 20),
-                        cv2.FONT_HERSHEY_PLAIN,
-                        1,
-                        (255, 255, 255))
-                        
-            # Draw predicted class's confidence score (probability)
-            cv2.putText(img,
-                        str(round(max_val, 2)),
-                        (0, res_height - 2),
-                        cv2.FONT_HERSHEY_PLAIN,
-                        1,
-                        (255, 255, 255))
-        
-        # Draw framerate on frame
-        if draw_fps:
-            cv2.putText(img, 
-                        "FPS: " + str(round(fps, 2)), 
-                        (0, 12),
-                        cv2.FONT_HERSHEY_PLAIN,
-                        1,
-                        (255, 255, 255))
-        
-        # Show the frame
-        cv2.imshow("Frame", img)
+        # Save the result (headless) or draw it on the preview window (laps
+        # from here on are timed in this thread, also in pipeline mode)
+        profiler.begin()
+        if headless:
+            if res is not None:
+                sink.write({"fps": fps,
+                            "classification": res['result']['classification'],
+                            "timing": res['timing']})
+        else:
+            render(img, res, fps)
         
         # Calculate framrate
         frame_time = (cv2.getTickCount() - timestamp) / cv2.getTickFrequency()
+        timestamp = cv2.getTickCount()
         fps = 1 / frame_time
         
         # Press 'q' to quit
-        if cv2.waitKey(1) == ord('q'):
+        if not headless and cv2.waitKey(1) == ord('q'):
             break
-            
+        profiler.lap("waitkey")
+
+    # Stop pipeline and print how busy each stage was
+    if pipeline is not None:
+        pipeline.stop()
+        print(pipeline.format_stats())
+
+    # Stop background capture
+    capture.stop()
+
 # Clean up
-cv2.destroyAllWindows()
\ No newline at end of file
+if sink is not None:
+    sink.close()
+else:
+    cv2.destroyAllWindows()
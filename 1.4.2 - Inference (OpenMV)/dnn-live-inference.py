@@ -9,7 +9,7 @@ Date: June 8, 2021
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 """
 
-import sensor, image, time, tf
+import sensor, image, time, tf, gc
 
 # Settings
 model_file = "trained.tflite"           # Location of TFLite model file
@@ -17,6 +17,8 @@ labels_file = "labels.txt"              # Location of labels file
 width = 48                              # Width of frame (pixels)
 height = 48                             # Height of frame (pixels)
 pixel_format = sensor.GRAYSCALE         # This model only supports grayscale
+load_model_once = True                  # Keep model in RAM (False: read model file every frame)
+fast_copy = True                        # Copy pixel buffer in one go (False: pixel by pixel)
 
 # Configure camera
 sensor.reset()
@@ -28,12 +30,22 @@ sensor.skip_frames(time = 2000)         # Let the camera adjust
 # Extract labels from labels file
 labels = [line.rstrip('\n').rstrip('\r') for line in open(labels_file)]
 
+# Load the model into RAM once, instead of reading and parsing the file on every call
+if load_model_once:
+    net = tf.load(model_file, load_to_fb=False)
+else:
+    net = model_file
+
 # Start clock (for measureing FPS)
 clock = time.clock()
 
 # Create blank image (OpenMV tf library expects image object as input)
 img_flat = image.Image((width * height), 1, sensor.GRAYSCALE)
 
+# The flat image's pixel memory. A grayscale image is stored row by row, one byte per pixel, so
+# a 48x48 image and a 2304x1 image hold exactly the same bytes in the same order.
+flat_buf = img_flat.bytearray()
+
 # Main while loop
 inference_count = 0
 while(True):
@@ -44,13 +56,17 @@ while(True):
     # Get image from camera
     img = sensor.snapshot()
 
-    # Fill flat image buffer with our image data
-    for y in range(height):
-        for x in range(width):
-            img_flat.set_pixel((y * width) + x, 0, img.get_pixel(x, y))
+    # Fill flat image buffer with our image data. Copying the whole buffer is a single memory
+    # copy instead of width * height calls to get_pixel() and set_pixel().
+    if fast_copy:
+        flat_buf[:] = img.bytearray()
+    else:
+        for y in range(height):
+            for x in range(width):
+                img_flat.set_pixel((y * width) + x, 0, img.get_pixel(x, y))
 
     # Do inference. OpenMV tf classify returns a list of prediction objects.
-    objs = tf.classify(model_file, img_flat)
+    objs = tf.classify(net, img_flat)
 
     # We should only get one item in the predictions list, so we extract the
     # output probabilities from that.
@@ -72,6 +88,7 @@ while(True):
         print("-----")
         for i, label in enumerate(labels):
             print(str(label) + ": " + str(predictions[i]))
+        print("Heap used:", gc.mem_alloc())
 
     # Uncomment this if you want to see FPS measurement
     #print(clock.fps())
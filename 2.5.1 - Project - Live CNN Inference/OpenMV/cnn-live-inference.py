@@ -9,7 +9,7 @@ Date: June 24, 2021
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 """
 
-import sensor, image, time, tf
+import sensor, image, time, tf, gc
 
 # Settings
 model_file = "trained.tflite"           # Location of TFLite model file
@@ -17,6 +17,7 @@ labels_file = "labels.txt"              # Location of labels file
 width = 48                              # Width of frame (pixels)
 height = 48                             # Height of frame (pixels)
 pixel_format = sensor.GRAYSCALE         # This model only supports grayscale
+load_model_once = True                  # Keep model in RAM (False: read model file every frame)
 
 # Configure camera
 sensor.reset()
@@ -28,6 +29,12 @@ sensor.skip_frames(time = 2000)         # Let the camera adjust
 # Extract labels from labels file
 labels = [line.rstrip('\n').rstrip('\r') for line in open(labels_file)]
 
+# Load the model into RAM once, instead of reading and parsing the file on every call
+if load_model_once:
+    net = tf.load(model_file, load_to_fb=False)
+else:
+    net = model_file
+
 # Start clock (for measureing FPS)
 clock = time.clock()
 
@@ -42,7 +49,7 @@ while(True):
     img = sensor.snapshot()
 
     # Do inference. OpenMV tf classify returns a list of prediction objects.
-    objs = tf.classify(model_file, img)
+    objs = tf.classify(net, img)
 
     # We should only get one item in the predictions list, so we extract the
     # output probabilities from that.
@@ -64,6 +71,7 @@ while(True):
         print("-----")
         for i, label in enumerate(labels):
             print(str(label) + ": " + str(predictions[i]))
+        print("Heap used:", gc.mem_alloc())
 
         # Uncomment this if you want to see FPS measurement
         print("FPS:", clock.fps())
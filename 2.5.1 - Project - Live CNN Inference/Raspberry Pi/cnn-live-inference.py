@@ -6,37 +6,82 @@ Detects objects in continuous stream of images from Pi Camera. Use Edge Impulse
 Runner and downloaded .eim model file to perform inference. Bounding box info is
 drawn on top of detected objects along with framerate (FPS) in top-left corner.
 
+Set pipeline_mode to True to run feature extraction and inference in their own
+threads so that they overlap with capture and display (faster on multi-core
+boards like the Pi 4).
+
+Set backend to "tflite" or "onnx" (and model_file to the exported .tflite or
+.onnx model, with labels.txt next to it) to run the model in this process
+instead of talking to a separate .eim process.
+
+Set int8_input to True with a quantized .tflite model to feed it the camera's
+uint8 pixels through a lookup table (made once from the model's input
+quantization) instead of converting them to floats first.
+
+Set model_server to the socket of a running model server (see
+Utilities/model_server.py) to attach to an already loaded model instead of
+loading it every time this program starts.
+
 Author: EdgeImpulse, Inc.
 Date: August 3, 2021
-Updated: August 9, 2023
+Updated: October 17, 2026
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 """
 
 import os, sys, time
 import cv2
-from picamera2 import Picamera2
-from edge_impulse_linux.image import ImageImpulseRunner
+
+# Shared helper modules live in the Utilities folder at the root of this repo
+# (or copy them to the same folder as this program)
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "..", "..", "Utilities"))
+from camera_capture import CameraCapture
+from frame_source import open_camera
+from pipeline import Pipeline
+from profiler import StageProfiler
+from headless import ResultSink, ShutdownFlag
+from inference_backend import open_runner
 
 # Settings
 model_file = "modelfile.eim"             # Trained ML model from Edge Impulse
+backend = "eim"                         # "eim", or "tflite"/"onnx" in-process
+model_server = None                     # Model server socket (None: load here)
+int8_input = False                      # Feed quantized models uint8 pixels
 res_width = 96                          # Resolution of camera (width)
 res_height = 96                         # Resolution of camera (height)
 rotation = 0                            # Camera rotation (0, 90, 180, or 270)
 cam_format = "RGB888"                   # Color format
+frame_source = None                     # None for Pi Camera, or video/folder/.npy
+realtime_replay = False                 # Pace replayed frames like a camera
+pipeline_mode = False                   # Run stages in parallel threads
+pipeline_queue_size = 2                 # Max frames waiting between stages
+pipeline_drop_policy = "drop_oldest"    # "block", "drop_oldest", "drop_newest"
+profile_stages = False                  # Time each stage, save summary on exit
+profile_file = "profile.json"           # Where to save the timing summary
+headless = False                        # No preview window (results to sink)
+results_file = None                     # JSON Lines results (None: console)
+
+# Make sure rotation is valid before we start
+if rotation not in (0, 90, 180, 270):
+    print("ERROR: rotation not supported. Must be 0, 90, 180, or 270.")
+    sys.exit(1)
 
 # The ImpulseRunner module will attempt to load files relative to its location,
 # so we make it load files relative to this program instead
 dir_path = os.path.dirname(os.path.realpath(__file__))
 model_path = os.path.join(dir_path, model_file)
 
-# Load the model file
-runner = ImageImpulseRunner(model_path)
+# Load the model file (.eim runner, or .tflite/.onnx model in this process)
+runner = open_runner(model_path, backend, image=True,
+                     server=model_server, int8=int8_input)
 
 # Initialize model (and print information if it loads)
 try:
     model_info = runner.init()
     print("Model name:", model_info['project']['name'])
     print("Model owner:", model_info['project']['owner'])
+    if model_server is not None:
+        print(runner.format_attach())
     
 # Exit if we cannot initialize the model
 except Exception as e:
@@ -46,11 +91,118 @@ except Exception as e:
             runner.stop()
     sys.exit(1)
 
+# Times each stage of the loop (prints and saves a summary on exit)
+profiler = StageProfiler(enabled=profile_stages)
+if profile_stages:
+    profiler.dump_on_exit(os.path.join(dir_path, profile_file))
+
+################################################################################
+# Functions
+
+def preprocess(img):
+    """
+    Rotates the camera image (RGB) and returns it along with the features
+    extracted by the runner
+    """
+
+    profiler.begin()
+
+    # Rotate image
+    if rotation == 90:
+        img = cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
+    elif rotation == 180:
+        img = cv2.rotate(img, cv2.ROTATE_180)
+    elif rotation == 270:
+        img = cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    profiler.lap("rotate")
+    
+    # Extract features (e.g. grayscale image as a 2D array)
+    features, cropped = runner.get_features_from_image(img)
+    profiler.lap("features")
+
+    return img, features
+
+
+def classify(item):
+    """
+    Performs inference on the features and returns the image with the result
+    (None if inference failed)
+    """
+    img, features = item
+    profiler.begin()
+
+    # Perform inference
+    res = None
+    try:
+        res = runner.classify(features)
+    except Exception as e:
+        print("ERROR: Could not perform inference")
+        print("Exception:", e)
+    profiler.lap("classify")
+
+    return img, res
+
+
+def render(img, res, fps):
+    """
+    Prints the predictions and draws the top label on the preview
+    """
+    profiler.begin()
+    if res is None:
+        return
+        
+    # Display predictions and timing data
+    print("-----")
+    results = res['result']['classification']
+    for label in results:
+        prob = results[label]
+        print(label + ": " + str(round(prob, 3)))
+    print("FPS: " + str(round(fps, 3)))
+    
+    # Find label with the highest probability
+    max_label = max(results, key=results.get)
+
+    # For viewing, convert image to grayscale
+    img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    profiler.lap("color")
+    
+    # Draw max label on preview window
+    cv2.putText(img,
+                max_label,
+                (0, 12),
+                cv2.FONT_HERSHEY_PLAIN,
+                1,
+                (255, 255, 255))
+                
+    # Draw max probability on preview window
+    cv2.putText(img,
+                str(round(results[max_label], 2)),
+                (0, 24),
+                cv2.FONT_HERSHEY_PLAIN,
+                1,
+                (255, 255, 255))
+    
+    profiler.lap("draw")
+
+    # Show the frame
+    cv2.imshow("Frame", img)
+    profiler.lap("imshow")
+
+################################################################################
+# Main
+
+# Stop cleanly on ctrl + c or SIGTERM, and write results as JSON Lines when
+# running headless
+shutdown = ShutdownFlag()
+sink = ResultSink(results_file) if headless else None
+
 # Initial framerate value
 fps = 0
 
-# Interface with camera
-with Picamera2() as camera:
+# Interface with camera (or replay frames from a file if frame_source is set)
+with open_camera(frame_source,
+                 rotation=rotation,
+                 realtime=realtime_replay) as camera:
 
     
     # Configure camera settings
@@ -60,80 +212,66 @@ with Picamera2() as camera:
 
     # Start camera
     camera.start()
+
+    # Grab frames in a background thread (always keeps the newest frame)
+    capture = CameraCapture(camera)
+    capture.start()
+
+    # In pipeline mode, capture, feature extraction and inference each run in
+    # their own thread and the main thread only draws the results
+    pipeline = None
+    if pipeline_mode:
+        pipeline = Pipeline(capture.capture_array,
+                            [("preprocess", preprocess),
+                             ("classify", classify)],
+                            queue_size=pipeline_queue_size,
+                            drop_policy=pipeline_drop_policy)
+        pipeline.start()
     
+    # Get timestamp for calculating actual framerate
+    timestamp = cv2.getTickCount()
+
     # Continuously capture frames
-    while True:
-                                            
-        # Get timestamp for calculating actual framerate
-        timestamp = cv2.getTickCount()
-        
-        # Get array that represents the image (in RGB format)
-        img = camera.capture_array()
-
-        # Rotate image
-        if rotation == 0:
-            pass
-        elif rotation == 90:
-            img = cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
-        elif rotation == 180:
-            img = cv2.rotate(img, cv2.ROTATE_180)
-        elif rotation == 270:
-            img = cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    while not shutdown.is_set():
+
+        # Get the next result from the pipeline, or run each step in turn
+        if pipeline is not None:
+            img, res = pipeline.get()
         else:
-            print("ERROR: rotation not supported. Must be 0, 90, 180, or 270.")
-            break
-        
-        # Extract features (e.g. grayscale image as a 2D array)
-        features, cropped = runner.get_features_from_image(img)
-        
-        # Perform inference
-        res = None
-        try:
-            res = runner.classify(features)
-        except Exception as e:
-            print("ERROR: Could not perform inference")
-            print("Exception:", e)
-            
-        # Display predictions and timing data
-        print("-----")
-        results = res['result']['classification']
-        for label in results:
-            prob = results[label]
-            print(label + ": " + str(round(prob, 3)))
-        print("FPS: " + str(round(fps, 3)))
-        
-        # Find label with the highest probability
-        max_label = max(results, key=results.get)
+            profiler.begin()
+            frame = capture.read()
+            profiler.lap("capture")
+            img, res = classify(preprocess(frame.img))
 
-        # For viewing, convert image to grayscale
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-        
-        # Draw max label on preview window
-        cv2.putText(img,
-                    max_label,
-                    (0, 12),
-                    cv2.FONT_HERSHEY_PLAIN,
-                    1,
-                    (255, 255, 255))
-                    
-        # Draw max probability on preview window
-        cv2.putText(img,
-                    str(round(results[max_label], 2)),
-                    (0, 24),
-                    cv2.FONT_HERSHEY_PLAIN,
-                    1,
-                    (255, 255, 255))
-        
-        # Show the frame
-        cv2.imshow("Frame", img)
+        # Save the result (headless) or draw it on the preview window
+        if headless:
+            if res is not None:
+                sink.write({"fps": fps,
+                            "classification": res['result']['classification'],
+                            "timing": res['timing']})
+        else:
+            render(img, res, fps)
         
         # Calculate framrate
         frame_time = (cv2.getTickCount() - timestamp) / cv2.getTickFrequency()
+        timestamp = cv2.getTickCount()
         fps = 1 / frame_time
         
         # Press 'q' to quit
-        if cv2.waitKey(1) == ord('q'):
+        if not headless and cv2.waitKey(1) == ord('q'):
             break
+        profiler.lap("waitkey")
+
+    # Stop pipeline and print how busy each stage was
+    if pipeline is not None:
+        pipeline.stop()
+        print(pipeline.format_stats())
+
+    # Stop background capture
+    capture.stop()
         
 # Clean up
-cv2.destroyAllWindows()
\ No newline at end of file
+if sink is not None:
+    sink.close()
+else:
+    cv2.destroyAllWindows()
@@ -8,7 +8,7 @@ Date: August 4, 2021
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 """
 
-import sensor, image, time, tf, math
+import sensor, image, time, tf, math, gc
 
 # Settings
 model_file = "trained.tflite"           # Location of TFLite model file
@@ -21,6 +21,39 @@ window_width = 48                       # Window width (input to CNN)
 window_height = 48                      # Window height (input to CNN)
 stride = 24                             # How many pixels to move window each step
 pixel_format = sensor.GRAYSCALE         # This model only supports grayscale
+use_nms = False                         # Keep only the best of overlapping boxes
+nms_iou_threshold = 0.3                 # Boxes overlapping more than this merge
+load_model_once = True                  # Keep model in RAM (False: read model file for every window)
+classify_in_place = True                # Classify windows with roi= (False: copy each window)
+
+####################################################################################################
+# Functions
+
+def iou(a, b):
+    """
+    Returns the intersection over union of two (x, y, w, h, ...) boxes
+    """
+    x0 = max(a[0], b[0])
+    y0 = max(a[1], b[1])
+    x1 = min(a[0] + a[2], b[0] + b[2])
+    y1 = min(a[1] + a[3], b[1] + b[3])
+    intersection = max(0, x1 - x0) * max(0, y1 - y0)
+    union = a[2] * a[3] + b[2] * b[3] - intersection
+    return intersection / union if union > 0 else 0
+
+
+def non_max_suppression(bboxes, iou_threshold):
+    """
+    Returns the boxes that are not overlapped (IoU > iou_threshold) by a more probable box
+    """
+    kept = []
+    for bb in sorted(bboxes, key=lambda b: b[4], reverse=True):
+        if all(iou(bb, k) <= iou_threshold for k in kept):
+            kept.append(bb)
+    return kept
+
+####################################################################################################
+# Main
 
 # Configure camera
 sensor.reset()
@@ -39,6 +72,15 @@ num_vertical_windows = math.floor((height - window_height) / stride) + 1
 # Find the index of the target label
 target_idx = labels.index(target_label)
 
+# Load the model into RAM once, instead of reading and parsing the file on every call
+if load_model_once:
+    net = tf.load(model_file, load_to_fb=False)
+else:
+    net = model_file
+
+# Highest heap use seen so far (sampled once per frame)
+heap_peak = 0
+
 # Start clock (for measureing FPS)
 clock = time.clock()
 
@@ -62,13 +104,16 @@ while(True):
     for vertical_window in range(num_vertical_windows):
         for horizontal_window in range(num_horizontal_windows):
 
-            # Crop out image under window
+            # Do inference on the image under the window. With roi=, the window is read straight from
+            # the frame, otherwise it is first copied into a new image (which uses heap memory).
+            # OpenMV tf classify returns a list of prediction objects.
             x = horizontal_window * stride
             y = vertical_window * stride
-            window_img = img.copy(roi=(x, y, window_width, window_height))
-
-            # Do inference. OpenMV tf classify returns a list of prediction objects.
-            objs = tf.classify(model_file, window_img)
+            if classify_in_place:
+                objs = tf.classify(net, img, roi=(x, y, window_width, window_height))
+            else:
+                window_img = img.copy(roi=(x, y, window_width, window_height))
+                objs = tf.classify(net, window_img)
 
             # We should only get one item in the predictions list, so we extract the
             # output probabilities from that.
@@ -78,6 +123,10 @@ while(True):
             if predictions[target_idx] >= target_threshold:
                 bboxes.append((x, y, window_width, window_height, predictions[target_idx]))
 
+    # Remove overlapping boxes around the same object
+    if use_nms:
+        bboxes = non_max_suppression(bboxes, nms_iou_threshold)
+
     # Draw bounding boxes on preview image
     for bb in bboxes:
         img.draw_rectangle((bb[0], bb[1], bb[2], bb[3]))
@@ -89,3 +138,8 @@ while(True):
         print(" " + "x:" + str(bb[0]) + " y:" + str(bb[1]) + " w:" + str(bb[2]) +
                 " h:" + str(bb[3]) + " prob:" + str(bb[4]))
     print("FPS:", clock.fps())
+
+    # Print heap use (bytes) to see how much memory the loop churns through
+    heap_used = gc.mem_alloc()
+    heap_peak = max(heap_peak, heap_used)
+    print("Heap used:", heap_used, "peak:", heap_peak)
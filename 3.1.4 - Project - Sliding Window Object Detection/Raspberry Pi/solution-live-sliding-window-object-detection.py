@@ -5,6 +5,18 @@ Pi Camera Sliding Window Object Detection
 Continuously captures images and performs inference on a sliding window to 
 detect objects.
 
+Set backend to "tflite" or "onnx" (and model_file to the exported .tflite or
+.onnx model, with labels.txt next to it) to run the model in this process
+instead of talking to a separate .eim process.
+
+Set int8_input to True with a quantized .tflite model to feed it the camera's
+uint8 pixels through a lookup table (made once from the model's input
+quantization) instead of converting them to floats first.
+
+Set model_server to the socket of a running model server (see
+Utilities/model_server.py) to attach to an already loaded model instead of
+loading it every time this program starts.
+
 Author: EdgeImpulse, Inc.
 Date: August 5, 2021
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
@@ -12,28 +24,64 @@ License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 
 import os, sys, time, math
 import cv2
-from picamera2 import Picamera2
-from edge_impulse_linux.image import ImageImpulseRunner
+
+# Shared helper modules live in the Utilities folder at the root of this repo
+# (or copy them to the same folder as this program)
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "..", "..", "Utilities"))
+from camera_capture import CameraCapture
+from frame_source import open_camera
+from sliding_window import BatchedWindowClassifier, CoarseToFineScanner
+from runner_pool import RunnerPool
+from nms import non_max_suppression, weighted_box_fusion
+from pyramid import PyramidScanner
+from window_cache import WindowScoreCache
+from profiler import StageProfiler
+from headless import ResultSink, ShutdownFlag
+from inference_backend import open_runner
 
 # Settings
 model_file = "modelfile.eim"            # Trained ML model from Edge Impulse
+backend = "eim"                         # "eim", or "tflite"/"onnx" in-process
+model_server = None                     # Model server socket (None: load here)
+int8_input = False                      # Feed quantized models uint8 pixels
 target_label = "dog"                    # Which label we're looking for
 target_threshold = 0.6                  # Draw box if output prob. >= this value
 cam_width = 320                         # Width of frame (pixels)
 cam_height = 240                        # Height of frame (pixels)
 rotation = 0                            # Camera rotation (0, 90, 180, or 270)
 cam_format = "RGB888"                   # Color format
+frame_source = None                     # None for Pi Camera, or video/folder/.npy
+realtime_replay = False                 # Pace replayed frames like a camera
 window_width = 96                       # Window width (input to CNN)
 window_height = 96                      # Window height (input to CNN)
 stride = 24                             # How many pixels to move the window
+batched_windows = False                 # Extract all window features at once
+num_runners = 1                         # >1 classifies windows on many cores
+                                        # (batched mode only)
+box_merge = None                        # None, "nms", or "wbf" (box fusion)
+box_merge_iou = 0.3                     # Boxes overlapping more than this merge
+pyramid_scales = None                   # e.g. [1.0, 0.75, 0.5] for many sizes
+max_windows_per_frame = 36              # Window budget for pyramid mode
+cache_windows = False                   # Reuse scores of unchanged windows
+cache_change_threshold = 4.0            # Mean pixel change that counts as new
+cache_max_age = 30                      # Re-classify at least every N frames
+coarse_to_fine = False                  # Coarse scan, then refine with stride
+coarse_stride = 48                      # Window step for the coarse scan
+interest_threshold = 0.3                # Refine around windows scoring >= this
+profile_stages = False                  # Time each stage, save summary on exit
+profile_file = "profile.json"           # Where to save the timing summary
+headless = False                        # No preview window (results to sink)
+results_file = None                     # JSON Lines results (None: console)
 
 # The ImpulseRunner module will attempt to load files relative to its location,
 # so we make it load files relative to this program instead
 dir_path = os.path.dirname(os.path.realpath(__file__))
 model_path = os.path.join(dir_path, model_file)
 
-# Load the model file
-runner = ImageImpulseRunner(model_path)
+# Load the model file (.eim runner, or .tflite/.onnx model in this process)
+runner = open_runner(model_path, backend, image=True,
+                     server=model_server, int8=int8_input)
 
 # Initialize model (and print information if it loads)
 try:
@@ -41,6 +89,8 @@ try:
     labels = model_info['model_parameters']['labels']
     print("Model name:", model_info['project']['name'])
     print("Model owner:", model_info['project']['owner'])
+    if model_server is not None:
+        print(runner.format_attach())
     print("Labels:", labels)
     
 # Exit if we cannot initialize the model
@@ -51,15 +101,199 @@ except Exception as e:
             runner.stop()
     sys.exit(1)
 
+# Optionally start a pool of runners to classify windows in parallel. The
+# runner above is the first worker, and with a model server every worker is a
+# client of it. The pyramid, coarse-to-fine and cache modes classify one window
+# at a time, so they do not use the pool.
+pool = None
+if num_runners > 1 and (pyramid_scales is not None or coarse_to_fine or
+                        cache_windows):
+    print("WARNING: num_runners is ignored in pyramid, coarse-to-fine and "
+          "cache modes")
+elif num_runners > 1:
+    try:
+        pool = RunnerPool(model_path,
+                          num_runners,
+                          lambda path: open_runner(path, backend,
+                                                   server=model_server,
+                                                   int8=int8_input),
+                          runner=runner)
+    except Exception as e:
+        print("ERROR: Could not start runner pool")
+        print("Exception:", e)
+        runner.stop()
+        sys.exit(1)
+
+# Extracts features for all windows in a single pass over the frame
+windows = BatchedWindowClassifier(pool if pool is not None else runner,
+                                  model_info,
+                                  window_width,
+                                  window_height,
+                                  stride)
+
 # Compute number of window steps
 num_horizontal_windows = math.floor((cam_width - window_width) / stride) + 1
 num_vertical_windows = math.floor((cam_height - window_height) / stride) + 1
 
+################################################################################
+# Functions
+
+def classify_windows(img):
+    """
+    Classifies each window one at a time and returns a list of (x, y, w, h,
+    prob) for every window where the target label's probability meets or
+    exceeds the threshold
+    """
+
+    # Slide window across image and perform inference on each sub-image
+    bboxes = []
+    for vertical_window in range(num_vertical_windows):
+        for horizontal_window in range(num_horizontal_windows):
+
+            # Crop out image under window
+            x = horizontal_window * stride
+            y = vertical_window * stride
+            window_img = img[y:(y + window_height), x:(x + window_width)]
+            
+            # Extract features from image (e.g. convert to grayscale, crop, etc.)
+            features, cropped = runner.get_features_from_image(window_img)
+
+            # Do inference on sub-image (cropped window portion)
+            res = None
+            try:
+                res = runner.classify(features)
+            except Exception as e:
+                print("ERROR: Could not perform inference")
+                print("Exception:", e)
+            
+            # The output probabilities are stored in the results
+            predictions = res['result']['classification']
+            
+            # Remember bounding box location if target inference >= thresh.
+            if predictions[target_label] >= target_threshold:
+                bboxes.append((x, 
+                               y, 
+                               window_width, 
+                               window_height, 
+                               predictions[target_label]))
+
+    return bboxes
+
+
+def classify_window(window_img):
+    """
+    Classifies one window and returns the dictionary of label probabilities
+    """
+    features, cropped = runner.get_features_from_image(window_img)
+    res = runner.classify(features)
+    return res['result']['classification']
+
+
+def classify_windows_cached(img):
+    """
+    Same as classify_windows(), but windows whose pixels have not changed
+    reuse their last prediction instead of being classified again
+    """
+    bboxes = []
+    for vertical_window in range(num_vertical_windows):
+        for horizontal_window in range(num_horizontal_windows):
+            x = horizontal_window * stride
+            y = vertical_window * stride
+            window_img = img[y:(y + window_height), x:(x + window_width)]
+            predictions = cache.classify((x, y), window_img, classify_window)
+            if predictions[target_label] >= target_threshold:
+                bboxes.append((x, 
+                               y, 
+                               window_width, 
+                               window_height, 
+                               predictions[target_label]))
+
+    return bboxes
+
+
+def render(img, bboxes, fps):
+    """
+    Prints the bounding boxes and draws them on the preview
+    """
+    profiler.begin()
+
+    # For viewing, convert image to grayscale
+    img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    profiler.lap("color")
+    
+    # Draw bounding boxes on preview image
+    for bb in bboxes:
+        cv2.rectangle(img, 
+                      pt1=(bb[0], bb[1]), 
+                      pt2=(bb[0] + bb[2], bb[1] + bb[3]),
+                      color=(255, 255, 255))
+    
+    profiler.lap("draw")
+    
+    # Print bounding box locations
+    print("---")
+    print("Boxes:")
+    for bb in bboxes:
+        print(" " + "x:" + str(bb[0]) + " y:" + str(bb[1]) + " w:" + str(bb[2]) +
+                " h:" + str(bb[3]) + " prob:" + str(bb[4]))
+    print("FPS:", round(fps, 2))
+    if cache_windows:
+        print("Cache hits:", cache.hits, "misses:", cache.misses)
+    if refiner is not None:
+        print("Windows evaluated:", refiner.windows_evaluated, "of",
+              refiner.windows_exhaustive)
+    
+    # Show the frame
+    cv2.imshow("Frame", img)
+    profiler.lap("imshow")
+
+################################################################################
+# Main
+
+# Times each stage of the loop (prints and saves a summary on exit)
+profiler = StageProfiler(enabled=profile_stages)
+if profile_stages:
+    profiler.dump_on_exit(os.path.join(dir_path, profile_file))
+
+# Stop cleanly on ctrl + c or SIGTERM, and write results as JSON Lines when
+# running headless
+shutdown = ShutdownFlag()
+sink = ResultSink(results_file) if headless else None
+
+# Remembers the last prediction for each window position
+cache = WindowScoreCache(cache_change_threshold, cache_max_age)
+
+# Scans at a large stride and refines around promising windows
+refiner = None
+if coarse_to_fine:
+    refiner = CoarseToFineScanner(classify_window,
+                                  window_width,
+                                  window_height,
+                                  coarse_stride,
+                                  stride,
+                                  target_label,
+                                  target_threshold,
+                                  interest_threshold)
+
+# Scans several scaled copies of the frame within a fixed window budget
+scanner = None
+if pyramid_scales is not None:
+    scanner = PyramidScanner(classify_window,
+                             pyramid_scales,
+                             window_width,
+                             window_height,
+                             stride,
+                             target_label,
+                             target_threshold,
+                             max_windows=max_windows_per_frame)
+
 # Initial framerate value
 fps = 0
 
-# Interface with camera
-with Picamera2() as camera:
+# Interface with camera (or replay frames from a file if frame_source is set)
+with open_camera(frame_source,
+                 rotation=rotation,
+                 realtime=realtime_replay) as camera:
 
     # Configure camera settings
     config = camera.create_video_configuration(
@@ -69,14 +303,21 @@ with Picamera2() as camera:
     # Start camera
     camera.start()
 
+    # Grab frames in a background thread (always keeps the newest frame)
+    capture = CameraCapture(camera)
+    capture.start()
+
     # Continuously capture frames
-    while True:
+    while not shutdown.is_set():
                                             
         # Get timestamp for calculating actual framerate
         timestamp = cv2.getTickCount()
+        profiler.begin()
         
         # Get array that represents the image (in RGB format)
-        img = camera.capture_array()
+        frame = capture.read()
+        img = frame.img
+        profiler.lap("capture")
 
         # Rotate image
         if rotation == 0:
@@ -91,72 +332,62 @@ with Picamera2() as camera:
             print("ERROR: rotation not supported. Must be 0, 90, 180, or 270.")
             break
         
-        # >>> ENTER YOUR CODE HERE <<<
-        # Loop over all possible windows, crop/copy image under window, 
-        # perform inference on windowed image, compare output to threshould, 
-        # print out info (x, y, w, h) of all bounding boxes that meet or exceed 
-        # that threshold.
-        
+        profiler.lap("rotate")
+
         # Slide window across image and perform inference on each sub-image
-        bboxes = []
-        for vertical_window in range(num_vertical_windows):
-            for horizontal_window in range(num_horizontal_windows):
-
-                # Crop out image under window
-                x = horizontal_window * stride
-                y = vertical_window * stride
-                window_img = img[y:(y + window_height), x:(x + window_width)]
-                
-                # Extract features from image (e.g. convert to grayscale, crop, etc.)
-                features, cropped = runner.get_features_from_image(window_img)
-
-                # Do inference on sub-image (cropped window portion)
-                res = None
-                try:
-                    res = runner.classify(features)
-                except Exception as e:
-                    print("ERROR: Could not perform inference")
-                    print("Exception:", e)
-                
-                # The output probabilities are stored in the results
-                predictions = res['result']['classification']
-                
-                # Remember bounding box location if target inference >= thresh.
-                if predictions[target_label] >= target_threshold:
-                    bboxes.append((x, 
-                                   y, 
-                                   window_width, 
-                                   window_height, 
-                                   predictions[target_label]))
-
-        # For viewing, convert image to grayscale
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-        
-        # Draw bounding boxes on preview image
-        for bb in bboxes:
-            cv2.rectangle(img, 
-                          pt1=(bb[0], bb[1]), 
-                          pt2=(bb[0] + bb[2], bb[1] + bb[3]),
-                          color=(255, 255, 255))
-
-        # Print bounding box locations
-        print("---")
-        print("Boxes:")
-        for bb in bboxes:
-            print(" " + "x:" + str(bb[0]) + " y:" + str(bb[1]) + " w:" + str(bb[2]) +
-                    " h:" + str(bb[3]) + " prob:" + str(bb[4]))
-        print("FPS:", round(fps, 2))
-        
-        # Show the frame
-        cv2.imshow("Frame", img)
+        if scanner is not None:
+            bboxes = scanner.scan(img)
+        elif refiner is not None:
+            bboxes = refiner.scan(img)
+        elif cache_windows:
+            bboxes = classify_windows_cached(img)
+        elif batched_windows or pool is not None:
+            scores = windows.classify(img)
+            bboxes = windows.to_bboxes(scores, target_label, target_threshold)
+        else:
+            bboxes = classify_windows(img)
+
+        profiler.lap("classify")
+
+        # Remove (NMS) or merge (WBF) overlapping boxes around the same object
+        if box_merge == "nms":
+            bboxes = non_max_suppression(bboxes, box_merge_iou)
+        elif box_merge == "wbf":
+            bboxes = weighted_box_fusion(bboxes, box_merge_iou)
+
+        profiler.lap("merge")
+
+        # Save the boxes (headless) or draw them on the preview window
+        if headless:
+            sink.write({"fps": fps,
+                        "label": target_label,
+                        "boxes": [{"x": bb[0],
+                                   "y": bb[1],
+                                   "width": bb[2],
+                                   "height": bb[3],
+                                   "value": bb[4]} for bb in bboxes]})
+        else:
+            render(img, bboxes, fps)
         
         # Calculate framrate
         frame_time = (cv2.getTickCount() - timestamp) / cv2.getTickFrequency()
         fps = 1 / frame_time
         
         # Press 'q' to quit
-        if cv2.waitKey(1) == ord('q'):
+        if not headless and cv2.waitKey(1) == ord('q'):
             break
-        
+        profiler.lap("waitkey")
+
+    # Stop background capture
+    capture.stop()
+
+# Print how busy each runner in the pool was and stop them
+if pool is not None:
+    print(pool.format_utilization())
+    pool.stop()
+
 # Clean up
-cv2.destroyAllWindows()
\ No newline at end of file
+if sink is not None:
+    sink.close()
+else:
+    cv2.destroyAllWindows()
\ No newline at end of file
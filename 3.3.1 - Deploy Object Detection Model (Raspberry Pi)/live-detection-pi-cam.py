@@ -6,6 +6,10 @@ Detects objects in continuous stream of images from Pi Camera. Use Edge Impulse
 Runner and downloaded .eim model file to perform inference. Bounding box info is
 drawn on top of detected objects along with framerate (FPS) in top-left corner.
 
+Set model_server to the socket of a running model server (see
+Utilities/model_server.py) to attach to an already loaded model instead of
+loading it every time this program starts.
+
 Author: EdgeImpulse, Inc.
 Date: July 5, 2021
 License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
@@ -13,29 +17,53 @@ License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
 
 import os, sys, time
 import cv2
-from picamera2 import Picamera2
-from edge_impulse_linux.image import ImageImpulseRunner
+
+# Shared helper modules live in the Utilities folder at the root of this repo
+# (or copy them to the same folder as this program)
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "..", "Utilities"))
+from camera_capture import CameraCapture
+from frame_source import open_camera
+from motion_gate import MotionGate
+from profiler import StageProfiler
+from headless import ResultSink, ShutdownFlag
+from metrics import MetricsRegistry, MetricsServer
+from inference_backend import open_runner
 
 # Settings
 model_file = "modelfile.eim"             # Trained ML model from Edge Impulse
+model_server = None                     # Model server socket (None: load here)
 cam_width = 320                          # Resolution of camera (width)
 cam_height = 320                         # Resolution of camera (height)
 rotation = 0                            # Camera rotation (0, 90, 180, or 270)
 cam_format = "RGB888"                   # Color format
+frame_source = None                     # None for Pi Camera, or video/folder/.npy
+realtime_replay = False                 # Pace replayed frames like a camera
+motion_gating = False                   # Only run detector when scene changes
+motion_threshold = 0.01                 # Fraction of pixels that must change
+keep_alive_interval = 5.0               # Run detector at least every N seconds
+profile_stages = False                  # Time each stage, save summary on exit
+profile_file = "profile.json"           # Where to save the timing summary
+headless = False                        # No preview window (results to sink)
+results_file = None                     # JSON Lines results (None: console)
+metrics_port = None                     # Serve Prometheus metrics (None: off)
+metrics_host = "127.0.0.1"              # "0.0.0.0" to allow remote scraping
 
 # The ImpulseRunner module will attempt to load files relative to its location,
 # so we make it load files relative to this program instead
 dir_path = os.path.dirname(os.path.realpath(__file__))
 model_path = os.path.join(dir_path, model_file)
 
-# Load the model file
-runner = ImageImpulseRunner(model_path)
+# Load the model file (or attach to it on the model server)
+runner = open_runner(model_path, image=True, server=model_server)
 
 # Initialize model (and print information if it loads)
 try:
     model_info = runner.init()
     print("Model name:", model_info['project']['name'])
     print("Model owner:", model_info['project']['owner'])
+    if model_server is not None:
+        print(runner.format_attach())
     
 # Exit if we cannot initialize the model
 except Exception as e:
@@ -45,11 +73,108 @@ except Exception as e:
             runner.stop()
     sys.exit(1)
 
+# Times each stage of the loop (prints and saves a summary on exit)
+profiler = StageProfiler(enabled=profile_stages)
+if profile_stages:
+    profiler.dump_on_exit(os.path.join(dir_path, profile_file))
+
+# Skips inference on frames where nothing moved
+gate = None
+if motion_gating:
+    gate = MotionGate(motion_threshold, keep_alive_interval)
+
+# Counters and latency histograms (served at /metrics if metrics_port is set)
+metrics = MetricsRegistry()
+frames_inferred = metrics.counter("frames_inferred_total",
+                                  "Frames run through the model")
+frames_skipped = metrics.counter("frames_skipped_total",
+                                 "Frames skipped by the motion gate")
+inference_seconds = metrics.histogram("inference_seconds",
+                                      "Time spent in runner.classify()")
+runner_seconds = metrics.histogram("runner_timing_seconds",
+                                   "Runner timing breakdown (res['timing'])",
+                                   ("stage",))
+detections = metrics.counter("detections_total",
+                             "Detected objects",
+                             ("label",))
+fps_gauge = metrics.gauge("fps", "Framerate of the main loop")
+
+################################################################################
+# Functions
+
+def render(img, res, fps):
+    """
+    Prints the result and draws the bounding boxes and framerate on the preview
+    """
+    profiler.begin()
+
+    # Display predictions and timing data
+    print("Output:", res)
+    
+    # For viewing, convert image to BGR (as that's what OpenCV uses)
+    img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+    profiler.lap("color")
+    
+    # Display bounding boxes on preview
+    if res is not None:
+    
+        # Go through each of the returned bounding boxes
+        bboxes = res['result']['bounding_boxes']
+        for bbox in bboxes:
+    
+            # Calculate corners of bounding box so we can draw it
+            b_x0 = bbox['x']
+            b_y0 = bbox['y']
+            b_x1 = bbox['x'] + bbox['width']
+            b_y1 = bbox['y'] + bbox['height']
+    
+            # Draw bounding box over detected object
+            cv2.rectangle(img,
+                            (b_x0, b_y0),
+                            (b_x1, b_y1),
+                            (255, 255, 255),
+                            1)
+    
+            # Draw object and score in bounding box corner
+            cv2.putText(img,
+                        bbox['label'] + ": " + str(round(bbox['value'], 2)),
+                        (b_x0, b_y0 + 12),
+                        cv2.FONT_HERSHEY_PLAIN,
+                        1,
+                        (255, 255, 255))
+    
+    # Draw framerate on frame
+    cv2.putText(img, 
+                "FPS: " + str(round(fps, 2)), 
+                (0, 12),
+                cv2.FONT_HERSHEY_PLAIN,
+                1,
+                (255, 255, 255))
+    
+    profiler.lap("draw")
+    
+    # Show the frame
+    cv2.imshow("Frame", img)
+    profiler.lap("imshow")
+
+################################################################################
+# Main
+
+# Stop cleanly on ctrl + c or SIGTERM, and write results as JSON Lines when
+# running headless
+shutdown = ShutdownFlag()
+sink = ResultSink(results_file) if headless else None
+
 # Initial framerate value
 fps = 0
 
-# Interface with camera
-with Picamera2() as camera:
+# Last inference result (re-used when the motion gate skips a frame)
+res = None
+
+# Interface with camera (or replay frames from a file if frame_source is set)
+with open_camera(frame_source,
+                 rotation=rotation,
+                 realtime=realtime_replay) as camera:
     
     # Configure camera settings
     config = camera.create_video_configuration(
@@ -59,14 +184,33 @@ with Picamera2() as camera:
     # Start camera
     camera.start()
 
+    # Grab frames in a background thread (always keeps the newest frame)
+    capture = CameraCapture(camera)
+    capture.start()
+
+    # Capture counts are kept by the capture thread, read them when scraped
+    metrics.callback_counter("frames_captured_total",
+                             "Frames grabbed from the camera",
+                             lambda: capture.stats()['frames_captured'])
+    metrics.callback_counter("frames_dropped_total",
+                             "Frames overwritten before they were read",
+                             lambda: capture.stats()['frames_dropped'])
+    metrics_server = None
+    if metrics_port is not None:
+        metrics_server = MetricsServer(metrics, metrics_port, metrics_host)
+        metrics_server.start()
+
     # Continuously capture frames
-    while True:
+    while not shutdown.is_set():
                                             
         # Get timestamp for calculating actual framerate
         timestamp = cv2.getTickCount()
+        profiler.begin()
         
         # Get array that represents the image (in RGB format)
-        img = camera.capture_array()
+        frame = capture.read()
+        img = frame.img
+        profiler.lap("capture")
 
         # Rotate image
         if rotation == 0:
@@ -81,67 +225,64 @@ with Picamera2() as camera:
             print("ERROR: rotation not supported. Must be 0, 90, 180, or 270.")
             break
         
-        # Convert image to RGB and extract features (e.g. crop)
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        features, cropped = runner.get_features_from_image(img_rgb)
-        
-        # Perform inference
-        res = None
-        try:
-            res = runner.classify(features)
-        except Exception as e:
-            print("ERROR: Could not perform inference")
-            print("Exception:", e)
+        profiler.lap("rotate")
+
+        # Only run the detector if something moved (or keep-alive expired),
+        # otherwise keep the previous detections
+        if gate is None or gate.update(img):
+
+            # Convert image to RGB and extract features (e.g. crop)
+            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            features, cropped = runner.get_features_from_image(img_rgb)
+            profiler.lap("features")
             
-        # Display predictions and timing data
-        print("Output:", res)
+            # Perform inference
+            res = None
+            start = time.perf_counter()
+            try:
+                res = runner.classify(features)
+            except Exception as e:
+                print("ERROR: Could not perform inference")
+                print("Exception:", e)
+            profiler.lap("classify")
 
-        # For viewing, convert image to BGR (as that's what OpenCV uses)
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        
-        # Go through each of the returned bounding boxes
-        bboxes = res['result']['bounding_boxes']
-        for bbox in bboxes:
-        
-            # Calculate corners of bounding box so we can draw it
-            b_x0 = bbox['x']
-            b_y0 = bbox['y']
-            b_x1 = bbox['x'] + bbox['width']
-            b_y1 = bbox['y'] + bbox['height']
+            # Update metrics (timing from the runner is in milliseconds)
+            if res is not None:
+                inference_seconds.observe(time.perf_counter() - start)
+                frames_inferred.inc()
+                for stage, ms in res['timing'].items():
+                    runner_seconds.observe(ms / 1000, stage=stage)
+                for bbox in res['result']['bounding_boxes']:
+                    detections.inc(label=bbox['label'])
+        else:
+            frames_skipped.inc()
             
-            # Draw bounding box over detected object
-            cv2.rectangle(img,
-                            (b_x0, b_y0),
-                            (b_x1, b_y1),
-                            (255, 255, 255),
-                            1)
-                            
-            # Draw object and score in bounding box corner
-            cv2.putText(img,
-                        bbox['label'] + ": " + str(round(bbox['value'], 2)),
-                        (b_x0, b_y0 + 12),
-                        cv2.FONT_HERSHEY_PLAIN,
-                        1,
-                        (255, 255, 255))
-        
-        # Draw framerate on frame
-        cv2.putText(img, 
-                    "FPS: " + str(round(fps, 2)), 
-                    (0, 12),
-                    cv2.FONT_HERSHEY_PLAIN,
-                    1,
-                    (255, 255, 255))
-        
-        # Show the frame
-        cv2.imshow("Frame", img)
+        # Save the result (headless) or draw it on the preview window
+        if headless:
+            if res is not None:
+                sink.write({"fps": fps,
+                            "bounding_boxes": res['result']['bounding_boxes'],
+                            "timing": res['timing']})
+        else:
+            render(img, res, fps)
         
         # Calculate framrate
         frame_time = (cv2.getTickCount() - timestamp) / cv2.getTickFrequency()
         fps = 1 / frame_time
+        fps_gauge.set(fps)
         
         # Press 'q' to quit
-        if cv2.waitKey(1) == ord('q'):
+        if not headless and cv2.waitKey(1) == ord('q'):
             break
-        
+        profiler.lap("waitkey")
+
+    # Stop metrics server and background capture
+    if metrics_server is not None:
+        metrics_server.stop()
+    capture.stop()
+
 # Clean up
-cv2.destroyAllWindows()
+if sink is not None:
+    sink.close()
+else:
+    cv2.destroyAllWindows()
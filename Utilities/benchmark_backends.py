@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Inference Backend Benchmark
+
+Classifies the same replayed frames with the .eim runner and with the
+in-process TFLite and ONNX backends (see inference_backend.py), and prints the
+median and 90th percentile classify() latency of each. The latency is
+measured around the classify() call, so for the .eim runner it includes the
+JSON encoding, the socket round trip to the model process and the JSON
+decoding. The top-1 label of each in-process backend is compared with the
+.eim runner to check that they give the same answers.
+
+Export the same impulse from Edge Impulse as .eim and as .tflite/.onnx (with
+labels.txt next to it) and set the paths below. Set a path to None to skip
+that backend.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os, time
+import numpy as np
+from frame_source import ReplaySource
+from inference_backend import open_runner
+
+# Settings
+dir_path = os.path.dirname(os.path.realpath(__file__))
+frame_source = os.path.join(dir_path, "..", "Datasets",
+                            "dog-classification-png.zip")
+models = {                              # Backend: model file (None: skip)
+    "eim": "modelfile.eim",
+    "tflite": "trained.tflite",
+    "onnx": None,
+}
+res_width = 320                         # Resolution of replayed frames (width)
+res_height = 320                        # Resolution of replayed frames (height)
+num_frames = 200                        # Frames classified per backend
+warmup_frames = 10                      # Untimed frames before measuring
+
+################################################################################
+# Functions
+
+def benchmark(backend, model_file, frames):
+    """
+    Classifies every frame and returns the classify() latencies (ms) and the
+    top-1 label of each frame
+    """
+    runner = open_runner(os.path.abspath(model_file), backend, image=True)
+    try:
+        model_info = runner.init()
+        print("Model name:", model_info['project']['name'])
+        latencies = []
+        labels = []
+        for i, img in enumerate(frames):
+            features, cropped = runner.get_features_from_image(img)
+            start = time.perf_counter()
+            res = runner.classify(features)
+            latency = (time.perf_counter() - start) * 1000
+            if i < warmup_frames:
+                continue
+            predictions = res['result']['classification']
+            latencies.append(latency)
+            labels.append(max(predictions, key=predictions.get))
+        return np.array(latencies), labels
+    finally:
+        runner.stop()
+
+################################################################################
+# Main
+
+# Read all frames first so decoding is not part of the measurement
+with ReplaySource(frame_source) as camera:
+    camera.configure(camera.create_video_configuration(
+        main={"size": (res_width, res_height), "format": "RGB888"}))
+    camera.start()
+    frames = [camera.capture_array().copy()
+              for _ in range(num_frames + warmup_frames)]
+
+results = {}
+for backend, model_file in models.items():
+    if model_file is None:
+        continue
+    print("---", backend, "---")
+    results[backend] = benchmark(backend, model_file, frames)
+
+print("---")
+print("Backend   median (ms)   p90 (ms)   top-1 agreement with eim")
+for backend, (latencies, labels) in results.items():
+    agreement = "-"
+    if backend != "eim" and "eim" in results:
+        eim_labels = results["eim"][1]
+        matches = sum(a == b for a, b in zip(labels, eim_labels))
+        agreement = "{:.1f}%".format(100 * matches / len(labels))
+    print("{:8s}  {:11.3f}  {:9.3f}   {}".format(backend,
+                                                 np.median(latencies),
+                                                 np.percentile(latencies, 90),
+                                                 agreement))
+if "eim" in results:
+    eim_median = np.median(results["eim"][0])
+    for backend, (latencies, labels) in results.items():
+        if backend != "eim":
+            print("{} speedup over eim: {:.2f}x".format(
+                backend, eim_median / np.median(latencies)))
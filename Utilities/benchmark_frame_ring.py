@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Shared Memory Frame Ring Benchmark
+
+Runs a camera-paced capture loop and an inference step in three ways:
+
+    single process  capture and inference in one loop (what the live programs
+                    do today)
+    queue           capture in its own process, frames sent to the inference
+                    process through a multiprocessing.Queue (pickled)
+    shared memory   capture in its own process, frames written into a
+                    FrameRing (see frame_ring.py) and read as zero-copy views
+
+For each, prints the frames processed per second, the median and 90th
+percentile latency from capture to inference result, the frames skipped, and
+how many bytes of each frame were copied on the way to inference.
+
+The camera is emulated by replaying frames from a dataset at camera_fps (the
+frames are decoded before timing starts). If model_file is set, frames are
+classified with the model; otherwise a small resize/normalize step stands in
+for inference.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os, queue, time
+import multiprocessing as mp
+import cv2
+import numpy as np
+from frame_source import ReplaySource
+from frame_ring import FrameRing
+from inference_backend import open_runner
+from pacing import FramePacer
+
+# Settings
+dir_path = os.path.dirname(os.path.realpath(__file__))
+frame_source = os.path.join(dir_path, "..", "Datasets",
+                            "dog-classification-png.zip")
+model_file = None                       # e.g. "modelfile.eim" (None: no model)
+backend = "eim"                         # "eim", "tflite" or "onnx"
+res_width = 320                         # Resolution of frames (width)
+res_height = 320                        # Resolution of frames (height)
+camera_fps = 30                         # Rate the emulated camera runs at
+num_frames = 300                        # Frames captured per mode
+num_slots = 4                           # Frame ring slots
+queue_size = 2                          # Max frames waiting in the queue
+
+################################################################################
+# Functions
+
+def load_frames(count=30):
+    """
+    Returns count decoded frames to replay
+    """
+    with ReplaySource(frame_source) as camera:
+        camera.configure(camera.create_video_configuration(
+            main={"size": (res_width, res_height), "format": "RGB888"}))
+        camera.start()
+        return [camera.capture_array() for _ in range(count)]
+
+
+def make_classifier():
+    """
+    Returns a function that runs inference on a frame, and the runner (None
+    if there is no model)
+    """
+    if model_file is None:
+        def classify(img):
+            small = cv2.resize(img, (96, 96), interpolation=cv2.INTER_AREA)
+            return float((small.astype(np.float32) * (1.0 / 255)).mean())
+        return classify, None
+    runner = open_runner(os.path.abspath(model_file), backend, image=True)
+    runner.init()
+
+    def classify(img):
+        features, cropped = runner.get_features_from_image(img)
+        return runner.classify(features)
+    return classify, runner
+
+
+def capture(output, done, lock=None):
+    """
+    Runs in the capture process: emulates the camera and hands every frame to
+    the inference process through output (a Queue or a ring name, with the
+    ring's lock)
+    """
+    frames = load_frames()
+    ring = FrameRing.attach(output, lock) if isinstance(output, str) else None
+    pacer = FramePacer(camera_fps)
+    for i in range(num_frames):
+        pacer.wait()
+        img = frames[i % len(frames)]
+        timestamp_ns = time.monotonic_ns()
+        if ring is not None:
+            ring.write(img, timestamp_ns)
+        else:
+            try:
+                output.put_nowait((timestamp_ns, img))
+            except queue.Full:
+                pass
+    done.set()
+    if ring is not None:
+        ring.close()
+
+
+def run_single(classify):
+    """
+    Capture and inference in one loop. Returns the latencies (ms) and the
+    elapsed time (s).
+    """
+    frames = load_frames()
+    pacer = FramePacer(camera_fps)
+    latencies = []
+    start = time.monotonic()
+    i = 0
+    while True:
+
+        # Like a camera, frames that were due while inferring are dropped
+        i += pacer.wait()
+        if i >= num_frames:
+            break
+        img = frames[i % len(frames)]
+        timestamp_ns = time.monotonic_ns()
+        classify(img)
+        latencies.append((time.monotonic_ns() - timestamp_ns) / 1e6)
+        i += 1
+    return latencies, time.monotonic() - start
+
+
+def run_queue(classify):
+    """
+    Capture process sends pickled frames through a Queue
+    """
+    frames = mp.Queue(maxsize=queue_size)
+    done = mp.Event()
+    process = mp.Process(target=capture, args=(frames, done))
+    latencies = []
+    process.start()
+    start = time.monotonic()
+    while True:
+        try:
+            timestamp_ns, img = frames.get(timeout=0.1)
+        except queue.Empty:
+            if done.is_set():
+                break
+            continue
+        classify(img)
+        latencies.append((time.monotonic_ns() - timestamp_ns) / 1e6)
+    elapsed = time.monotonic() - start
+    process.join()
+    return latencies, elapsed
+
+
+def run_ring(classify, torn):
+    """
+    Capture process writes frames into shared memory; inference reads views
+    """
+    with FrameRing.create((res_height, res_width, 3), num_slots) as ring:
+        done = mp.Event()
+        process = mp.Process(target=capture,
+                             args=(ring.name, done, ring.lock))
+        latencies = []
+        process.start()
+        start = time.monotonic()
+        seq = -1
+        while True:
+            frame = ring.wait_newer(seq, timeout=0.1)
+            if frame is None:
+                if done.is_set():
+                    break
+                continue
+            classify(frame.img)
+            latencies.append((time.monotonic_ns() - frame.timestamp_ns) / 1e6)
+            if not ring.still_valid(frame):
+                torn.append(frame.seq)
+            seq = frame.seq
+            del frame
+        elapsed = time.monotonic() - start
+        process.join()
+    return latencies, elapsed
+
+################################################################################
+# Main
+
+if __name__ == "__main__":
+    classify, runner = make_classifier()
+    frame_bytes = res_width * res_height * 3
+    torn = []
+    results = []
+    try:
+        for name, run, copied in (("single process", run_single, 0),
+                                  ("queue", run_queue, 2 * frame_bytes),
+                                  ("shared memory",
+                                   lambda c: run_ring(c, torn),
+                                   frame_bytes)):
+            print("---", name, "---")
+            latencies, elapsed = run(classify)
+            results.append((name, latencies, elapsed, copied))
+    finally:
+        if runner is not None:
+            runner.stop()
+
+    print("---")
+    print("Mode            FPS    median (ms)  p90 (ms)  skipped  "
+          "bytes copied/frame")
+    for name, latencies, elapsed, copied in results:
+        print("{:14s} {:5.1f}  {:11.2f}  {:8.2f}  {:7d}  {:18d}".format(
+            name,
+            len(latencies) / elapsed,
+            np.median(latencies),
+            np.percentile(latencies, 90),
+            num_frames - len(latencies),
+            copied))
+    print("Shared memory frames overwritten while in use:", len(torn))
+    print("(queue copies: pickle in the capture process, unpickle here)")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Headless vs. Display Benchmark
+
+Replays the same frames through a live loop twice: once in display mode
+(drawing text and boxes, cv2.imshow() and cv2.waitKey() every frame) and once
+in headless mode (results written to a JSON Lines sink instead). Prints the
+framerate of each mode and how much headless mode gains.
+
+If model_file is set, every frame is also classified with the .eim model, so
+the numbers match a real live program. Otherwise only the capture and
+rendering costs are measured. Display mode needs a screen (or X forwarding).
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os, time
+import cv2
+from frame_source import ReplaySource
+from headless import ResultSink
+
+# Settings
+frame_source = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            "..", "Datasets", "dog-classification-png.zip")
+model_file = None                       # e.g. "modelfile.eim" (None: no model)
+res_width = 320                         # Resolution of replayed frames (width)
+res_height = 320                        # Resolution of replayed frames (height)
+num_frames = 300                        # Frames per mode
+results_file = os.devnull               # Where headless results go
+
+################################################################################
+# Functions
+
+def classify(runner, img):
+    """
+    Returns the model result for img (or an empty result if there is no model)
+    """
+    if runner is None:
+        return {"result": {"classification": {}}, "timing": {}}
+    features, cropped = runner.get_features_from_image(img)
+    return runner.classify(features)
+
+
+def run(camera, runner, headless, sink):
+    """
+    Runs num_frames through the loop and returns the achieved FPS
+    """
+    fps = 0
+    start = time.perf_counter()
+    for _ in range(num_frames):
+        timestamp = time.perf_counter()
+        img = camera.capture_array()
+        res = classify(runner, img)
+
+        if headless:
+            sink.write({"fps": fps,
+                        "classification": res['result']['classification']})
+        else:
+            img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+            for i, label in enumerate(res['result']['classification']):
+                cv2.putText(img,
+                            label,
+                            (0, 24 + 12 * i),
+                            cv2.FONT_HERSHEY_PLAIN,
+                            1,
+                            (255, 255, 255))
+            cv2.rectangle(img, (10, 10), (res_width - 10, res_height - 10),
+                          (255, 255, 255), 1)
+            cv2.putText(img,
+                        "FPS: " + str(round(fps, 2)),
+                        (0, 12),
+                        cv2.FONT_HERSHEY_PLAIN,
+                        1,
+                        (255, 255, 255))
+            cv2.imshow("Frame", img)
+            cv2.waitKey(1)
+
+        fps = 1 / max(1e-9, time.perf_counter() - timestamp)
+    return num_frames / (time.perf_counter() - start)
+
+################################################################################
+# Main
+
+# Load the model if one was given
+runner = None
+if model_file is not None:
+    from edge_impulse_linux.image import ImageImpulseRunner
+    runner = ImageImpulseRunner(os.path.abspath(model_file))
+    model_info = runner.init()
+    print("Model name:", model_info['project']['name'])
+
+try:
+    with ReplaySource(frame_source) as camera:
+        camera.configure(camera.create_video_configuration(
+            main={"size": (res_width, res_height), "format": "RGB888"}))
+        camera.start()
+
+        # Warm up (decoder, window creation, model)
+        run(camera, runner, True, ResultSink(os.devnull))
+
+        with ResultSink(results_file, flush_every=100) as sink:
+            headless_fps = run(camera, runner, True, sink)
+        display_fps = run(camera, runner, False, None)
+        cv2.destroyAllWindows()
+finally:
+    if runner is not None:
+        runner.stop()
+
+print("Display mode:  {:8.1f} FPS".format(display_fps))
+print("Headless mode: {:8.1f} FPS".format(headless_fps))
+print("Gain:          {:8.1f}%".format(100 * (headless_fps / display_fps - 1)))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Int8 Input Benchmark
+
+Classifies every image of the bundled datasets with the quantized .tflite
+models from the OpenMV projects, once on the float path (pixels converted to
+float features in [0, 1], then quantized again for the model on every call)
+and once in int8 mode (see inference_backend.py: pixels go straight to the
+quantized model input through a lookup table, only the output is
+dequantized).
+
+For each model, prints the median time for feature extraction plus inference,
+the peak memory allocated per image (from tracemalloc), the top-1 agreement
+between the two paths and the accuracy of each against the dataset labels
+(the folder names in the zip file).
+
+Needs tflite-runtime (or tensorflow).
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os, time, tracemalloc, zipfile
+import cv2
+import numpy as np
+from inference_backend import open_runner
+
+# Settings
+dir_path = os.path.dirname(os.path.realpath(__file__))
+tests = [                               # (quantized model, dataset) pairs
+    (os.path.join(dir_path, "..", "2.5.1 - Project - Live CNN Inference",
+                  "OpenMV", "trained.tflite"),
+     os.path.join(dir_path, "..", "Datasets", "dog-classification-png.zip")),
+    (os.path.join(dir_path, "..", "1.4.2 - Inference (OpenMV)",
+                  "trained.tflite"),
+     os.path.join(dir_path, "..", "Datasets",
+                  "electronic-components-png.zip")),
+]
+repeats = 3                             # Timed passes over each dataset
+
+################################################################################
+# Functions
+
+def load_dataset(path):
+    """
+    Returns the (image, label) pairs in a dataset zip file (BGR, like camera
+    frames)
+    """
+    samples = []
+    with zipfile.ZipFile(path) as archive:
+        for name in sorted(archive.namelist()):
+            if name.endswith("/"):
+                continue
+            data = np.frombuffer(archive.read(name), dtype=np.uint8)
+            img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            label = os.path.basename(os.path.dirname(name))
+            samples.append((img, label))
+    return samples
+
+
+def top1(res):
+    """
+    Returns the label with the highest score
+    """
+    predictions = res['result']['classification']
+    return max(predictions, key=predictions.get)
+
+
+def run(runner, samples):
+    """
+    Returns the per-image times (ms), the peak memory allocated for one image
+    (bytes) and the top-1 label of every image
+    """
+    times = []
+    for _ in range(repeats):
+        for img, label in samples:
+            start = time.perf_counter()
+            features, cropped = runner.get_features_from_image(img)
+            runner.classify(features)
+            times.append((time.perf_counter() - start) * 1000)
+
+    # Memory and answers in a separate (untimed) pass
+    peak = 0
+    labels = []
+    for img, label in samples:
+        tracemalloc.start()
+        features, cropped = runner.get_features_from_image(img)
+        res = runner.classify(features)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        labels.append(top1(res))
+    return times, peak, labels
+
+################################################################################
+# Main
+
+for model_file, dataset in tests:
+    samples = load_dataset(dataset)
+    truth = [label for img, label in samples]
+    print("---", os.path.basename(dataset), "---")
+    results = {}
+    for int8 in (False, True):
+        runner = open_runner(model_file, "tflite", int8=int8)
+        try:
+            runner.init()
+            results["int8" if int8 else "float"] = run(runner, samples)
+        finally:
+            runner.stop()
+
+    print("Path    median (ms)  peak memory (bytes)  accuracy")
+    for name, (times, peak, labels) in results.items():
+        accuracy = np.mean([a == b for a, b in zip(labels, truth)])
+        print("{:6s}  {:11.3f}  {:19d}  {:7.1f}%".format(name,
+                                                        np.median(times),
+                                                        peak,
+                                                        100 * accuracy))
+    agreement = np.mean([a == b for a, b in zip(results["float"][2],
+                                                results["int8"][2])])
+    print("Top-1 agreement: {:.1f}% of {} images".format(100 * agreement,
+                                                          len(samples)))
+    print("Speedup: {:.2f}x".format(np.median(results["float"][0]) /
+                                    np.median(results["int8"][0])))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Model Server Startup Benchmark
+
+Measures how long a program waits before it can classify its first frame:
+
+    direct      the program starts the runner itself and loads the model
+                (what the live programs do by default)
+    cold attach first client of a fresh model server, which loads the model
+    warm attach later clients, which attach to the already loaded model
+
+The model server (model_server.py) is started in a separate process for the
+benchmark and stopped at the end. Each attach also classifies one sample, so
+the time includes the first result.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os, subprocess, sys, tempfile, time
+import numpy as np
+from inference_backend import open_runner
+from model_server import ModelClient, backend_for_file
+
+# Settings
+model_file = "modelfile.eim"            # .eim, .tflite or .onnx model
+num_direct = 5                          # Direct starts to time
+num_attaches = 20                       # Warm attaches to time
+
+################################################################################
+# Functions
+
+def first_result(runner):
+    """
+    Initializes the runner, classifies one all-zero sample and returns the
+    time taken in ms
+    """
+    start = time.perf_counter()
+    model_info = runner.init()
+    count = model_info['model_parameters']['input_features_count']
+    runner.classify([0] * count)
+    return (time.perf_counter() - start) * 1000
+
+
+def wait_for_socket(path, timeout=30):
+    """
+    Waits until the model server has created its socket
+    """
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError("Model server did not start")
+        time.sleep(0.01)
+
+################################################################################
+# Main
+
+model_path = os.path.abspath(model_file)
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+# Runner started by the program itself
+direct_ms = []
+for _ in range(num_direct):
+    start = time.perf_counter()
+    runner = open_runner(model_path, backend_for_file(model_path))
+    try:
+        first_result(runner)
+        direct_ms.append((time.perf_counter() - start) * 1000)
+    finally:
+        runner.stop()
+
+# Runner held by a model server
+socket_path = os.path.join(tempfile.mkdtemp(), "model-server.sock")
+server = subprocess.Popen([sys.executable,
+                           os.path.join(dir_path, "model_server.py"),
+                           "--socket",
+                           socket_path])
+try:
+    wait_for_socket(socket_path)
+    client = ModelClient(model_path, socket_path)
+    cold_ms = first_result(client)
+    client.stop()
+    warm_ms = []
+    for _ in range(num_attaches):
+        client = ModelClient(model_path, socket_path)
+        warm_ms.append(first_result(client))
+        client.stop()
+finally:
+    server.terminate()
+    server.wait()
+
+print("---")
+print("Direct start: {:9.1f} ms (median of {})".format(np.median(direct_ms),
+                                                      num_direct))
+print("Cold attach:  {:9.1f} ms".format(cold_ms))
+print("Warm attach:  {:9.1f} ms (median of {})".format(np.median(warm_ms),
+                                                      num_attaches))
+print("Speedup:      {:9.1f}x".format(np.median(direct_ms) /
+                                      np.median(warm_ms)))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+NMS Benchmark
+
+Times non_max_suppression() and weighted_box_fusion() (from nms.py) on random
+sliding-window style boxes. Each test prints the median and worst time per call
+for a given number of candidate boxes.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import time
+import numpy as np
+from nms import non_max_suppression, weighted_box_fusion
+
+# Settings
+frame_width = 320                       # Width of frame (pixels)
+frame_height = 240                      # Height of frame (pixels)
+window_size = 96                        # Width and height of each box
+box_counts = [36, 100, 300, 1000]       # Number of candidate boxes to test
+labels = ["dog", "cat"]                 # Labels to spread boxes across
+iou_threshold = 0.3                     # Overlap threshold
+repeats = 200                           # Timed calls per test
+
+################################################################################
+# Functions
+
+def random_boxes(num_boxes, rng):
+    """
+    Returns num_boxes random (x, y, w, h, prob, label) tuples
+    """
+    xs = rng.integers(0, frame_width - window_size, num_boxes)
+    ys = rng.integers(0, frame_height - window_size, num_boxes)
+    probs = rng.uniform(0.6, 1.0, num_boxes)
+    names = rng.choice(labels, num_boxes)
+    return [(int(x), int(y), window_size, window_size, float(p), str(n))
+            for x, y, p, n in zip(xs, ys, probs, names)]
+
+
+def time_function(func, bboxes):
+    """
+    Returns (median, max) time per call in ms
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        func(bboxes, iou_threshold)
+        times.append((time.perf_counter_ns() - start) / 1e6)
+    return float(np.median(times)), max(times)
+
+################################################################################
+# Main
+
+rng = np.random.default_rng(0)
+print("boxes  function              kept   median ms   max ms")
+for num_boxes in box_counts:
+    bboxes = random_boxes(num_boxes, rng)
+    for name, func in (("non_max_suppression", non_max_suppression),
+                       ("weighted_box_fusion", weighted_box_fusion)):
+        kept = len(func(bboxes, iou_threshold))
+        median_ms, max_ms = time_function(func, bboxes)
+        print("{:5d}  {:<20}  {:5d}   {:9.3f}   {:6.3f}".format(
+            num_boxes, name, kept, median_ms, max_ms))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+OpenMV Image Flattening Benchmark
+
+Runs the OpenMV DNN live inference program with the OpenMV emulator twice:
+once filling the flat (1 x N) input image pixel by pixel with get_pixel() and
+set_pixel(), and once copying the whole pixel buffer in one go
+(fast_copy = True). Prints the median frame time of each, the reduction, and
+the number of emulated calls per frame.
+
+Times are measured on this computer, not on the board, but the saved work
+(2 * width * height Python calls per frame) is the same.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os
+from openmv_emulator import run_script, format_stats
+
+# Settings
+dir_path = os.path.dirname(os.path.realpath(__file__))
+script_path = os.path.join(dir_path, "..", "1.4.2 - Inference (OpenMV)",
+                           "dnn-live-inference.py")
+frame_source = os.path.join(dir_path, "..", "Datasets",
+                            "electronic-components-png.zip")
+num_frames = 200                        # Snapshots per run
+
+################################################################################
+# Main
+
+results = {}
+for fast_copy in (False, True):
+    name = "buffer copy" if fast_copy else "pixel loop"
+    print("---", name, "---")
+    stats = run_script(script_path,
+                       frame_source,
+                       num_frames,
+                       settings={"fast_copy": fast_copy})
+    print(format_stats(stats))
+    results[name] = stats["median_frame_ms"]
+
+print("---")
+print("Pixel loop:  {:8.2f} ms per frame".format(results["pixel loop"]))
+print("Buffer copy: {:8.2f} ms per frame".format(results["buffer copy"]))
+print("Reduction:   {:8.1f}%".format(
+    100 * (1 - results["buffer copy"] / results["pixel loop"])))
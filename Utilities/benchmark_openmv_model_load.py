@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+OpenMV Model Loading Benchmark
+
+Runs the OpenMV sliding window solution with the OpenMV emulator twice:
+
+    original    tf.classify(model_file, ...) reads and parses the model file
+                for every window, and every window is copied into a new image
+    optimized   the model is loaded once with tf.load() and windows are
+                classified in place with roi= (no copies)
+
+Prints the median frame time, model loads, copies and bytes allocated per
+frame, and the peak Python heap use of each run. The CNN model from the live
+CNN inference project is used, since the sliding window folder does not ship
+one.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os
+from openmv_emulator import run_script, format_stats
+
+# Settings
+dir_path = os.path.dirname(os.path.realpath(__file__))
+script_path = os.path.join(dir_path, "..",
+                           "3.1.4 - Project - Sliding Window Object Detection",
+                           "OpenMV",
+                           "solution-live-sliding-window-object-detection.py")
+model_dir = os.path.join(dir_path, "..", "2.5.1 - Project - Live CNN Inference",
+                         "OpenMV")
+frame_source = os.path.join(dir_path, "..", "Datasets",
+                            "dog-classification-png.zip")
+num_frames = 30                         # Snapshots per run
+
+################################################################################
+# Main
+
+sd_files = [os.path.join(model_dir, "trained.tflite"),
+            os.path.join(model_dir, "labels.txt")]
+
+results = {}
+for optimized in (False, True):
+    name = "optimized" if optimized else "original"
+    print("---", name, "---")
+    stats = run_script(script_path,
+                       frame_source,
+                       num_frames,
+                       settings={"load_model_once": optimized,
+                                 "classify_in_place": optimized},
+                       sd_files=sd_files,
+                       trace_memory=True)
+    print(format_stats(stats))
+    results[name] = stats
+
+print("---")
+original = results["original"]["median_frame_ms"]
+optimized = results["optimized"]["median_frame_ms"]
+print("Original:  {:8.2f} ms per frame".format(original))
+print("Optimized: {:8.2f} ms per frame".format(optimized))
+print("Speedup:   {:8.2f}x".format(original / optimized))
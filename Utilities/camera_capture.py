@@ -0,0 +1,185 @@
+"""
+Background Camera Capture
+
+Grabs frames from a camera (e.g. Picamera2) in a background thread so that the
+main loop never waits on the sensor. Only the newest frames are kept in a small
+ring of buffers (3 by default, i.e. triple buffering): if the main loop is busy
+doing inference, older frames are simply overwritten (dropped) and the next
+call to read() returns the freshest frame available.
+
+Each frame comes with a sequence number (increases by 1 for every frame pulled
+from the camera) and a timestamp (time.monotonic_ns() taken right after the
+capture), so you can tell how many frames were skipped and how old a frame is.
+
+Example:
+
+    with Picamera2() as camera:
+        camera.configure(config)
+        camera.start()
+        with CameraCapture(camera) as capture:
+            while True:
+                frame = capture.read()
+                img = frame.img
+
+Copy this file next to your program or add the Utilities folder to sys.path.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+# A captured frame: sequence number, capture time (ns), and image array
+Frame = namedtuple("Frame", ["seq", "timestamp_ns", "img"])
+
+################################################################################
+# Classes
+
+class CameraCapture:
+    """
+    Continuously captures frames in a background thread and keeps the newest
+    ones in a ring of num_buffers slots.
+
+    camera can be any object with a capture_array() method (Picamera2 or one of
+    the frame sources in this folder).
+    """
+
+    def __init__(self, camera, num_buffers=3):
+        if num_buffers < 2:
+            raise ValueError("num_buffers must be at least 2")
+        self.camera = camera
+        self.num_buffers = num_buffers
+
+        # Ring of slots. The newest frame is always at index self._newest.
+        self._slots = [None] * num_buffers
+        self._newest = -1
+
+        # Bookkeeping
+        self._seq = 0
+        self._last_read_seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._error = None
+        self._thread = None
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Start the background grabber thread
+        """
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._grab_loop,
+                                        name="CameraCapture",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """
+        Stop the grabber thread (waits up to timeout seconds for it to exit)
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _grab_loop(self):
+        """
+        Runs in the background thread: pull frames from the camera as fast as
+        it will deliver them and publish each one as the newest frame
+        """
+        while self._running:
+            try:
+                img = self.camera.capture_array()
+            except Exception as e:
+                with self._cond:
+                    self._error = e
+                    self._running = False
+                    self._cond.notify_all()
+                return
+
+            # Stamp the frame as soon as it comes off the sensor
+            timestamp_ns = time.monotonic_ns()
+
+            with self._cond:
+
+                # The previous newest frame is dropped if nobody read it
+                if self._seq > self._last_read_seq:
+                    self.frames_dropped += 1
+
+                # Write into the next slot in the ring and publish it
+                self._seq += 1
+                slot = (self._newest + 1) % self.num_buffers
+                self._slots[slot] = Frame(self._seq, timestamp_ns, img)
+                self._newest = slot
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """
+        Returns the newest frame that has not been returned before. Blocks
+        until a new frame arrives (or timeout seconds pass, in which case None
+        is returned). Re-raises any exception thrown by the camera.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._seq > self._last_read_seq or not self._running,
+                timeout)
+            if self._error is not None:
+                raise self._error
+            if not ready or self._seq <= self._last_read_seq:
+                return None
+            frame = self._slots[self._newest]
+            self._last_read_seq = frame.seq
+            self.frames_read += 1
+            return frame
+
+    def latest(self):
+        """
+        Returns the newest frame without waiting (may be a frame that was
+        already returned, or None if nothing has been captured yet)
+        """
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            if self._newest < 0:
+                return None
+            return self._slots[self._newest]
+
+    def capture_array(self):
+        """
+        Drop-in replacement for camera.capture_array() that returns the newest
+        frame's image
+        """
+        frame = self.read()
+        if frame is None:
+            raise RuntimeError("Camera capture stopped")
+        return frame.img
+
+    def stats(self):
+        """
+        Returns a dictionary of capture statistics
+        """
+        with self._cond:
+            return {
+                "frames_captured": self.frames_captured,
+                "frames_read": self.frames_read,
+                "frames_dropped": self.frames_dropped,
+            }
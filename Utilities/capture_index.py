@@ -0,0 +1,168 @@
+"""
+Capture Session Index
+
+Hands out image filenames for a dataset folder in constant time. The original
+capture programs find a free filename by trying to open 0.png, 1.png, 2.png,
+... until one does not exist, so the Nth image costs N file opens (slow on an
+SD card with thousands of images). CaptureIndex instead keeps the next image
+number in a small index file (index.json) in the folder and appends one line
+of metadata per image to a manifest (manifest.jsonl):
+
+    {"file": "0003/3012.png", "num": 3012, "time": 1760000000.1,
+     "width": 96, "height": 96, "rotation": 0, "format": "RGB888"}
+
+If shard_size is set, images go into numbered subfolders of shard_size images
+each (0000/, 0001/, ...) so that no single folder gets too big. The shard
+size is saved in the index, so a folder keeps its layout between runs.
+
+The first time a folder without an index is used, it is scanned once (one
+directory listing, not one open per file) to find the next free number.
+
+Example:
+
+    index = CaptureIndex("dataset/", ".png", shard_size=1000)
+    path = index.next_path()
+    cv2.imwrite(path, img)
+    index.record(path, width=96, height=96, rotation=0, format="RGB888")
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import json
+import os
+import threading
+import time
+
+# Names of the files kept in the dataset folder
+INDEX_FILE = "index.json"
+MANIFEST_FILE = "manifest.jsonl"
+
+################################################################################
+# Functions
+
+def scan_next_number(save_path, file_suffix):
+    """
+    Returns one more than the highest numbered image (e.g. 41.png) in
+    save_path and its numbered subfolders, or 0 if there are none
+    """
+    highest = -1
+    for root, dirs, files in os.walk(save_path):
+        for name in files:
+            stem, suffix = os.path.splitext(name)
+            if suffix == file_suffix and stem.isdigit():
+                highest = max(highest, int(stem))
+
+        # Only look inside shard folders
+        dirs[:] = [d for d in dirs if d.isdigit()]
+    return highest + 1
+
+################################################################################
+# Classes
+
+class CaptureIndex:
+    """
+    Allocates numbered image paths in save_path in O(1) and keeps a manifest
+    of per-image metadata
+    """
+
+    def __init__(self, save_path, file_suffix, shard_size=None, start_num=0):
+        self.save_path = save_path
+        self.file_suffix = file_suffix
+        self.index_path = os.path.join(save_path, INDEX_FILE)
+        self.manifest_path = os.path.join(save_path, MANIFEST_FILE)
+        os.makedirs(save_path, exist_ok=True)
+
+        # Load the index, or build one by scanning the folder once
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+            self.next_num = index["next_num"]
+            self.shard_size = index.get("shard_size")
+            if shard_size != self.shard_size:
+                print("WARNING: Using shard size", self.shard_size,
+                      "from", self.index_path)
+        else:
+            self.next_num = max(start_num,
+                                scan_next_number(save_path, file_suffix))
+            self.shard_size = shard_size
+            self._save_index()
+
+        self._manifest = open(self.manifest_path, "a")
+        self._manifest_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _save_index(self):
+        """
+        Writes the index file: write a temporary file and flush it to the card,
+        then rename it and flush the folder, so a power cut cannot leave a
+        half-written index
+        """
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"next_num": self.next_num,
+                       "shard_size": self.shard_size,
+                       "file_suffix": self.file_suffix}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+        # The rename is only durable once the folder itself is synced (not
+        # possible on Windows, which cannot open folders)
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(os.path.dirname(os.path.abspath(self.index_path)),
+                         os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _folder(self, num):
+        """
+        Returns the folder for image num, creating shard folders as needed
+        """
+        if self.shard_size is None:
+            return self.save_path
+        folder = os.path.join(self.save_path,
+                              "{:04d}".format(num // self.shard_size))
+        if num % self.shard_size == 0 or not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def next_path(self):
+        """
+        Reserves the next image number and returns its full path
+        """
+        num = self.next_num
+        self.next_num += 1
+        self._save_index()
+        return os.path.join(self._folder(num), str(num) + self.file_suffix)
+
+    def record(self, path, **metadata):
+        """
+        Appends a manifest line for the image at path (e.g. width, height,
+        rotation, format). The number and time are added automatically. Safe
+        to call from several threads (e.g. image writer threads).
+        """
+        num = int(os.path.splitext(os.path.basename(path))[0])
+        entry = {"file": os.path.relpath(path, self.save_path),
+                 "num": num,
+                 "time": time.time()}
+        entry.update(metadata)
+        with self._manifest_lock:
+            self._manifest.write(json.dumps(entry) + "\n")
+            self._manifest.flush()
+
+    def close(self):
+        """
+        Closes the manifest file
+        """
+        if self._manifest is not None:
+            self._manifest.close()
+            self._manifest = None
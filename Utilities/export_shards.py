@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+"""
+Export Shards to Images
+
+Converts frames captured in shard format (capture_format = "shards" in
+pi-cam-capture.py) back into numbered image files, e.g. to upload them to
+Edge Impulse. Set shard_path and output_path below, then run this program.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+from frame_shards import export_png
+
+# Settings
+shard_path = "./shards"                 # Folder with index.json and shard files
+output_path = "./images"                # Folder to save image files in
+file_suffix = ".png"                    # Extension for image files
+start_num = 0                           # Number of the first image file
+
+################################################################################
+# Main
+
+num_images = export_png(shard_path, output_path, file_suffix, start_num)
+print("Exported", num_images, "images to:", output_path)
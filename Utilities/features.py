@@ -0,0 +1,120 @@
+"""
+Preallocated Feature Extraction
+
+Turns camera frames into the normalized float32 feature vector that a DNN
+expects, without allocating new arrays every frame. The grayscale image, the
+resized image and the feature vector all live in buffers that are created once
+and reused. Scaling from [0, 255] to [0, 1] is done with a 256-entry lookup
+table, so each pixel costs one table lookup instead of a float64 division.
+
+Note that the returned feature vector is overwritten by the next call to
+extract(). Copy it (or convert it with .tolist()) before handing it to another
+thread.
+
+Example:
+
+    extractor = FeatureExtractor(28, 28)
+    features = extractor.extract(img)           # float32 array of 784 values
+
+For int8 models, pass a table from make_quantization_lut() (or
+runner.pixel_lut from inference_backend.py) as lut to get the quantized model
+input directly, with no float step.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import cv2
+import numpy as np
+
+################################################################################
+# Functions
+
+def make_normalization_lut(scale=1.0 / 255, offset=0.0, dtype=np.float32):
+    """
+    Returns a 256-entry table that maps each uint8 pixel value to
+    (value * scale) + offset
+    """
+    return (np.arange(256, dtype=np.float64) * scale + offset).astype(dtype)
+
+
+def make_quantization_lut(input_scale, zero_point, dtype=np.int8):
+    """
+    Returns a 256-entry table that maps each uint8 pixel value straight to the
+    quantized input of an int8 (or uint8) model, i.e. the pixel normalized to
+    [0, 1] and then quantized with the model's scale and zero point
+    """
+    info = np.iinfo(dtype)
+    values = np.arange(256, dtype=np.float64) / 255 / input_scale + zero_point
+    return np.clip(np.round(values), info.min, info.max).astype(dtype)
+
+################################################################################
+# Classes
+
+class QuantizedFeatures(np.ndarray):
+    """
+    NumPy array of features that already are a quantized model's input (made
+    with a table from make_quantization_lut()). Runners use these as they are,
+    while plain uint8 arrays are treated as pixels.
+    """
+    pass
+
+
+class FeatureExtractor:
+    """
+    Converts RGB or grayscale uint8 images to a flat float32 feature vector of
+    width * height values (grayscale, resized and normalized with lut)
+    """
+
+    def __init__(self, width, height, lut=None,
+                 color_conversion=cv2.COLOR_RGB2GRAY,
+                 interpolation=cv2.INTER_LINEAR):
+        self.width = width
+        self.height = height
+        self.color_conversion = color_conversion
+        self.interpolation = interpolation
+        self.lut = make_normalization_lut() if lut is None else lut
+
+        # Preallocated buffers (the grayscale buffer is created on first use
+        # since we do not know the camera resolution yet)
+        self.gray = None
+        self.resized = np.empty((height, width), dtype=np.uint8)
+        self.features = np.empty(width * height, dtype=self.lut.dtype)
+
+        # An integer table gives quantized model input: mark it as such
+        if self.features.dtype.kind in "iu":
+            self.features = self.features.view(QuantizedFeatures)
+
+    def to_gray(self, img):
+        """
+        Converts img to grayscale in the preallocated buffer (returns img
+        unchanged if it is already single-channel)
+        """
+        if img.ndim == 2:
+            return img
+        if self.gray is None or self.gray.shape != img.shape[:2]:
+            self.gray = np.empty(img.shape[:2], dtype=np.uint8)
+        cv2.cvtColor(img, self.color_conversion, dst=self.gray)
+        return self.gray
+
+    def extract(self, img):
+        """
+        Returns the normalized feature vector for img (a view of the
+        preallocated buffer, overwritten on the next call)
+        """
+
+        # Convert to grayscale and resize straight into our buffers
+        gray = self.to_gray(img)
+        if gray.shape == self.resized.shape:
+            np.copyto(self.resized, gray)
+        else:
+            cv2.resize(gray,
+                       (self.width, self.height),
+                       dst=self.resized,
+                       interpolation=self.interpolation)
+
+        # Normalize every pixel with a single table lookup
+        np.take(self.lut, self.resized.reshape(-1), out=self.features)
+
+        return self.features
@@ -0,0 +1,271 @@
+"""
+Shared Memory Frame Ring
+
+Passes camera frames from a capture process to one or more inference processes
+without pickling them. The ring is a block of shared memory
+(multiprocessing.shared_memory) with a fixed number of frame slots. The capture
+process copies each frame straight into the next slot, and readers get a NumPy
+view of the slot (no copy at all).
+
+Each slot has a small header with the frame's sequence number, capture
+timestamp (time.monotonic_ns()) and shape, so frames smaller than the slot can
+be stored too. While a slot is being written its sequence number is set to -1,
+so readers never see a half-written frame. Since readers do not copy, the
+writer can overwrite a slot while it is still being used: call
+still_valid(frame) after processing to check (make the ring a few slots longer
+than the number of frames a reader can fall behind).
+
+The headers are only read and written while holding the ring's lock (a
+multiprocessing.Lock). Plain stores to shared memory are not ordered between
+processes on multi-core ARM boards such as the Raspberry Pi, but taking and
+releasing the lock is, so a reader that sees a sequence number also sees the
+frame data written before it. Pass ring.lock to the reader processes when
+starting them (locks cannot be sent any other way) and give it to attach().
+Without it, the checks above are best-effort only.
+
+Example (capture process):
+
+    ring = FrameRing.create((320, 320, 3), num_slots=4)
+    while True:
+        ring.write(camera.capture_array())
+
+Example (inference process, started with ring.name and ring.lock):
+
+    ring = FrameRing.attach(name, lock)
+    frame = ring.wait_newer(-1)
+    res = classify(frame.img)
+    if not ring.still_valid(frame):
+        print("Frame was overwritten while in use")
+
+Frames are returned as Frame(seq, timestamp_ns, img) tuples, like
+CameraCapture.read(). Only the creator (create()) removes the shared memory
+when it is closed.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import contextlib
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from camera_capture import Frame
+
+# Ring header: slot count, slot size (bytes), frame shape (3 values) and the
+# sequence number of the newest committed frame
+_RING_FIELDS = 6
+_RING_NEWEST = 5
+
+# Slot header: sequence number, timestamp, frame shape (3 values), padding
+_SLOT_FIELDS = 6
+_SLOT_SEQ = 0
+_SLOT_TIMESTAMP = 1
+_SLOT_SHAPE = slice(2, 5)
+
+# Size of one header field (int64)
+_FIELD_SIZE = 8
+
+################################################################################
+# Functions
+
+def _open_shared_memory(name):
+    """
+    Attaches to existing shared memory without registering it with this
+    process's resource tracker (which would remove it when this process
+    exits). The track argument needs Python 3.13 or later.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+################################################################################
+# Classes
+
+class FrameRing:
+    """
+    A ring of num_slots frame slots, each big enough for a frame_shape array of
+    uint8, in shared memory. Use create() in the capture process and attach()
+    in the reader processes.
+    """
+
+    def __init__(self, shm, owner, lock=None):
+        self._shm = shm
+        self._owner = owner
+        self.lock = lock
+        self._guard = lock if lock is not None else contextlib.nullcontext()
+
+        # Ring header
+        buf = shm.buf
+        self._ring = np.ndarray((_RING_FIELDS,), dtype=np.int64, buffer=buf)
+        self.num_slots = int(self._ring[0])
+        self.slot_size = int(self._ring[1])
+        self.frame_shape = tuple(int(d) for d in self._ring[2:5])
+
+        # Slot headers and slot data (as views of the shared memory)
+        offset = _RING_FIELDS * _FIELD_SIZE
+        self._headers = np.ndarray((self.num_slots, _SLOT_FIELDS),
+                                   dtype=np.int64,
+                                   buffer=buf,
+                                   offset=offset)
+        offset += self._headers.nbytes
+        self._data = np.ndarray((self.num_slots, self.slot_size),
+                                dtype=np.uint8,
+                                buffer=buf,
+                                offset=offset)
+
+        # Writer state
+        self._next_seq = int(self._ring[_RING_NEWEST]) + 1
+
+    @classmethod
+    def create(cls, frame_shape, num_slots=4, name=None, lock=None):
+        """
+        Creates a new ring in shared memory for frames of up to frame_shape
+        (height, width, channels), with a new lock unless one is given
+        """
+        if num_slots < 2:
+            raise ValueError("num_slots must be at least 2")
+        if len(frame_shape) == 2:
+            frame_shape = (frame_shape[0], frame_shape[1], 1)
+        slot_size = int(np.prod(frame_shape))
+        size = (_RING_FIELDS + num_slots * _SLOT_FIELDS) * _FIELD_SIZE + \
+            num_slots * slot_size
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_RING_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (num_slots, slot_size) + tuple(frame_shape) + (-1,)
+        if lock is None:
+            lock = mp.Lock()
+        ring = cls(shm, owner=True, lock=lock)
+        ring._headers[:, _SLOT_SEQ] = -1
+        return ring
+
+    @classmethod
+    def attach(cls, name, lock=None):
+        """
+        Attaches to a ring created by another process. Pass the creator's
+        ring.lock, or frames are only checked on a best-effort basis.
+        """
+        return cls(_open_shared_memory(name), owner=False, lock=lock)
+
+    @property
+    def name(self):
+        """
+        Name of the shared memory block (pass it to attach())
+        """
+        return self._shm.name
+
+    def reserve(self, shape=None):
+        """
+        Returns a writable view of the next slot, shaped like the frame
+        (frame_shape if shape is None). Fill it, then call commit().
+        """
+        shape = self.frame_shape if shape is None else tuple(shape)
+        size = int(np.prod(shape))
+        if size > self.slot_size:
+            raise ValueError("Frame does not fit in a slot")
+        slot = self._next_seq % self.num_slots
+        with self._guard:
+            self._headers[slot, _SLOT_SEQ] = -1
+        return self._data[slot, :size].reshape(shape)
+
+    def commit(self, shape=None, timestamp_ns=None):
+        """
+        Publishes the slot returned by reserve() and returns its sequence
+        number
+        """
+        shape = self.frame_shape if shape is None else tuple(shape)
+        if len(shape) == 2:
+            shape = (shape[0], shape[1], 1)
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        seq = self._next_seq
+        header = self._headers[seq % self.num_slots]
+        with self._guard:
+            header[_SLOT_TIMESTAMP] = timestamp_ns
+            header[_SLOT_SHAPE] = shape
+
+            # The sequence number is written last: it marks the slot as
+            # complete
+            header[_SLOT_SEQ] = seq
+            self._ring[_RING_NEWEST] = seq
+        self._next_seq += 1
+        return seq
+
+    def write(self, img, timestamp_ns=None):
+        """
+        Copies img into the next slot (the only copy of the frame) and returns
+        its sequence number
+        """
+        np.copyto(self.reserve(img.shape), img)
+        return self.commit(img.shape, timestamp_ns)
+
+    def newest_seq(self):
+        """
+        Returns the sequence number of the newest frame (-1 if none yet)
+        """
+        with self._guard:
+            return int(self._ring[_RING_NEWEST])
+
+    def read(self, seq):
+        """
+        Returns frame seq as a Frame with a view of the slot (no copy), or
+        None if it has been overwritten (or not written yet)
+        """
+        if seq < 0:
+            return None
+        header = self._headers[seq % self.num_slots]
+        with self._guard:
+            if header[_SLOT_SEQ] != seq:
+                return None
+            timestamp_ns = int(header[_SLOT_TIMESTAMP])
+            shape = tuple(int(d) for d in header[_SLOT_SHAPE])
+        img = self._data[seq % self.num_slots, :int(np.prod(shape))]
+        img = img.reshape(shape if shape[2] > 1 else shape[:2])
+        return Frame(seq, timestamp_ns, img)
+
+    def latest(self):
+        """
+        Returns the newest frame (or None if there is none yet)
+        """
+        return self.read(self.newest_seq())
+
+    def wait_newer(self, seq, timeout=None, poll_interval=0.0005):
+        """
+        Waits for a frame newer than seq and returns the newest one (None on
+        timeout). Frames in between are skipped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.newest_seq() > seq:
+                frame = self.latest()
+                if frame is not None:
+                    return frame
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def still_valid(self, frame):
+        """
+        Returns True if the frame's slot has not been reused since it was read
+        """
+        with self._guard:
+            return self._headers[frame.seq % self.num_slots, _SLOT_SEQ] == \
+                frame.seq
+
+    def close(self):
+        """
+        Detaches from the shared memory (and removes it if this is the ring's
+        creator). Views returned earlier must not be used afterwards.
+        """
+        self._ring = self._headers = self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,244 @@
+"""
+Sharded Frame Storage
+
+Stores captured frames as raw uint8 pixels appended to a few large shard files
+instead of one compressed image file per frame. Capture only does sequential
+writes (no PNG compression, no new file per frame), and training can load
+every frame with no decoding at all by memory-mapping the shards.
+
+Each shard is a regular NumPy .npy file holding up to shard_size frames, so it
+can also be opened with np.load(path, mmap_mode="r"). A dataset folder looks
+like this:
+
+    shards/
+        index.json          frame shape, channel order and frames per shard
+        frames.jsonl        one line per frame: shard, position and time
+        shard-00000.npy     frames 0 to shard_size - 1
+        shard-00001.npy     ...
+
+The .npy header of the shard being written is updated when the shard is full
+and when the writer is closed. If capture is interrupted, ShardReader still
+finds every complete frame from the size of the file.
+
+Use export_png() (or export_shards.py) to turn shards back into numbered image
+files, e.g. to upload them to Edge Impulse.
+
+Example:
+
+    with ShardWriter("shards/", (96, 96, 3)) as shards:
+        shards.append(img)
+
+    frames = ShardReader("shards/", rgb=True)
+    print(len(frames), frames[0].shape)
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import json
+import os
+import struct
+import time
+import cv2
+import numpy as np
+
+# Names of the files kept in the shard folder
+INDEX_FILE = "index.json"
+FRAMES_FILE = "frames.jsonl"
+SHARD_NAME = "shard-{:05d}.npy"
+
+# Fixed .npy header size, so the frame count can be rewritten in place
+NPY_HEADER_SIZE = 128
+
+################################################################################
+# Functions
+
+def npy_header(shape):
+    """
+    Returns a version 1.0 .npy header for a C-order uint8 array of shape,
+    padded to NPY_HEADER_SIZE bytes
+    """
+    header = "{{'descr': '|u1', 'fortran_order': False, 'shape': {}, }}".format(
+        tuple(shape))
+    pad = NPY_HEADER_SIZE - 10 - len(header) - 1
+    if pad < 0:
+        raise ValueError("Frame shape too large for header: " + str(shape))
+    header = header + " " * pad + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + \
+        header.encode("latin1")
+
+
+def export_png(shard_path, output_path, file_suffix=".png", start_num=0):
+    """
+    Writes every frame in shard_path to output_path as numbered image files
+    (start_num.png, start_num + 1.png, ...). Returns the number of files.
+    """
+    frames = ShardReader(shard_path)
+    os.makedirs(output_path, exist_ok=True)
+    for i in range(len(frames)):
+        img = frames[i]
+        if frames.channel_order == "RGB":
+            img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        filepath = os.path.join(output_path, str(start_num + i) + file_suffix)
+        if not cv2.imwrite(filepath, img):
+            raise IOError("Could not write image: " + filepath)
+    return len(frames)
+
+################################################################################
+# Classes
+
+class ShardWriter:
+    """
+    Appends frames of frame_shape (uint8) to .npy shard files of up to
+    shard_size frames each in shard_path
+    """
+
+    def __init__(self, shard_path, frame_shape, shard_size=1000,
+                 channel_order="BGR"):
+        self.shard_path = shard_path
+        self.frame_shape = tuple(frame_shape)
+        self.frame_bytes = int(np.prod(self.frame_shape))
+        self.shard_size = shard_size
+        self.channel_order = channel_order
+        os.makedirs(shard_path, exist_ok=True)
+
+        # Continue an existing dataset (new frames start in a new shard)
+        self.shard_counts = []
+        index_path = os.path.join(shard_path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                index = json.load(f)
+            if tuple(index["frame_shape"]) != self.frame_shape:
+                raise ValueError("Frame shape does not match " + index_path)
+            self.shard_counts = index["shard_counts"]
+
+        self._file = None
+        self._count = 0
+        self._frames = open(os.path.join(shard_path, FRAMES_FILE), "a")
+        self.frames_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open_shard(self):
+        """
+        Starts a new shard file
+        """
+        self.shard_counts.append(0)
+        path = os.path.join(self.shard_path,
+                            SHARD_NAME.format(len(self.shard_counts) - 1))
+        self._file = open(path, "wb")
+        self._file.write(npy_header((0,) + self.frame_shape))
+        self._count = 0
+        self._save_index()
+
+    def _close_shard(self):
+        """
+        Writes the real frame count into the shard's header and closes it
+        """
+        self._file.seek(0)
+        self._file.write(npy_header((self._count,) + self.frame_shape))
+        self._file.close()
+        self._file = None
+        self._save_index()
+
+    def _save_index(self):
+        index = {"frame_shape": list(self.frame_shape),
+                 "dtype": "uint8",
+                 "channel_order": self.channel_order,
+                 "shard_size": self.shard_size,
+                 "shard_counts": self.shard_counts}
+        tmp_path = os.path.join(self.shard_path, INDEX_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, os.path.join(self.shard_path, INDEX_FILE))
+
+    def append(self, img):
+        """
+        Appends one frame (a uint8 array of frame_shape)
+        """
+        if img.shape != self.frame_shape or img.dtype != np.uint8:
+            raise ValueError("Expected uint8 frame of shape " +
+                             str(self.frame_shape))
+        if self._file is None:
+            self._open_shard()
+
+        # Raw pixels go straight to the end of the file
+        self._file.write(np.ascontiguousarray(img).data)
+        self._frames.write(json.dumps({"shard": len(self.shard_counts) - 1,
+                                       "position": self._count,
+                                       "time": time.time()}) + "\n")
+        self._count += 1
+        self.shard_counts[-1] = self._count
+        self.frames_written += 1
+
+        if self._count >= self.shard_size:
+            self._close_shard()
+
+    def close(self):
+        """
+        Finishes the current shard and writes the index
+        """
+        if self._file is not None:
+            self._close_shard()
+        else:
+            self._save_index()
+        if self._frames is not None:
+            self._frames.close()
+            self._frames = None
+
+
+class ShardReader:
+    """
+    Memory-maps every shard in shard_path. frames[i] returns frame i as a
+    read-only view (no copy, no decoding). With rgb=True, frames stored in
+    BGR order are returned as RGB (still a view).
+    """
+
+    def __init__(self, shard_path, rgb=False):
+        with open(os.path.join(shard_path, INDEX_FILE)) as f:
+            index = json.load(f)
+        self.frame_shape = tuple(index["frame_shape"])
+        self.channel_order = index["channel_order"]
+        self.rgb = rgb
+        frame_bytes = int(np.prod(self.frame_shape))
+
+        # Map each shard. The frame count comes from the file size, so frames
+        # from an interrupted capture can still be read.
+        self._shards = []
+        self._starts = []
+        total = 0
+        for i in range(len(index["shard_counts"])):
+            path = os.path.join(shard_path, SHARD_NAME.format(i))
+            count = (os.path.getsize(path) - NPY_HEADER_SIZE) // frame_bytes
+            if count <= 0:
+                continue
+            shard = np.memmap(path, dtype=np.uint8, mode="r",
+                              offset=NPY_HEADER_SIZE,
+                              shape=(count,) + self.frame_shape)
+            self._shards.append(shard)
+            self._starts.append(total)
+            total += count
+        self._length = total
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("frame index out of range")
+        shard_num = np.searchsorted(self._starts, i, side="right") - 1
+        img = self._shards[shard_num][i - self._starts[shard_num]]
+        if self.rgb and self.channel_order == "BGR" and img.ndim == 3:
+            img = img[..., ::-1]
+        return img
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self[i]
@@ -0,0 +1,283 @@
+"""
+Frame Sources
+
+Lets the Raspberry Pi programs run without a camera. ReplaySource behaves like
+the parts of Picamera2 that the programs use (create_video_configuration(),
+configure(), start(), capture_array(), stop() and use in a "with" statement),
+but plays back frames from:
+
+    * a video file (anything OpenCV can open, e.g. .mp4 or .avi)
+    * a folder of .png/.bmp/.jpg images (played in sorted filename order)
+    * a .zip of images (e.g. the files in the Datasets folder)
+    * a .npy file holding a stack of frames (N, height, width[, channels]),
+      which is memory-mapped instead of loaded
+
+Frames are resized to the configured size and converted to the configured
+format the same way Picamera2 lays out memory (e.g. "RGB888" gives pixels in
+B, G, R order). If rotation is given, frames are rotated the opposite way, as
+if the camera were mounted rotated, so the program's own rotation setting turns
+them upright again.
+
+By default frames are delivered as fast as they are requested, which is what
+you want for measuring throughput. With realtime=True, frames are paced to fps
+(like a real camera), skipping ahead when the program falls behind.
+
+Use open_camera() to get a Picamera2 when source is None, or a ReplaySource
+otherwise:
+
+    with open_camera("Datasets/dog-classification-png.zip") as camera:
+        ...
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os
+import time
+import zipfile
+import cv2
+import numpy as np
+
+# Image file types we know how to replay
+IMAGE_EXTENSIONS = (".png", ".bmp", ".jpg", ".jpeg")
+
+# Picamera2 formats and the OpenCV conversion from BGR that produces them
+FORMAT_CONVERSIONS = {
+    "RGB888": None,                     # Stored as B, G, R
+    "BGR888": cv2.COLOR_BGR2RGB,        # Stored as R, G, B
+    "XRGB8888": cv2.COLOR_BGR2BGRA,     # Stored as B, G, R, X
+    "XBGR8888": cv2.COLOR_BGR2RGBA,     # Stored as R, G, B, X
+}
+
+# Rotation that undoes each rotation setting
+INVERSE_ROTATIONS = {
+    90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_CLOCKWISE,
+}
+
+################################################################################
+# Functions
+
+def open_camera(source=None, **kwargs):
+    """
+    Returns a Picamera2 object if source is None, otherwise a ReplaySource
+    that plays back source (keyword arguments are passed to ReplaySource)
+    """
+    if source is None:
+        from picamera2 import Picamera2
+        return Picamera2()
+    return ReplaySource(source, **kwargs)
+
+
+def _to_bgr(img):
+    """
+    Converts a grayscale, BGR or BGRA image to 3-channel BGR
+    """
+    if img.ndim == 2:
+        return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    if img.shape[2] == 4:
+        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+    return img
+
+################################################################################
+# Classes
+
+class _VideoReader:
+    """
+    Reads frames from a video file, rewinding at the end when looping
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.video = cv2.VideoCapture(path)
+        if not self.video.isOpened():
+            raise IOError("Could not open video: " + path)
+        self.fps = self.video.get(cv2.CAP_PROP_FPS) or None
+
+    def read(self, loop):
+        ok, img = self.video.read()
+        if not ok and loop:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, img = self.video.read()
+        return img if ok else None
+
+    def close(self):
+        self.video.release()
+
+
+class _ListReader:
+    """
+    Reads frames from a sequence of items with a load function
+    """
+
+    def __init__(self, items, load):
+        if len(items) == 0:
+            raise IOError("No frames found")
+        self.items = items
+        self.load = load
+        self.index = 0
+        self.fps = None
+
+    def read(self, loop):
+        if self.index >= len(self.items):
+            if not loop:
+                return None
+            self.index = 0
+        img = self.load(self.items[self.index])
+        self.index += 1
+        return img
+
+    def close(self):
+        pass
+
+
+class ReplaySource:
+    """
+    Picamera2 stand-in that replays frames from a video file, image folder,
+    zip of images or .npy stack
+    """
+
+    def __init__(self, source, rotation=0, realtime=False, fps=None,
+                 loop=True):
+        if rotation not in (0, 90, 180, 270):
+            raise ValueError("rotation must be 0, 90, 180, or 270")
+        self.source = source
+        self.rotation = rotation
+        self.realtime = realtime
+        self.loop = loop
+        self.size = None
+        self.format = "RGB888"
+        self._reader = self._open(source)
+        self.fps = fps or self._reader.fps or 30.0
+        self._next_time = None
+        self._started = False
+
+        # Statistics
+        self.frames_delivered = 0
+        self.frames_skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open(self, source):
+        """
+        Returns a reader for whatever kind of source this is
+        """
+        source = str(source)
+        if os.path.isdir(source):
+            paths = sorted(os.path.join(source, f) for f in os.listdir(source)
+                           if f.lower().endswith(IMAGE_EXTENSIONS))
+            return _ListReader(paths, self._load_image_file)
+        if source.lower().endswith(".zip"):
+            self._zip = zipfile.ZipFile(source)
+            names = sorted(n for n in self._zip.namelist()
+                           if n.lower().endswith(IMAGE_EXTENSIONS))
+            return _ListReader(names, self._load_zip_member)
+        if source.lower().endswith(".npy"):
+            frames = np.load(source, mmap_mode="r")
+            return _ListReader(frames, lambda frame: np.asarray(frame))
+        return _VideoReader(source)
+
+    def _load_image_file(self, path):
+        img = cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is None:
+            raise IOError("Could not read image: " + path)
+        return img
+
+    def _load_zip_member(self, name):
+        data = np.frombuffer(self._zip.read(name), dtype=np.uint8)
+        img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if img is None:
+            raise IOError("Could not decode image: " + name)
+        return img
+
+    def create_video_configuration(self, main=None, **kwargs):
+        """
+        Returns a configuration dictionary (same call as Picamera2)
+        """
+        return {"main": dict(main or {})}
+
+    def create_still_configuration(self, main=None, **kwargs):
+        return self.create_video_configuration(main, **kwargs)
+
+    def configure(self, config):
+        """
+        Sets output size and format from a configuration dictionary
+        """
+        main = config.get("main", {})
+        self.size = main.get("size", self.size)
+        self.format = main.get("format", self.format)
+        if self.format not in FORMAT_CONVERSIONS:
+            raise ValueError("Unsupported format: " + str(self.format))
+
+    def start(self):
+        self._started = True
+        self._next_time = time.monotonic()
+
+    def stop(self):
+        self._started = False
+
+    def close(self):
+        self.stop()
+        self._reader.close()
+        if getattr(self, "_zip", None) is not None:
+            self._zip.close()
+
+    def _read(self):
+        """
+        Returns the next raw frame as BGR (raises EOFError at the end)
+        """
+        img = self._reader.read(self.loop)
+        if img is None:
+            raise EOFError("End of frame source: " + str(self.source))
+        return _to_bgr(img)
+
+    def capture_array(self, name="main"):
+        """
+        Returns the next frame, resized, rotated and in the configured format
+        """
+        if self.realtime:
+            self._wait_for_frame()
+        img = self._read()
+
+        # Simulate a rotated camera (the program's rotation setting undoes it)
+        if self.rotation != 0:
+            img = cv2.rotate(img, INVERSE_ROTATIONS[self.rotation])
+
+        # Resize to the configured (sensor) resolution
+        if self.size is not None and (img.shape[1], img.shape[0]) != self.size:
+            img = cv2.resize(img, tuple(self.size),
+                             interpolation=cv2.INTER_AREA)
+
+        # Lay out pixels like Picamera2 does for this format
+        conversion = FORMAT_CONVERSIONS[self.format]
+        if conversion is not None:
+            img = cv2.cvtColor(img, conversion)
+
+        self.frames_delivered += 1
+        return np.ascontiguousarray(img)
+
+    def _wait_for_frame(self):
+        """
+        Sleeps until the next frame is due. Frames that were due while the
+        program was busy are skipped, like a real camera would drop them.
+        """
+        interval = 1.0 / self.fps
+        if self._next_time is None:
+            self._next_time = time.monotonic()
+        now = time.monotonic()
+        if now < self._next_time:
+            time.sleep(self._next_time - now)
+        else:
+            missed = int((now - self._next_time) / interval)
+            for _ in range(min(missed, 1000)):
+                if self._reader.read(self.loop) is None:
+                    break
+                self.frames_skipped += 1
+            self._next_time += missed * interval
+        self._next_time += interval
@@ -0,0 +1,111 @@
+"""
+Headless Mode Helpers
+
+For running the live programs on a Raspberry Pi without a screen. Instead of
+drawing results on a preview window and waiting for 'q' in cv2.waitKey(), the
+programs write one JSON object per frame to a results sink and stop cleanly
+when they receive SIGINT (ctrl + c) or SIGTERM (e.g. from systemd or kill).
+
+    ResultSink      writes JSON Lines (one JSON object per line) to a file or
+                    to the console
+    ShutdownFlag    installs SIGINT/SIGTERM handlers that set a flag instead of
+                    killing the program, so the main loop can finish its frame
+                    and clean up
+
+Example:
+
+    shutdown = ShutdownFlag()
+    with ResultSink("results.jsonl") as sink:
+        while not shutdown.is_set():
+            ...
+            sink.write({"classification": res['result']['classification']})
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import json
+import signal
+import sys
+import threading
+import time
+
+################################################################################
+# Classes
+
+class ResultSink:
+    """
+    Writes one JSON object per line to path (or to the console if path is
+    None). Every record gets a "time" field (seconds since the epoch) unless
+    it already has one.
+    """
+
+    def __init__(self, path=None, flush_every=1):
+        self.path = path
+        self.flush_every = flush_every
+        self._file = sys.stdout if path is None else open(path, "a")
+        self._pending = 0
+        self.records_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, record):
+        """
+        Writes record (a dictionary) as one line of JSON
+        """
+        if "time" not in record:
+            record = dict(record, time=time.time())
+        self._file.write(json.dumps(record, separators=(",", ":"),
+                                    default=float) + "\n")
+        self.records_written += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self):
+        """
+        Flushes and closes the output file (the console is left open)
+        """
+        if self._file is None:
+            return
+        self._file.flush()
+        if self._file is not sys.stdout:
+            self._file.close()
+        self._file = None
+
+
+class ShutdownFlag:
+    """
+    Set when the program receives one of signals. A second signal of the same
+    kind exits immediately, in case the main loop is stuck.
+    """
+
+    def __init__(self, signals=(signal.SIGINT, signal.SIGTERM)):
+        self._event = threading.Event()
+        self.signal_received = None
+        for sig in signals:
+            signal.signal(sig, self._handle)
+
+    def _handle(self, signum, frame):
+        if self._event.is_set():
+            sys.exit(128 + signum)
+        self.signal_received = signum
+        self._event.set()
+
+    def is_set(self):
+        """
+        Returns True once a shutdown signal has been received
+        """
+        return self._event.is_set()
+
+    def set(self):
+        """
+        Requests shutdown from code (e.g. after 'q' is pressed)
+        """
+        self._event.set()
@@ -0,0 +1,156 @@
+"""
+Asynchronous Image Writer
+
+Saves images from a pool of background threads so that PNG compression and SD
+card writes never hold up the capture loop. The capture loop hands each image
+to submit(), which only puts it in a bounded queue and returns immediately.
+cv2.imencode() and file writes release the GIL, so the writer threads really
+do run alongside the capture loop on a multi-core Pi.
+
+If the writers cannot keep up and the queue is full, the new image is dropped
+(and counted) rather than making the capture loop wait. Set block=True to wait
+instead, e.g. when every frame must be kept. If on_written is set, it is called
+with the path of each image once it has been written successfully (from a
+writer thread), e.g. to add the image to a manifest.
+
+Example:
+
+    writer = ImageWriter(num_workers=2, queue_size=32)
+    while capturing:
+        img = camera.capture_array()
+        writer.submit("images/" + str(n) + ".png", img)
+    writer.close()
+    print(writer.format_stats())
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import queue
+import threading
+import cv2
+
+################################################################################
+# Classes
+
+class ImageWriter:
+    """
+    Writes images with cv2.imwrite() from num_workers background threads fed
+    by a queue of at most queue_size images
+    """
+
+    def __init__(self, num_workers=2, queue_size=32, block=False, params=None,
+                 on_written=None):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.block = block
+        self.params = params or []
+        self.on_written = on_written
+        self._queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Statistics
+        self.images_submitted = 0
+        self.images_written = 0
+        self.images_dropped = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+
+        # Start writer threads
+        self._threads = []
+        for _ in range(num_workers):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, path, img):
+        """
+        Queues img to be saved at path. Returns False if it was dropped because
+        the queue is full. The caller must not modify img afterwards (pass a
+        copy if the buffer is reused).
+        """
+        if self._closed:
+            raise RuntimeError("ImageWriter is closed")
+        self.images_submitted += 1
+        try:
+            self._queue.put((path, img), block=self.block)
+        except queue.Full:
+            self.images_dropped += 1
+            return False
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        return True
+
+    def _run(self):
+        """
+        Writer thread: saves queued images until it receives None
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, img = item
+            ok = False
+            try:
+                ok = cv2.imwrite(path, img, self.params)
+            except cv2.error as e:
+                print("ERROR: Could not save", path)
+                print("Exception:", e)
+            with self._lock:
+                if ok:
+                    self.images_written += 1
+                else:
+                    self.errors += 1
+            if ok and self.on_written is not None:
+                self.on_written(path)
+
+    def pending(self):
+        """
+        Returns the number of images waiting to be written
+        """
+        return self._queue.qsize()
+
+    def close(self):
+        """
+        Waits for all queued images to be written and stops the threads
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self):
+        """
+        Returns a dictionary of writer statistics
+        """
+        with self._lock:
+            return {
+                "images_submitted": self.images_submitted,
+                "images_written": self.images_written,
+                "images_dropped": self.images_dropped,
+                "errors": self.errors,
+                "max_queue_depth": self.max_queue_depth,
+            }
+
+    def format_stats(self):
+        """
+        Returns the statistics as a printable line
+        """
+        s = self.stats()
+        return ("Images: {} written, {} dropped (queue full), {} errors, "
+                "max queue depth {}").format(s["images_written"],
+                                             s["images_dropped"],
+                                             s["errors"],
+                                             s["max_queue_depth"])
@@ -0,0 +1,414 @@
+"""
+Inference Backends
+
+The Edge Impulse runner runs the model in a separate .eim process. Every
+classify() call turns the features into JSON, sends them over a socket and
+parses the JSON result, which can take longer than the inference itself for
+small models. The in-process backends here run an exported .tflite (TensorFlow
+Lite) or .onnx model directly in the Python process instead. They take NumPy
+arrays (or lists) and return results in the same format as the .eim runner:
+
+    {"result": {"classification": {"dog": 0.91, "background": 0.09}},
+     "timing": {"dsp": 0, "classification": 2.1, "anomaly": 0}}
+
+so the live programs can switch backends with one setting. init() returns the
+same model_info['model_parameters'] fields the programs use (labels, input
+width/height and channel count). Labels are read from labels.txt next to the
+model file (like on the OpenMV), or can be passed in.
+
+Features can be:
+
+    * floats in [0, 1] (from FeatureExtractor or get_features_from_image())
+    * packed 0xRRGGBB pixels (from the .eim image runner or pack_pixels())
+    * uint8 pixels
+    * QuantizedFeatures (the model's quantized input, used as is)
+
+Set int8=True for quantized (int8/uint8 input) .tflite models to skip the
+float step: get_features_from_image() then returns the quantized model input
+directly, made from the uint8 pixels with a 256-entry lookup table that has
+the model's input scale and zero point applied once when the model loads
+(also available as runner.pixel_lut for FeatureExtractor). These features are
+marked as QuantizedFeatures so they are passed to the model untouched, while
+plain uint8 arrays are always treated as pixels and go through the table. Only
+the output is dequantized.
+
+Only classification models are supported. Object detection models should stay
+on the .eim runner, which also does the box decoding.
+
+    runner = open_runner("trained.tflite", "tflite", image=True)
+    model_info = runner.init()
+    features, cropped = runner.get_features_from_image(img)
+    res = runner.classify(features)
+
+The TFLite backend needs tflite-runtime (or tensorflow), the ONNX backend needs
+onnxruntime.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import math
+import os
+import time
+import cv2
+import numpy as np
+from features import QuantizedFeatures, make_quantization_lut
+
+# Supported backends
+BACKENDS = ("eim", "tflite", "onnx")
+
+# Name of the labels file that sits next to an exported model
+LABELS_FILE = "labels.txt"
+
+################################################################################
+# Functions
+
+def open_runner(model_path, backend="eim", image=False, labels=None,
+                num_threads=None, server=None, int8=False):
+    """
+    Returns a runner for model_path: the Edge Impulse .eim runner (an
+    ImageImpulseRunner if image is True), or an in-process TFLite or ONNX
+    runner. If server is the socket path of a running model server
+    (model_server.py), returns a client that uses the model loaded there
+    instead (loaded with the same backend and int8 mode). int8 selects the
+    quantized input mode of the in-process runners. Call init() on it before
+    classifying.
+    """
+    if server is not None:
+        from model_server import ModelClient
+        return ModelClient(model_path, server, backend, int8)
+    if backend == "eim":
+        if image:
+            from edge_impulse_linux.image import ImageImpulseRunner
+            return ImageImpulseRunner(model_path)
+        from edge_impulse_linux.runner import ImpulseRunner
+        return ImpulseRunner(model_path)
+    if backend == "tflite":
+        return TFLiteRunner(model_path, labels, num_threads, int8)
+    if backend == "onnx":
+        return OnnxRunner(model_path, labels, num_threads, int8)
+    raise ValueError("backend must be one of " + str(BACKENDS))
+
+
+def load_tflite_interpreter(model_path, num_threads=None):
+    """
+    Returns a TFLite interpreter with tensors allocated (from tflite_runtime
+    if installed, otherwise from tensorflow)
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow
+        Interpreter = tensorflow.lite.Interpreter
+    if num_threads is None:
+        interpreter = Interpreter(model_path=model_path)
+    else:
+        interpreter = Interpreter(model_path=model_path,
+                                  num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def read_labels(model_path, num_outputs):
+    """
+    Returns the labels from labels.txt next to the model, or "0", "1", ... if
+    there is no labels file
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(model_path)),
+                        LABELS_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            labels = [line.strip() for line in f if line.strip()]
+        if len(labels) == num_outputs:
+            return labels
+        print("WARNING: Number of labels in", path, "does not match model")
+    return [str(i) for i in range(num_outputs)]
+
+
+def crop_and_resize(img, width, height):
+    """
+    Crops the center of img to the aspect ratio of width x height and resizes
+    it to that size (like the .eim image runner)
+    """
+    img_height, img_width = img.shape[:2]
+    ratio = width / height
+    if img_width / img_height > ratio:
+        new_width = int(round(img_height * ratio))
+        x = (img_width - new_width) // 2
+        img = img[:, x:(x + new_width)]
+    elif img_width / img_height < ratio:
+        new_height = int(round(img_width / ratio))
+        y = (img_height - new_height) // 2
+        img = img[y:(y + new_height)]
+    return cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def unpack_pixels(packed, channels):
+    """
+    Converts packed 0xRRGGBB pixels to uint8 pixels with 1 (grayscale) or 3
+    channels. Like the .eim image runner, the high byte holds the first
+    channel in memory, which is blue for Picamera2 "RGB888" (BGR) frames, so
+    grayscale uses the same weights as cv2.COLOR_BGR2GRAY.
+    """
+    packed = np.asarray(packed, dtype=np.int64)
+    first = (packed >> 16) & 0xff
+    second = (packed >> 8) & 0xff
+    third = packed & 0xff
+    if channels == 1:
+        gray = 0.114 * first + 0.587 * second + 0.299 * third
+        return np.round(gray).astype(np.uint8)
+    return np.stack((first, second, third), axis=-1).astype(np.uint8)
+
+################################################################################
+# Classes
+
+class _InProcessRunner:
+    """
+    Common part of the in-process runners. Subclasses load the model and
+    implement _invoke().
+    """
+
+    def __init__(self, model_path, labels=None, num_threads=None,
+                 int8=False):
+        self.model_path = model_path
+        self.labels = labels
+        self.num_threads = num_threads
+        self.int8 = int8
+
+        # Filled in by _load(): model input layout and quantization
+        self.input_shape = None
+        self.input_dtype = np.float32
+        self.input_quantization = (0.0, 0)
+        self.output_quantization = (0.0, 0)
+        self.input_width = 0
+        self.input_height = 0
+        self.input_channels = 1
+
+        # Quantized model input for every uint8 pixel value (quantized models)
+        self.pixel_lut = None
+
+    def _set_input_layout(self, shape):
+        """
+        Works out image width, height and channels from the input shape,
+        (1, height, width, channels) or a flat (1, pixels)
+        """
+        self.input_shape = tuple(int(d) for d in shape)
+        if len(shape) == 4:
+            self.input_height, self.input_width, self.input_channels = \
+                self.input_shape[1:]
+        else:
+            count = int(np.prod(self.input_shape[1:]))
+            side = int(math.isqrt(count))
+            if side * side == count:
+                self.input_width = self.input_height = side
+            else:
+                self.input_width, self.input_height = count, 1
+            self.input_channels = 1
+
+    def init(self):
+        """
+        Loads the model and returns model information in the same layout as
+        the .eim runner
+        """
+        num_outputs = self._load()
+
+        # Apply the input quantization to all 256 pixel values once
+        scale, zero_point = self.input_quantization
+        if self.input_dtype != np.float32 and scale != 0:
+            self.pixel_lut = make_quantization_lut(scale,
+                                                   zero_point,
+                                                   self.input_dtype)
+        elif self.int8:
+            print("WARNING: Model input is not quantized, using float input")
+            self.int8 = False
+
+        if self.labels is None:
+            self.labels = read_labels(self.model_path, num_outputs)
+        return {
+            "project": {
+                "name": os.path.basename(self.model_path),
+                "owner": "",
+            },
+            "model_parameters": {
+                "labels": self.labels,
+                "label_count": len(self.labels),
+                "image_input_width": self.input_width,
+                "image_input_height": self.input_height,
+                "image_channel_count": self.input_channels,
+                "input_features_count": int(np.prod(self.input_shape[1:])),
+                "model_type": "classification",
+                "has_anomaly": 0,
+            },
+        }
+
+    def get_features_from_image(self, img):
+        """
+        Crops the center of a camera frame (BGR in memory, like Picamera2
+        "RGB888" frames, as the .eim image runner expects) to the model's
+        aspect ratio, resizes it to the model input, and returns the features
+        (float32 in [0, 1], or the quantized model input in int8 mode) and the
+        cropped image (like the .eim image runner)
+        """
+        cropped = crop_and_resize(img, self.input_width, self.input_height)
+        pixels = cropped
+        if self.input_channels == 1 and pixels.ndim == 3:
+            pixels = cv2.cvtColor(pixels, cv2.COLOR_BGR2GRAY)
+        if self.int8:
+            features = np.take(self.pixel_lut, pixels.reshape(-1))
+            features = features.view(QuantizedFeatures)
+        else:
+            features = pixels.reshape(-1).astype(np.float32) * (1.0 / 255)
+        return features, cropped
+
+    def _prepare(self, features):
+        """
+        Returns the features as an input tensor (quantized if the model input
+        is quantized)
+        """
+        # Features that are already the quantized model input are used as is
+        if isinstance(features, QuantizedFeatures):
+            if features.dtype != self.input_dtype or self.pixel_lut is None:
+                raise ValueError("Quantized features do not match the model "
+                                 "input")
+            return np.asarray(features).reshape(self.input_shape)
+        data = np.asarray(features)
+
+        # Packed pixels are unpacked
+        if data.dtype.kind in "iu" and data.dtype.itemsize > 1:
+            data = unpack_pixels(data, self.input_channels)
+
+        # Pixels are quantized with one table lookup each (quantized models)
+        # or scaled to [0, 1]
+        if data.dtype == np.uint8:
+            if self.pixel_lut is not None:
+                return np.take(self.pixel_lut, data).reshape(self.input_shape)
+            data = data.astype(np.float32) * (1.0 / 255)
+        data = data.astype(np.float32, copy=False).reshape(self.input_shape)
+
+        # Quantize for int8/uint8 models
+        scale, zero_point = self.input_quantization
+        if self.input_dtype != np.float32 and scale != 0:
+            info = np.iinfo(self.input_dtype)
+            data = np.clip(np.round(data / scale + zero_point),
+                           info.min, info.max).astype(self.input_dtype)
+        return data
+
+    def _result(self, output, dsp_ms, classification_ms):
+        """
+        Returns the output as an .eim style result dictionary
+        """
+        output = np.asarray(output).reshape(-1)
+        scale, zero_point = self.output_quantization
+        if scale != 0:
+            output = (output.astype(np.float32) - zero_point) * scale
+        return {
+            "result": {
+                "classification": {label: float(value)
+                                   for label, value in zip(self.labels,
+                                                           output)},
+            },
+            "timing": {
+                "dsp": dsp_ms,
+                "classification": classification_ms,
+                "anomaly": 0,
+            },
+        }
+
+    def classify(self, features):
+        """
+        Runs the model on one set of features
+        """
+        start = time.perf_counter()
+        data = self._prepare(features)
+        prepared = time.perf_counter()
+        output = self._invoke(data)
+        done = time.perf_counter()
+        return self._result(output,
+                            (prepared - start) * 1000,
+                            (done - prepared) * 1000)
+
+    def classify_batch(self, batch):
+        """
+        Classifies each row of batch and returns a list of results. Each call
+        is a plain function call, so there is no per-window IPC cost.
+        """
+        return [self.classify(row) for row in batch]
+
+    def stop(self):
+        """
+        Releases the model
+        """
+        self._release()
+
+
+class TFLiteRunner(_InProcessRunner):
+    """
+    Runs a .tflite model in this process
+    """
+
+    def _load(self):
+        self.interpreter = load_tflite_interpreter(self.model_path,
+                                                   self.num_threads)
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+        self._input_index = input_details["index"]
+        self._output_index = output_details["index"]
+        self.input_dtype = input_details["dtype"]
+        self.input_quantization = input_details["quantization"]
+        self.output_quantization = output_details["quantization"]
+        self._set_input_layout(input_details["shape"])
+        return int(np.prod(output_details["shape"]))
+
+    def _invoke(self, data):
+        self.interpreter.set_tensor(self._input_index, data)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output_index)
+
+    def _release(self):
+        self.interpreter = None
+
+
+class OnnxRunner(_InProcessRunner):
+    """
+    Runs an .onnx model in this process with onnxruntime. The model input
+    must be float32: ONNX does not store a scale and zero point with integer
+    inputs, so they could not be quantized here (quantized ONNX models usually
+    take float input and quantize inside the graph).
+    """
+
+    def _load(self):
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        if self.num_threads is not None:
+            options.intra_op_num_threads = self.num_threads
+        self.session = onnxruntime.InferenceSession(
+            self.model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        model_output = self.session.get_outputs()[0]
+        self._input_name = model_input.name
+        if model_input.type != "tensor(float)":
+            self.session = None
+            raise ValueError("ONNX model input is " + model_input.type +
+                             ", only float input is supported")
+
+        # Dynamic dimensions (e.g. batch size) are set to 1
+        shape = [d if isinstance(d, int) else 1 for d in model_input.shape]
+
+        # Channels-first (N, C, H, W) inputs are fed channels-last data and
+        # transposed before running
+        self._channels_first = len(shape) == 4 and shape[1] in (1, 3) and \
+            shape[3] not in (1, 3)
+        if self._channels_first:
+            shape = [shape[0], shape[2], shape[3], shape[1]]
+        self._set_input_layout(shape)
+        return int(np.prod([d if isinstance(d, int) else 1
+                            for d in model_output.shape]))
+
+    def _invoke(self, data):
+        if self._channels_first:
+            data = np.ascontiguousarray(data.transpose(0, 3, 1, 2))
+        return self.session.run(None, {self._input_name: data})[0]
+
+    def _release(self):
+        self.session = None
@@ -0,0 +1,296 @@
+"""
+Prometheus Metrics Endpoint
+
+Lets you monitor a live program (e.g. frames per second, inference latency and
+dropped frames) from another computer without scraping its console output. The
+main loop updates counters, gauges and histograms, and a small HTTP server in
+a background thread serves them in the Prometheus text format at /metrics.
+
+Updating a metric is a plain Python addition with no locks, so it costs next to
+nothing in the main loop. Only the main loop should update a given metric. The
+server thread only reads, so a scrape may see a histogram that is at most one
+observation behind its count, which Prometheus tolerates.
+
+By default the server only listens on 127.0.0.1 (this computer). Set host to
+"0.0.0.0" to let Prometheus on another machine scrape it.
+
+Example:
+
+    metrics = MetricsRegistry()
+    frames = metrics.counter("frames_inferred_total", "Frames inferred")
+    latency = metrics.histogram("inference_seconds", "Inference latency")
+    MetricsServer(metrics, port=9100).start()
+    while True:
+        ...
+        frames.inc()
+        latency.observe(inference_time)
+
+    $ curl http://127.0.0.1:9100/metrics
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Default histogram buckets (seconds), from 1 ms to 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+################################################################################
+# Functions
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    """
+    Returns labels in Prometheus form, e.g. {label="dog",stage="dsp"}
+    """
+    pairs = list(zip(labelnames, labelvalues))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+        escaped.append('{}="{}"'.format(name, value.replace('"', '\\"')))
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value):
+    """
+    Returns a number in Prometheus form
+    """
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+################################################################################
+# Classes
+
+class _Metric:
+    """
+    Base for all metric types. Holds one value per combination of label values.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError("Expected labels: " + ", ".join(self.labelnames))
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        """
+        Returns the metric in the Prometheus text format
+        """
+        lines = ["# HELP {} {}".format(self.name, self.help_text),
+                 "# TYPE {} {}".format(self.name, self.kind)]
+        for key, value in sorted(list(self._values.items())):
+            lines.extend(self._render_value(key, value))
+        return "\n".join(lines)
+
+    def _render_value(self, key, value):
+        return ["{}{} {}".format(self.name,
+                                 _format_labels(self.labelnames, key),
+                                 _format_value(value))]
+
+
+class Counter(_Metric):
+    """
+    Value that only goes up (e.g. number of frames)
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        """
+        Adds amount to the counter
+        """
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down (e.g. current FPS). If func is given, it is
+    called at scrape time to get the value instead.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), func=None):
+        super().__init__(name, help_text, labelnames)
+        self.func = func
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def set(self, value, **labels):
+        """
+        Sets the gauge to value
+        """
+        self._values[self._key(labels)] = value
+
+    def render(self):
+        if self.func is not None:
+            self._values[()] = self.func()
+        return super().render()
+
+
+class CallbackCounter(Gauge):
+    """
+    Counter whose total is read from func at scrape time (e.g. a count kept by
+    another object)
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, func):
+        super().__init__(name, help_text, func=func)
+
+
+class Histogram(_Metric):
+    """
+    Counts observations (e.g. latencies in seconds) in cumulative buckets
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if not self.labelnames:
+            self._values[()] = self._new_value()
+
+    def _new_value(self):
+        """
+        Returns [per-bucket counts (last one is +Inf), sum, count]
+        """
+        return [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+    def observe(self, value, **labels):
+        """
+        Adds one observation
+        """
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._new_value()
+            self._values[key] = state
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def _render_value(self, key, state):
+        counts, total, count = list(state[0]), state[1], state[2]
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            bucket_labels = _format_labels(self.labelnames, key,
+                                           ("le", _format_value(bound)))
+            lines.append("{}_bucket{} {}".format(self.name, bucket_labels,
+                                                 cumulative))
+        labels = _format_labels(self.labelnames, key)
+        lines.append("{}_sum{} {}".format(self.name, labels,
+                                          _format_value(total)))
+        lines.append("{}_count{} {}".format(self.name, labels, count))
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics. Every name gets prefix (e.g. "ei_") in front of it.
+    """
+
+    def __init__(self, prefix="ei_"):
+        self.prefix = prefix
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(self.prefix + name, help_text, labelnames))
+
+    def callback_counter(self, name, help_text, func):
+        return self._add(CallbackCounter(self.prefix + name, help_text, func))
+
+    def gauge(self, name, help_text, labelnames=(), func=None):
+        return self._add(Gauge(self.prefix + name, help_text, labelnames, func))
+
+    def histogram(self, name, help_text, labelnames=(),
+                  buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(self.prefix + name, help_text, labelnames,
+                                   buckets))
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text format
+        """
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves a registry at http://host:port/metrics from a background thread
+    """
+
+    def __init__(self, registry, port=9100, host="127.0.0.1"):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the HTTP server thread
+        """
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type",
+                                 "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        print("Metrics at: http://{}:{}/metrics".format(self.host, self.port))
+
+    def stop(self):
+        """
+        Shuts down the HTTP server
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
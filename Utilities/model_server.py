@@ -0,0 +1,457 @@
+#!/usr/bin/env python
+"""
+Model Server
+
+Starting a program that uses the Edge Impulse runner means starting the .eim
+model process and loading the model before the first frame can be classified.
+The model server is a long-running process that keeps models loaded, so that
+programs which are restarted often (or several programs at once) can attach to
+an already loaded model in a few milliseconds.
+
+Start the server once (optionally with models to load right away, and
+--socket to listen somewhere other than socket_path below):
+
+    python model_server.py modelfile.eim
+
+Programs connect over a Unix socket with ModelClient (or open_runner(...,
+server=socket_path) from inference_backend.py), which has the same methods as
+the .eim runner:
+
+    runner = ModelClient("modelfile.eim")
+    model_info = runner.init()
+    print(runner.format_attach())
+    features, cropped = runner.get_features_from_image(img)
+    res = runner.classify(features)
+    runner.stop()
+
+Models are kept by path and SHA-256 hash of the file (and by backend and int8
+mode), so replacing a model file loads the new model on the next attach. The
+old one keeps serving the clients already attached to it, and is stopped when
+the last one disconnects. Loading a model does not hold up clients of other
+models. .eim, .tflite and .onnx models are supported (see
+inference_backend.py); the backend is picked from the file extension unless
+the client asks for one. Requests and responses are JSON, one per
+line. The server prints how long each cold load took, and the client reports
+whether its attach was cold (model loaded for it) or warm (already loaded).
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import cv2
+from inference_backend import crop_and_resize, open_runner
+
+# Settings
+socket_path = "/tmp/ei-model-server.sock"   # Where the server listens
+preload_models = []                     # Model files to load at start
+
+# Backend used for each model file extension
+BACKEND_FOR_EXTENSION = {".eim": "eim", ".tflite": "tflite", ".onnx": "onnx"}
+
+################################################################################
+# Functions
+
+def backend_for_file(model_path):
+    """
+    Returns the inference backend for a model file, from its extension
+    """
+    extension = os.path.splitext(model_path)[1].lower()
+    if extension not in BACKEND_FOR_EXTENSION:
+        raise ValueError("Unsupported model file: " + model_path)
+    return BACKEND_FOR_EXTENSION[extension]
+
+
+def file_hash(path):
+    """
+    Returns the SHA-256 hash of a file as a hex string
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+################################################################################
+# Classes
+
+class _LoadedModel:
+    """
+    A runner loaded by the server and shared by every client attached to it.
+    The lock makes clients take turns, since a runner classifies one sample
+    at a time.
+    """
+
+    def __init__(self, path, digest, backend, int8):
+        self.path = path
+        self.digest = digest
+        self.backend = backend
+        self.int8 = int8
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.error = None
+        self.runner = None
+        self.model_info = None
+        self.load_ms = None
+        self.attaches = 0
+        self.clients = 0
+        self.retired = False
+
+    def load(self):
+        """
+        Starts the runner and loads the model (other clients of the same
+        model wait on ready)
+        """
+        start = time.perf_counter()
+        try:
+            runner = open_runner(self.path, self.backend, int8=self.int8)
+            try:
+                self.model_info = runner.init()
+            except Exception:
+                runner.stop()
+                raise
+            self.runner = runner
+            self.load_ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+
+    def stop(self):
+        """
+        Stops the runner
+        """
+        with self.lock:
+            if self.runner is not None:
+                self.runner.stop()
+                self.runner = None
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves loaded models on a Unix socket, one thread per client
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        self._models = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+        # Remove a socket left behind by a server that did not shut down
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, _ClientHandler)
+
+    def _hash(self, path):
+        """
+        Returns the hash of a model file (re-hashed only when the file's size
+        or modification time changes)
+        """
+        st = os.stat(path)
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        digest = file_hash(path)
+        with self._lock:
+            self._hashes[path] = (stamp, digest)
+        return digest
+
+    def load(self, path, backend=None, int8=False):
+        """
+        Attaches a client to the model for path (loading it if needed) and
+        returns the model and True if it had to be loaded (cold) or False if
+        it was already loaded (warm). Call detach() when the client is done.
+        """
+        path = os.path.realpath(path)
+        if backend is None:
+            backend = backend_for_file(path)
+        digest = self._hash(path)
+        key = (path, digest, backend, bool(int8))
+        retired = []
+        with self._lock:
+            model = self._models.get(key)
+            cold = model is None
+            if cold:
+
+                # Retire older versions of the same file. They keep running
+                # until their last client detaches.
+                for old_key in [k for k in self._models
+                                if k[0] == path and k[1] != digest]:
+                    old_model = self._models.pop(old_key)
+                    old_model.retired = True
+                    if old_model.clients == 0:
+                        retired.append(old_model)
+                model = _LoadedModel(path, digest, backend, bool(int8))
+                self._models[key] = model
+            model.clients += 1
+            model.attaches += 1
+        for old_model in retired:
+            old_model.stop()
+
+        # Load outside the server lock, so other clients are not held up.
+        # Clients of the same model wait until it is ready.
+        if cold:
+            model.load()
+            if model.error is None:
+                print("Loaded {} ({}, {}) in {:.1f} ms".format(path,
+                                                               digest[:12],
+                                                               backend,
+                                                               model.load_ms))
+        else:
+            model.ready.wait()
+        if model.error is not None:
+            with self._lock:
+                if self._models.get(key) is model:
+                    del self._models[key]
+            self.detach(model)
+            raise model.error
+        return model, cold
+
+    def detach(self, model):
+        """
+        Detaches a client from model, and stops the model if it was retired
+        and this was its last client
+        """
+        with self._lock:
+            model.clients -= 1
+            retire = model.retired and model.clients == 0
+        if retire:
+            model.stop()
+
+    def list_models(self):
+        """
+        Returns a summary of the loaded models
+        """
+        with self._lock:
+            return [{"path": m.path,
+                     "hash": m.digest,
+                     "backend": m.backend,
+                     "int8": m.int8,
+                     "load_ms": m.load_ms,
+                     "attaches": m.attaches,
+                     "clients": m.clients} for m in self._models.values()]
+
+    def stop_models(self):
+        """
+        Stops all loaded runners
+        """
+        with self._lock:
+            models = list(self._models.values())
+            self._models.clear()
+        for model in models:
+            model.stop()
+
+
+class _ClientHandler(socketserver.StreamRequestHandler):
+    """
+    Handles the requests of one client until it disconnects
+    """
+
+    def handle(self):
+        model = None
+        try:
+            for line in self.rfile:
+                model = self._handle_request(line, model)
+        finally:
+            if model is not None:
+                self.server.detach(model)
+
+    def _handle_request(self, line, model):
+        """
+        Answers one request line and returns the client's (new) model
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            response = {"id": request_id, "success": True}
+            cmd = request["cmd"]
+            if cmd.startswith("classify") and model is None:
+                raise RuntimeError("No model loaded (send load first)")
+            if cmd == "load":
+                new_model, cold = self.server.load(request["path"],
+                                                   request.get("backend"),
+                                                   request.get("int8", False))
+                if model is not None:
+                    self.server.detach(model)
+                model = new_model
+                response.update(model_info=model.model_info,
+                                hash=model.digest,
+                                cold=cold,
+                                load_ms=model.load_ms)
+            elif cmd == "classify":
+                with model.lock:
+                    response["result"] = model.runner.classify(
+                        request["features"])
+            elif cmd == "classify_batch":
+                with model.lock:
+                    response["results"] = [model.runner.classify(row)
+                                           for row in request["batch"]]
+            elif cmd == "list":
+                response["models"] = self.server.list_models()
+            else:
+                raise ValueError("Unknown command: " + str(cmd))
+        except Exception as e:
+            response = {"id": request_id,
+                        "success": False,
+                        "error": "{}: {}".format(type(e).__name__, e)}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+        return model
+
+
+class ModelClient:
+    """
+    Classifies with a model held by the model server. Has the same methods as
+    the .eim runner, so it can be used in its place.
+    """
+
+    def __init__(self, model_path, socket_path=socket_path, backend=None,
+                 int8=False):
+        self.model_path = os.path.abspath(model_path)
+        self.socket_path = socket_path
+        self.backend = backend
+        self.int8 = int8
+        self._sock = None
+        self._file = None
+        self._next_id = 0
+        self.model_info = None
+        self.attach_ms = None
+        self.cold = None
+        self.load_ms = None
+
+    def _request(self, cmd, **kwargs):
+        """
+        Sends one request and returns the response
+        """
+        self._next_id += 1
+        kwargs.update(id=self._next_id, cmd=cmd)
+        self._file.write(json.dumps(kwargs).encode() + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Model server closed the connection")
+        response = json.loads(line)
+        if not response["success"]:
+            raise RuntimeError(response["error"])
+        return response
+
+    def init(self):
+        """
+        Connects to the server, asks it for the model (loading it if needed)
+        and returns the model information
+        """
+        start = time.perf_counter()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(self.socket_path)
+        self._file = self._sock.makefile("rwb")
+        response = self._request("load",
+                                 path=self.model_path,
+                                 backend=self.backend,
+                                 int8=self.int8)
+        self.attach_ms = (time.perf_counter() - start) * 1000
+        self.cold = response["cold"]
+        self.load_ms = response["load_ms"]
+        self.model_info = response["model_info"]
+        return self.model_info
+
+    def format_attach(self):
+        """
+        Returns a one-line summary of how long attaching took
+        """
+        if self.cold:
+            return "Attached in {:.1f} ms (cold: model loaded in {:.1f} ms)" \
+                .format(self.attach_ms, self.load_ms)
+        return "Attached in {:.1f} ms (warm: model already loaded)".format(
+            self.attach_ms)
+
+    def classify(self, features):
+        """
+        Classifies one set of features (list or NumPy array)
+        """
+        if hasattr(features, "tolist"):
+            features = features.tolist()
+        return self._request("classify", features=features)["result"]
+
+    def classify_batch(self, batch):
+        """
+        Classifies every row of batch with a single request
+        """
+        rows = [row.tolist() if hasattr(row, "tolist") else row
+                for row in batch]
+        return self._request("classify_batch", batch=rows)["results"]
+
+    def get_features_from_image(self, img):
+        """
+        Crops and resizes a camera frame (BGR in memory, like Picamera2
+        "RGB888" frames) to the model input and returns the features as packed
+        0xRRGGBB pixels (the .eim image format, also accepted by the
+        in-process backends) and the cropped image
+        """
+        params = self.model_info['model_parameters']
+        cropped = crop_and_resize(img,
+                                  params['image_input_width'],
+                                  params['image_input_height'])
+        if params['image_channel_count'] == 1:
+            gray = cv2.cvtColor(cropped, cv2.COLOR_BGR2GRAY).astype("int32")
+            packed = gray * 0x010101
+        else:
+            pixels = cropped.astype("int32")
+            packed = (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | \
+                pixels[..., 2]
+        return packed.reshape(-1).tolist(), cropped
+
+    def stop(self):
+        """
+        Disconnects from the server (the model stays loaded there)
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+################################################################################
+# Main
+
+if __name__ == "__main__":
+    from headless import ShutdownFlag
+
+    # Command line overrides the settings
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == "--socket":
+        socket_path = args[1]
+        args = args[2:]
+    if args:
+        preload_models = args
+
+    shutdown = ShutdownFlag()
+    server = ModelServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    try:
+        for model_file in preload_models:
+            server.load(model_file)
+        thread.start()
+        print("Model server listening on", socket_path)
+        while not shutdown.is_set():
+            time.sleep(0.2)
+    finally:
+        if thread.is_alive():
+            server.shutdown()
+        server.server_close()
+        server.stop_models()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        print("Model server stopped")
@@ -0,0 +1,103 @@
+"""
+Motion Gate
+
+Decides whether a frame is worth running an object detector on. A small
+grayscale copy of each frame is compared against a running-average background.
+If the fraction of pixels that changed by more than pixel_threshold is at least
+motion_threshold, the frame counts as motion and the detector should run. With
+no motion, the previous detections can be reused. The detector is still run at
+least once every keep_alive seconds so results never go stale for too long.
+
+Example:
+
+    gate = MotionGate(motion_threshold=0.01, keep_alive=5.0)
+    if gate.update(img):
+        res = runner.classify(features)
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import time
+import cv2
+import numpy as np
+
+################################################################################
+# Classes
+
+class MotionGate:
+    """
+    Running-average background model on a downscaled grayscale frame
+    """
+
+    def __init__(self, motion_threshold=0.01, keep_alive=5.0,
+                 pixel_threshold=25, learning_rate=0.05, downscale_width=64,
+                 color_conversion=cv2.COLOR_RGB2GRAY):
+        self.motion_threshold = motion_threshold
+        self.keep_alive = keep_alive
+        self.pixel_threshold = pixel_threshold
+        self.learning_rate = learning_rate
+        self.downscale_width = downscale_width
+        self.color_conversion = color_conversion
+
+        # Background model and reusable buffers (allocated on first frame)
+        self._small = None
+        self._background = None
+        self._diff = None
+        self._last_run = None
+
+        # Statistics
+        self.motion = 0.0
+        self.frames_run = 0
+        self.frames_skipped = 0
+
+    def _downscale(self, img):
+        """
+        Returns a small grayscale float32 copy of img in a reused buffer
+        """
+        height, width = img.shape[:2]
+        size = (self.downscale_width,
+                max(1, round(height * self.downscale_width / width)))
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, self.color_conversion)
+        small = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+        if self._small is None or self._small.shape != small.shape:
+            self._small = np.empty(small.shape, dtype=np.float32)
+            self._background = None
+        np.copyto(self._small, small)
+        return self._small
+
+    def update(self, img):
+        """
+        Updates the background with img. Returns True if the detector should
+        run on this frame (motion, first frame, or keep-alive timeout).
+        """
+        small = self._downscale(img)
+        now = time.monotonic()
+
+        # The first frame becomes the background
+        if self._background is None:
+            self._background = small.copy()
+            self._diff = np.empty_like(small)
+            self.motion = 1.0
+        else:
+
+            # Fraction of pixels that differ from the background
+            cv2.absdiff(small, self._background, dst=self._diff)
+            self.motion = float(np.count_nonzero(
+                self._diff > self.pixel_threshold)) / self._diff.size
+
+            # Slowly blend this frame into the background
+            cv2.accumulateWeighted(small, self._background, self.learning_rate)
+
+        # Run on motion or when the keep-alive interval has passed
+        run = (self.motion >= self.motion_threshold or
+               self._last_run is None or
+               now - self._last_run >= self.keep_alive)
+        if run:
+            self._last_run = now
+            self.frames_run += 1
+        else:
+            self.frames_skipped += 1
+        return run
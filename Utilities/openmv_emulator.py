@@ -0,0 +1,660 @@
+"""
+OpenMV Emulator
+
+Runs the OpenMV programs in this repository on a regular computer, so they can
+be timed, profiled and tested without a board. It provides stand-ins for the
+parts of the OpenMV sensor, image, tf and time modules that the programs use:
+
+    sensor      reset(), set_pixformat(), set_framesize(), set_windowing(),
+                skip_frames(), snapshot(), width(), height()
+    image       Image(), get_pixel(), set_pixel(), copy(roi=...),
+                draw_rectangle(), draw_string(), draw_line(), save(),
+                bytearray()
+    tf          classify(), load() (runs the .tflite model with the TFLite
+                interpreter from tflite_runtime or tensorflow)
+    time        clock() (with tick(), fps() and avg()), ticks_ms(),
+                ticks_us(), ticks_diff(), sleep_ms(), sleep_us(), plus the
+                normal Python time functions
+    gc          mem_alloc(), mem_free() (Python heap use measured with
+                tracemalloc when trace_memory=True), plus the normal gc
+                functions
+
+Frames come from a ReplaySource (a video, folder of images, .zip of images or
+.npy stack), scaled to the chosen frame size and cropped by set_windowing()
+like the camera does. Grayscale images are stored as 8-bit pixels. RGB565
+images are stored as 8-bit R, G, B (the 16-bit packing is not emulated).
+
+The program runs with a temporary folder as the SD card: files next to the
+program (e.g. trained.tflite and labels.txt) are copied into it, and paths
+starting with "/" are redirected into it.
+
+The emulated modules are only visible to the program itself (through its own
+import function): the sensor, image and tf modules are also importable from
+other modules during the run, but os, time and gc in sys.modules stay the real
+ones, so libraries imported while the program runs are not affected.
+
+Every emulated call is counted (e.g. get_pixel, set_pixel, copy, model loads,
+bytes allocated), so you can compare how much work different versions of a
+program do per frame. Timings are for your computer, not for the board.
+
+Settings at the top of a program can be changed for a run without editing the
+file, e.g. settings={"fast_copy": False}.
+
+Example:
+
+    stats = run_script("dnn-live-inference.py", "Datasets/dog.zip", 100)
+    print(format_stats(stats))
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import builtins
+import collections
+import os
+import re
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import time as _time
+import types
+import gc as _gc
+import cv2
+import numpy as np
+from frame_source import ReplaySource
+
+# Pixel formats (same values as on the board)
+RGB565 = 1
+GRAYSCALE = 2
+
+# Frame sizes (width, height)
+FRAME_SIZES = {
+    "QQQVGA": (80, 60),
+    "QQVGA": (160, 120),
+    "QVGA": (320, 240),
+    "VGA": (640, 480),
+    "B64X64": (64, 64),
+    "B128X128": (128, 128),
+    "B160X160": (160, 160),
+    "B320X320": (320, 320),
+}
+
+# Call counters shared by all emulated modules
+counts = collections.Counter()
+
+# Folder on this computer that acts as the SD card (while a program runs)
+_sd_root = None
+
+################################################################################
+# Functions
+
+def _gray(color):
+    """
+    Returns the grayscale value of a color (an int or an (r, g, b) tuple)
+    """
+    if isinstance(color, (tuple, list)):
+        r, g, b = color
+        return int(round(0.299 * r + 0.587 * g + 0.114 * b))
+    return int(color)
+
+
+def _sd_path(path):
+    """
+    Maps a board path ("/" is the root of the SD card) to a path on this
+    computer
+    """
+    path = str(path)
+    if _sd_root is not None and path.startswith("/"):
+        return os.path.join(_sd_root, path.lstrip("/"))
+    return path
+
+
+def _load_interpreter(path):
+    """
+    Returns a TFLite interpreter for the model at path
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow
+        Interpreter = tensorflow.lite.Interpreter
+    interpreter = Interpreter(model_path=path)
+    interpreter.allocate_tensors()
+    return interpreter
+
+################################################################################
+# Classes
+
+class EmulationFinished(BaseException):
+    """
+    Raised by snapshot() when the requested number of frames has been run.
+    (A BaseException, so a program's "except Exception" does not catch it.)
+    """
+    pass
+
+
+class Image:
+    """
+    Stand-in for the OpenMV image.Image class, backed by a NumPy array
+    """
+
+    def __init__(self, arg, height=None, pixformat=GRAYSCALE,
+                 copy_to_fb=False):
+        if isinstance(arg, np.ndarray):
+            self._pixels = arg
+        elif isinstance(arg, str):
+            img = cv2.imread(_sd_path(arg), cv2.IMREAD_UNCHANGED)
+            if img is None:
+                raise OSError("Could not read image: " + arg)
+            if img.ndim == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            self._pixels = img
+        else:
+            shape = (height, arg)
+            if pixformat != GRAYSCALE:
+                shape = (height, arg, 3)
+            self._pixels = np.zeros(shape, dtype=np.uint8)
+            counts["bytes_allocated"] += self._pixels.nbytes
+        counts["image_new"] += 1
+
+    def width(self):
+        return self._pixels.shape[1]
+
+    def height(self):
+        return self._pixels.shape[0]
+
+    def format(self):
+        return GRAYSCALE if self._pixels.ndim == 2 else RGB565
+
+    def size(self):
+        return self._pixels.nbytes
+
+    def get_pixel(self, x, y, rgbtuple=True):
+        counts["get_pixel"] += 1
+        if not (0 <= x < self.width() and 0 <= y < self.height()):
+            return None
+        value = self._pixels[y, x]
+        if self._pixels.ndim == 2:
+            return int(value)
+        return tuple(int(v) for v in value)
+
+    def set_pixel(self, x, y, color):
+        counts["set_pixel"] += 1
+        if not (0 <= x < self.width() and 0 <= y < self.height()):
+            return self
+        if self._pixels.ndim == 2:
+            self._pixels[y, x] = _gray(color)
+        else:
+            self._pixels[y, x] = color if isinstance(color, tuple) else \
+                (color, color, color)
+        return self
+
+    def copy(self, roi=None, copy_to_fb=False, **kwargs):
+        """
+        Returns a new image holding roi (x, y, w, h) or the whole image
+        """
+        counts["copy"] += 1
+        pixels = self._pixels
+        if roi is not None:
+            x, y, w, h = roi
+            pixels = pixels[y:(y + h), x:(x + w)]
+        pixels = pixels.copy()
+        counts["bytes_allocated"] += pixels.nbytes
+        return Image(pixels)
+
+    def bytearray(self):
+        """
+        Returns the pixel memory (a writable memoryview on the emulator, a
+        bytearray sharing the image memory on the board)
+        """
+        counts["bytearray"] += 1
+        return memoryview(self._pixels.reshape(-1))
+
+    def _color(self, color):
+        if color is None:
+            color = (255, 255, 255)
+        if self._pixels.ndim == 2:
+            return _gray(color)
+        if not isinstance(color, (tuple, list)):
+            return (color, color, color)
+        return tuple(color)
+
+    def draw_rectangle(self, *args, color=None, thickness=1, fill=False,
+                       **kwargs):
+        counts["draw"] += 1
+        x, y, w, h = args[0] if len(args) == 1 else args[:4]
+        cv2.rectangle(self._pixels,
+                      (int(x), int(y)),
+                      (int(x + w - 1), int(y + h - 1)),
+                      self._color(color),
+                      -1 if fill else thickness)
+        return self
+
+    def draw_line(self, *args, color=None, thickness=1, **kwargs):
+        counts["draw"] += 1
+        x0, y0, x1, y1 = args[0] if len(args) == 1 else args[:4]
+        cv2.line(self._pixels, (int(x0), int(y0)), (int(x1), int(y1)),
+                 self._color(color), thickness)
+        return self
+
+    def draw_string(self, x, y, text, color=None, scale=1.0, **kwargs):
+        counts["draw"] += 1
+        for i, line in enumerate(str(text).split("\n")):
+            cv2.putText(self._pixels,
+                        line,
+                        (int(x), int(y + (i + 1) * 10 * scale)),
+                        cv2.FONT_HERSHEY_PLAIN,
+                        0.8 * scale,
+                        self._color(color))
+        return self
+
+    def save(self, path, **kwargs):
+        counts["save"] += 1
+        img = self._pixels
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        if not cv2.imwrite(_sd_path(path), img):
+            raise OSError("Could not save image: " + path)
+        return self
+
+
+class _Prediction:
+    """
+    Stand-in for the OpenMV tf_classification object
+    """
+
+    def __init__(self, rect, output):
+        self._rect = rect
+        self._output = output
+
+    def rect(self):
+        return self._rect
+
+    def x(self):
+        return self._rect[0]
+
+    def y(self):
+        return self._rect[1]
+
+    def w(self):
+        return self._rect[2]
+
+    def h(self):
+        return self._rect[3]
+
+    def output(self):
+        return self._output
+
+    def classification_output(self):
+        return self._output
+
+
+class Net:
+    """
+    Stand-in for the OpenMV tf_model object returned by tf.load()
+    """
+
+    def __init__(self, path):
+        counts["model_load"] += 1
+        self.interpreter = _load_interpreter(path)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+
+        # A model input is (1, height, width, channels) or (1, pixels)
+        shape = self._input["shape"]
+        if len(shape) == 4:
+            self._height, self._width, self._channels = shape[1:]
+        else:
+            self._height, self._width, self._channels = 1, shape[-1], 1
+
+    def len(self):
+        return int(np.prod(self._input["shape"]))
+
+    def height(self):
+        return int(self._height)
+
+    def width(self):
+        return int(self._width)
+
+    def channels(self):
+        return int(self._channels)
+
+    def classify(self, img, roi=None, **kwargs):
+        """
+        Runs the model on img (or on roi of img) and returns a list with one
+        prediction, like tf.classify() on the board
+        """
+        counts["classify"] += 1
+        pixels = img._pixels
+        if roi is None:
+            roi = (0, 0, img.width(), img.height())
+        x, y, w, h = roi
+        pixels = pixels[y:(y + h), x:(x + w)]
+
+        # Scale the pixels to the model input and match its channels
+        if pixels.shape[:2] != (self._height, self._width):
+            pixels = cv2.resize(pixels, (int(self._width), int(self._height)),
+                                interpolation=cv2.INTER_LINEAR)
+        if self._channels == 1 and pixels.ndim == 3:
+            pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+        elif self._channels == 3 and pixels.ndim == 2:
+            pixels = cv2.cvtColor(pixels, cv2.COLOR_GRAY2RGB)
+
+        # Convert pixels to the model's input type like the board does
+        dtype = self._input["dtype"]
+        if dtype == np.float32:
+            data = pixels.astype(np.float32) / 255.0
+        elif dtype == np.int8:
+            data = (pixels.astype(np.int16) - 128).astype(np.int8)
+        else:
+            data = pixels.astype(dtype)
+        data = data.reshape(self._input["shape"])
+
+        self.interpreter.set_tensor(self._input["index"], data)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self._output["index"])[0]
+
+        # Quantized outputs are turned back into floats
+        scale, zero_point = self._output["quantization"]
+        if scale != 0:
+            output = (output.astype(np.float32) - zero_point) * scale
+        return [_Prediction(roi, [float(v) for v in output.reshape(-1)])]
+
+
+class _Clock:
+    """
+    Stand-in for time.clock()
+    """
+
+    def __init__(self):
+        self._tick_ns = _time.perf_counter_ns()
+        self._frames = 0
+        self._total_ns = 0
+
+    def tick(self):
+        self._tick_ns = _time.perf_counter_ns()
+
+    def fps(self):
+        elapsed_ns = _time.perf_counter_ns() - self._tick_ns
+        self._frames += 1
+        self._total_ns += elapsed_ns
+        return 1e9 / elapsed_ns if elapsed_ns > 0 else 0.0
+
+    def avg(self):
+        if self._frames == 0:
+            return 0.0
+        return self._total_ns / self._frames / 1e6
+
+
+class _Sensor:
+    """
+    Emulated camera that plays frames from a ReplaySource
+    """
+
+    def __init__(self, source, num_frames, show):
+        self.source = source
+        self.num_frames = num_frames
+        self.show = show
+        self.pixformat = RGB565
+        self.framesize = FRAME_SIZES["QVGA"]
+        self.window = None
+        self.frames = 0
+        self.framebuffer = None
+        self.frame_times_ns = []
+        self._last_ns = None
+
+    def reset(self):
+        self.source.configure(self.source.create_video_configuration(
+            main={"size": self.framesize, "format": "RGB888"}))
+        self.source.start()
+
+    def set_pixformat(self, pixformat):
+        self.pixformat = pixformat
+
+    def set_framesize(self, framesize):
+        self.framesize = FRAME_SIZES[framesize]
+        self.reset()
+
+    def set_windowing(self, roi):
+        self.window = tuple(roi)
+
+    def skip_frames(self, n=None, time=None):
+        for _ in range(n or 0):
+            self.source.capture_array()
+
+    def width(self):
+        return self.window[-2] if self.window else self.framesize[0]
+
+    def height(self):
+        return self.window[-1] if self.window else self.framesize[1]
+
+    def snapshot(self):
+        """
+        Returns the next frame (the same framebuffer image every time)
+        """
+        now_ns = _time.perf_counter_ns()
+        if self._last_ns is not None:
+            self.frame_times_ns.append(now_ns - self._last_ns)
+        self._last_ns = now_ns
+
+        # Show the last frame (with anything drawn on it) like the IDE does
+        if self.show and self.framebuffer is not None:
+            img = self.framebuffer._pixels
+            if img.ndim == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+            cv2.imshow("OpenMV", img)
+            cv2.waitKey(1)
+
+        if self.frames >= self.num_frames:
+            raise EmulationFinished()
+        self.frames += 1
+        counts["snapshot"] += 1
+
+        # ReplaySource "RGB888" frames are laid out B, G, R
+        img = self.source.capture_array()
+        if self.pixformat == GRAYSCALE:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        else:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+        # Crop the window (a (w, h) window is centered, like the sensor does)
+        if self.window is not None:
+            if len(self.window) == 2:
+                w, h = self.window
+                x = (img.shape[1] - w) // 2
+                y = (img.shape[0] - h) // 2
+            else:
+                x, y, w, h = self.window
+            img = img[y:(y + h), x:(x + w)]
+        img = np.ascontiguousarray(img)
+
+        if self.framebuffer is None:
+            self.framebuffer = Image(img)
+        else:
+            self.framebuffer._pixels = img
+        return self.framebuffer
+
+################################################################################
+# Emulation
+
+def _make_modules(camera):
+    """
+    Returns emulated sensor, image, tf, time and os modules
+    """
+    sensor = types.ModuleType("sensor")
+    sensor.RGB565 = RGB565
+    sensor.GRAYSCALE = GRAYSCALE
+    for name in FRAME_SIZES:
+        setattr(sensor, name, name)
+    for name in ("reset", "set_pixformat", "set_framesize", "set_windowing",
+                 "skip_frames", "snapshot", "width", "height"):
+        setattr(sensor, name, getattr(camera, name))
+
+    image = types.ModuleType("image")
+    image.Image = Image
+
+    tf = types.ModuleType("tf")
+    tf.load = lambda path, load_to_fb=False: Net(_sd_path(path))
+
+    def classify(model, img, roi=None, **kwargs):
+        # A path means the model is loaded (parsed) again on every call
+        if isinstance(model, str):
+            model = Net(_sd_path(model))
+        return model.classify(img, roi, **kwargs)
+    tf.classify = classify
+
+    # Board time functions on top of the normal Python time module
+    time = types.ModuleType("time")
+    time.__dict__.update(_time.__dict__)
+    time.clock = _Clock
+    time.ticks_ms = lambda: _time.perf_counter_ns() // 1000000
+    time.ticks_us = lambda: _time.perf_counter_ns() // 1000
+    time.ticks_diff = lambda a, b: a - b
+    time.sleep_ms = lambda ms: _time.sleep(ms / 1000)
+    time.sleep_us = lambda us: _time.sleep(us / 1000000)
+
+    # File system functions that understand SD card paths
+    board_os = types.ModuleType("os")
+    board_os.__dict__.update(os.__dict__)
+    for name in ("listdir", "mkdir", "remove", "rmdir", "stat"):
+        func = getattr(os, name)
+        setattr(board_os, name,
+                lambda path="", *args, _func=func: _func(_sd_path(path) or ".",
+                                                         *args))
+    board_os.rename = lambda a, b: os.rename(_sd_path(a), _sd_path(b))
+
+    # Heap use (only measured while tracemalloc is tracing)
+    gc = types.ModuleType("gc")
+    gc.__dict__.update(_gc.__dict__)
+    gc.mem_alloc = lambda: tracemalloc.get_traced_memory()[0]
+    gc.mem_free = lambda: 0
+
+    return {"sensor": sensor, "image": image, "tf": tf, "time": time,
+            "os": board_os, "gc": gc}
+
+
+def _apply_settings(source, settings):
+    """
+    Returns the program source with each "name = value" settings line
+    replaced by the value from settings
+    """
+    for name, value in settings.items():
+        pattern = r"^" + re.escape(name) + r"\s*=[^#\n]*"
+        source, found = re.subn(pattern, name + " = " + repr(value) + " ",
+                                source, count=1, flags=re.MULTILINE)
+        if found == 0:
+            raise ValueError("Setting not found in program: " + name)
+    return source
+
+
+def run_script(script_path, frame_source, num_frames=100, sd_root=None,
+               show=False, settings=None, sd_files=(), trace_memory=False):
+    """
+    Runs an OpenMV program for num_frames snapshots with frames from
+    frame_source, with any settings replaced. Files in sd_files are copied to
+    the SD card as well. Returns a dictionary of timing and call counts (and
+    the peak Python heap use if trace_memory is True).
+    """
+    script_path = os.path.abspath(script_path)
+    counts.clear()
+    with open(script_path) as f:
+        code = compile(_apply_settings(f.read(), settings or {}),
+                       script_path,
+                       "exec")
+
+    # Use a temporary SD card with the files that sit next to the program
+    temp_dir = None
+    if sd_root is None:
+        temp_dir = tempfile.mkdtemp(prefix="openmv-sd-")
+        sd_root = temp_dir
+        script_dir = os.path.dirname(script_path)
+        for name in os.listdir(script_dir):
+            if not name.endswith(".py") and \
+                    os.path.isfile(os.path.join(script_dir, name)):
+                shutil.copy(os.path.join(script_dir, name), sd_root)
+    for path in sd_files:
+        shutil.copy(path, sd_root)
+    global _sd_root
+    _sd_root = os.path.abspath(sd_root)
+
+    source = ReplaySource(frame_source)
+    camera = _Sensor(source, num_frames, show)
+    modules = _make_modules(camera)
+    board_names = ("sensor", "image", "tf")
+    saved_modules = {name: sys.modules.get(name) for name in board_names}
+    saved_cwd = os.getcwd()
+
+    def board_open(path, *args, **kwargs):
+        return open(_sd_path(path), *args, **kwargs)
+
+    def board_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in modules:
+            return modules[name]
+        return builtins.__import__(name, globals, locals, fromlist, level)
+
+    # Builtins for the program only: its imports and open() see the board
+    board_builtins = dict(builtins.__dict__)
+    board_builtins["__import__"] = board_import
+    board_builtins["open"] = board_open
+
+    # Make the emulated board modules importable while the program runs
+    if trace_memory:
+        tracemalloc.start()
+    start_ns = _time.perf_counter_ns()
+    try:
+        os.chdir(_sd_root)
+        sys.modules.update((name, modules[name]) for name in board_names)
+        exec(code, {"__name__": "__main__",
+                    "__file__": script_path,
+                    "__builtins__": board_builtins})
+    except EmulationFinished:
+        pass
+    finally:
+        elapsed_ns = _time.perf_counter_ns() - start_ns
+        heap_peak = 0
+        if trace_memory:
+            heap_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        os.chdir(saved_cwd)
+        source.close()
+        if show:
+            cv2.destroyAllWindows()
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        _sd_root = None
+
+    # Frame times exclude startup (e.g. skip_frames and the first snapshot)
+    frame_times = sorted(camera.frame_times_ns)
+    median_ms = frame_times[len(frame_times) // 2] / 1e6 if frame_times else 0
+    return {
+        "frames": camera.frames,
+        "elapsed_s": elapsed_ns / 1e9,
+        "median_frame_ms": median_ms,
+        "fps": 1000 / median_ms if median_ms > 0 else 0.0,
+        "counts": dict(counts),
+        "heap_peak_bytes": heap_peak,
+    }
+
+
+def format_stats(stats):
+    """
+    Returns the result of run_script() as printable text
+    """
+    frames = max(1, stats["frames"])
+    lines = ["Frames: {}  median frame time: {:.2f} ms  ({:.1f} FPS)".format(
+        stats["frames"], stats["median_frame_ms"], stats["fps"]),
+        "{:<16} {:>12} {:>12}".format("call", "total", "per frame")]
+    for name, count in sorted(stats["counts"].items()):
+        lines.append("{:<16} {:>12} {:>12.1f}".format(name, count,
+                                                      count / frames))
+    if stats["heap_peak_bytes"]:
+        lines.append("Peak Python heap: {} bytes".format(
+            stats["heap_peak_bytes"]))
+    return "\n".join(lines)
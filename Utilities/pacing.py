@@ -0,0 +1,141 @@
+"""
+Frame Pacing
+
+Runs a loop at a steady target framerate. Instead of measuring how long the
+current frame took and sleeping for the rest of the frame interval (which adds
+up small errors every frame and drifts slower than the target), FramePacer
+keeps a schedule of absolute deadlines from time.monotonic_ns():
+
+    deadline 0: start
+    deadline 1: start + 1 interval
+    deadline 2: start + 2 intervals
+    ...
+
+wait() sleeps until the next deadline. If the loop is running late by more than
+a whole interval, the missed deadlines are skipped (and counted) rather than
+rushed through, so the time between frames stays consistent.
+
+Example:
+
+    pacer = FramePacer(15)
+    while True:
+        img = camera.capture_array()
+        ...
+        cv2.waitKey(1)
+        pacer.wait()
+    print(pacer.format_stats())
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import math
+import time
+
+################################################################################
+# Classes
+
+class FramePacer:
+    """
+    Sleeps until absolute frame deadlines so a loop runs at target_fps without
+    drifting. Keeps statistics on the achieved framerate and jitter.
+    """
+
+    def __init__(self, target_fps):
+        if target_fps <= 0:
+            raise ValueError("target_fps must be greater than 0")
+        self.target_fps = target_fps
+        self.interval_ns = int(round(1e9 / target_fps))
+        self._next_ns = None
+        self._last_ns = None
+
+        # Statistics (Welford's running mean and variance of frame intervals)
+        self.frames = 0
+        self.frames_skipped = 0
+        self._mean_ns = 0.0
+        self._m2 = 0.0
+        self._start_ns = None
+
+    def reset(self):
+        """
+        Starts a new schedule from now (e.g. after a pause)
+        """
+        self._next_ns = None
+        self._last_ns = None
+
+    def remaining(self):
+        """
+        Returns the seconds until the next deadline (negative if late)
+        """
+        if self._next_ns is None:
+            return 0.0
+        return (self._next_ns - time.monotonic_ns()) / 1e9
+
+    def wait(self):
+        """
+        Sleeps until the next deadline. Returns the number of deadlines that
+        were skipped because the loop was running late.
+        """
+        now_ns = time.monotonic_ns()
+
+        # First call starts the schedule
+        if self._next_ns is None:
+            self._next_ns = now_ns + self.interval_ns
+            self._start_ns = now_ns
+            self._last_ns = now_ns
+            return 0
+
+        # Late by a whole interval or more: skip to the next deadline ahead
+        skipped = 0
+        if now_ns >= self._next_ns + self.interval_ns:
+            skipped = (now_ns - self._next_ns) // self.interval_ns
+            self._next_ns += skipped * self.interval_ns
+            self.frames_skipped += skipped
+
+        # Sleep until the deadline
+        sleep_ns = self._next_ns - now_ns
+        if sleep_ns > 0:
+            time.sleep(sleep_ns / 1e9)
+        self._next_ns += self.interval_ns
+
+        # Update interval statistics
+        now_ns = time.monotonic_ns()
+        interval_ns = now_ns - self._last_ns
+        self._last_ns = now_ns
+        self.frames += 1
+        delta = interval_ns - self._mean_ns
+        self._mean_ns += delta / self.frames
+        self._m2 += delta * (interval_ns - self._mean_ns)
+        return skipped
+
+    def stats(self):
+        """
+        Returns a dictionary with the target and achieved framerate, jitter
+        (standard deviation of the frame interval, ms) and skipped frames
+        """
+        achieved_fps = 0.0
+        if self.frames > 0 and self._last_ns > self._start_ns:
+            achieved_fps = self.frames * 1e9 / (self._last_ns - self._start_ns)
+        jitter_ms = 0.0
+        if self.frames > 1:
+            jitter_ms = math.sqrt(self._m2 / (self.frames - 1)) / 1e6
+        return {
+            "target_fps": self.target_fps,
+            "achieved_fps": achieved_fps,
+            "mean_interval_ms": self._mean_ns / 1e6,
+            "jitter_ms": jitter_ms,
+            "frames": self.frames,
+            "frames_skipped": self.frames_skipped,
+        }
+
+    def format_stats(self):
+        """
+        Returns the statistics as a printable line
+        """
+        s = self.stats()
+        return ("FPS: {:.2f} (target {:.2f}), interval {:.2f} ms, "
+                "jitter {:.2f} ms, skipped {} of {} frames").format(
+                    s["achieved_fps"], s["target_fps"], s["mean_interval_ms"],
+                    s["jitter_ms"], s["frames_skipped"],
+                    s["frames"] + s["frames_skipped"])
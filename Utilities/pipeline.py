@@ -0,0 +1,226 @@
+"""
+Staged Frame Pipeline
+
+Runs a live loop as a chain of stages (e.g. capture -> preprocess -> classify)
+where every stage has its own thread and stages are connected by small bounded
+queues. While the model is busy with frame N, the next stage can already be
+preprocessing frame N+1 and the main thread can be drawing frame N-1, so the
+framerate is limited by the slowest stage instead of the sum of all stages.
+OpenCV and the Edge Impulse runner release the GIL while they work, so the
+stages really do run in parallel on a multi-core Pi.
+
+The last stage's output is handed to the main thread with get(), so drawing
+and cv2.imshow() stay in the main thread.
+
+What happens when a queue is full is set by the drop policy:
+
+    "block"         the upstream stage waits (no frames are ever dropped)
+    "drop_oldest"   the oldest queued item is thrown away (freshest wins)
+    "drop_newest"   the new item is thrown away
+
+Example:
+
+    pipeline = Pipeline(capture.capture_array,
+                        [("preprocess", preprocess), ("classify", classify)],
+                        queue_size=2,
+                        drop_policy="drop_oldest")
+    pipeline.start()
+    while True:
+        img, res = pipeline.get()
+        ...
+    pipeline.stop()
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import queue
+import threading
+import time
+
+# Supported queue drop policies
+DROP_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+################################################################################
+# Classes
+
+class _Stage:
+    """
+    Book-keeping for one stage of the pipeline
+    """
+
+    def __init__(self, name, func, out_queue):
+        self.name = name
+        self.func = func
+        self.out_queue = out_queue
+        self.thread = None
+        self.processed = 0
+        self.dropped = 0
+        self.busy_ns = 0
+
+
+class Pipeline:
+    """
+    Runs source() and each stage function in its own thread, connected by
+    bounded queues. A stage may return None to discard an item.
+    """
+
+    def __init__(self, source, stages, queue_size=2, drop_policy="drop_oldest"):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError("drop_policy must be one of " + str(DROP_POLICIES))
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+
+        # The source is treated as stage 0. Each stage writes to its own queue
+        # and reads from the previous stage's queue.
+        self._stages = [_Stage("capture", source, queue.Queue(queue_size))]
+        for name, func in stages:
+            self._stages.append(_Stage(name, func, queue.Queue(queue_size)))
+
+        self._running = False
+        self._error = None
+        self._start_ns = 0
+
+    def start(self):
+        """
+        Start all stage threads
+        """
+        if self._running:
+            return
+        self._running = True
+        self._start_ns = time.perf_counter_ns()
+        for i, stage in enumerate(self._stages):
+            in_queue = self._stages[i - 1].out_queue if i > 0 else None
+            stage.thread = threading.Thread(target=self._run_stage,
+                                            args=(stage, in_queue),
+                                            name="Pipeline-" + stage.name,
+                                            daemon=True)
+            stage.thread.start()
+
+    def stop(self, timeout=1.0):
+        """
+        Stop all stage threads (waits up to timeout seconds for each one)
+        """
+        self._running = False
+        for stage in self._stages:
+            if stage.thread is not None:
+                stage.thread.join(timeout)
+                stage.thread = None
+
+    def _put(self, stage, item):
+        """
+        Put item on the stage's output queue according to the drop policy
+        """
+        out_queue = stage.out_queue
+        if self.drop_policy == "block":
+            while self._running:
+                try:
+                    out_queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+        elif self.drop_policy == "drop_newest":
+            try:
+                out_queue.put_nowait(item)
+            except queue.Full:
+                stage.dropped += 1
+        else:
+            while True:
+                try:
+                    out_queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        out_queue.get_nowait()
+                        stage.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def _run_stage(self, stage, in_queue):
+        """
+        Thread body: pull an item, run the stage function, push the result
+        """
+        try:
+            while self._running:
+
+                # The source takes no input, all other stages read a queue
+                if in_queue is None:
+                    start_ns = time.perf_counter_ns()
+                    item = stage.func()
+                else:
+                    try:
+                        item = in_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    start_ns = time.perf_counter_ns()
+                    item = stage.func(item)
+                stage.busy_ns += time.perf_counter_ns() - start_ns
+
+                # Stages can filter items out by returning None
+                if item is None:
+                    continue
+                stage.processed += 1
+                self._put(stage, item)
+        except Exception as e:
+            self._error = e
+            self._running = False
+
+    def get(self, timeout=None):
+        """
+        Returns the next output of the last stage. Blocks until one is ready
+        (or timeout seconds pass, in which case None is returned). Re-raises
+        any exception thrown inside a stage.
+        """
+        out_queue = self._stages[-1].out_queue
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._error is not None:
+                raise self._error
+            if not self._running:
+                return None
+            wait = 0.1
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return None
+            try:
+                return out_queue.get(timeout=wait)
+            except queue.Empty:
+                pass
+
+    def stats(self):
+        """
+        Returns a list with one dictionary per stage: items processed and
+        dropped, average time per item (ms), occupancy (fraction of wall time
+        the stage was busy) and current depth of its output queue
+        """
+        elapsed_ns = max(1, time.perf_counter_ns() - self._start_ns)
+        stats = []
+        for stage in self._stages:
+            avg_ms = 0.0
+            if stage.processed > 0:
+                avg_ms = stage.busy_ns / stage.processed / 1e6
+            stats.append({
+                "stage": stage.name,
+                "processed": stage.processed,
+                "dropped": stage.dropped,
+                "avg_ms": avg_ms,
+                "occupancy": stage.busy_ns / elapsed_ns,
+                "queue_depth": stage.out_queue.qsize(),
+            })
+        return stats
+
+    def format_stats(self):
+        """
+        Returns the stage statistics as a printable string
+        """
+        lines = []
+        for s in self.stats():
+            lines.append("{:<12} busy: {:5.1f}%  avg: {:6.2f} ms  "
+                         "processed: {}  dropped: {}  queued: {}".format(
+                             s["stage"], s["occupancy"] * 100, s["avg_ms"],
+                             s["processed"], s["dropped"], s["queue_depth"]))
+        return "\n".join(lines)
@@ -0,0 +1,207 @@
+"""
+Stage Profiler
+
+Measures how long each step (stage) of a live loop takes, e.g. capture, rotate,
+color conversion, feature extraction, inference, drawing and display. Every
+measurement is a single time.perf_counter_ns() call, and the last `window`
+samples of each stage are kept in a fixed-size ring so memory use does not
+grow. Percentiles (p50, p90, p99) are only computed when a summary is asked
+for, so the profiler can be left on while the program runs.
+
+Call begin() at the start of a frame (or at the start of a function running in
+another thread), then lap("stage name") right after each step. A lap records
+the time since the previous begin() or lap() in the same thread.
+
+    profiler = StageProfiler()
+    profiler.dump_on_exit("profile.json")
+    while True:
+        profiler.begin()
+        img = camera.capture_array()
+        profiler.lap("capture")
+        ...
+
+The summary also reports the estimated cost of the profiler itself as a
+percentage of the measured time.
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import atexit
+import json
+import threading
+import time
+
+################################################################################
+# Classes
+
+class _StageStats:
+    """
+    Ring of the most recent samples (ns) for one stage
+    """
+
+    def __init__(self, window):
+        self.samples = [0] * window
+        self.index = 0
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class _StageTimer:
+    """
+    Context manager that records the time spent inside a "with" block
+    """
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, time.perf_counter_ns() - self.start_ns)
+
+
+class StageProfiler:
+    """
+    Keeps rolling latency histograms for named stages
+    """
+
+    def __init__(self, window=1000, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._stages = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._laps = 0
+        self._lap_cost_ns = self._calibrate()
+
+    def _calibrate(self, repeats=1000):
+        """
+        Returns the average cost of one lap() in ns (measured on a throwaway
+        stage)
+        """
+        stages = self._stages
+        self._stages = {}
+        self.begin()
+        start_ns = time.perf_counter_ns()
+        for _ in range(repeats):
+            self.lap("calibration")
+        cost_ns = (time.perf_counter_ns() - start_ns) / repeats
+        self._stages = stages
+        self._laps = 0
+        return cost_ns
+
+    def begin(self):
+        """
+        Marks the start of a frame (or of a stage function) in this thread
+        """
+        if self.enabled:
+            self._local.last_ns = time.perf_counter_ns()
+
+    def lap(self, name):
+        """
+        Records the time since the last begin() or lap() in this thread as a
+        sample for stage name
+        """
+        if not self.enabled:
+            return
+        now_ns = time.perf_counter_ns()
+        last_ns = getattr(self._local, "last_ns", now_ns)
+        self._local.last_ns = now_ns
+        self._laps += 1
+        self.record(name, now_ns - last_ns)
+
+    def stage(self, name):
+        """
+        Returns a context manager that times a "with" block as stage name
+        """
+        return _StageTimer(self, name)
+
+    def record(self, name, elapsed_ns):
+        """
+        Adds one sample (in ns) to stage name
+        """
+        if not self.enabled:
+            return
+        stats = self._stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stages.setdefault(name, _StageStats(self.window))
+        stats.samples[stats.index] = elapsed_ns
+        stats.index = (stats.index + 1) % self.window
+        stats.count += 1
+        stats.total_ns += elapsed_ns
+        if elapsed_ns > stats.max_ns:
+            stats.max_ns = elapsed_ns
+
+    def summary(self):
+        """
+        Returns a dictionary with count, mean, p50, p90, p99 and max (ms) for
+        every stage, plus the estimated profiler overhead
+        """
+        stages = {}
+        measured_ns = 0
+        for name, stats in list(self._stages.items()):
+            if stats.count == 0:
+                continue
+            recent = sorted(stats.samples[:min(stats.count, self.window)])
+
+            def percentile(p):
+                index = int(round(p / 100 * (len(recent) - 1)))
+                return recent[index] / 1e6
+
+            stages[name] = {
+                "count": stats.count,
+                "mean_ms": stats.total_ns / stats.count / 1e6,
+                "p50_ms": percentile(50),
+                "p90_ms": percentile(90),
+                "p99_ms": percentile(99),
+                "max_ms": stats.max_ns / 1e6,
+            }
+            measured_ns += stats.total_ns
+
+        overhead_pct = 0.0
+        if measured_ns > 0:
+            overhead_pct = 100 * self._laps * self._lap_cost_ns / measured_ns
+        return {
+            "stages": stages,
+            "profiler_overhead_pct": overhead_pct,
+        }
+
+    def format_summary(self):
+        """
+        Returns the summary as a printable table
+        """
+        summary = self.summary()
+        row = "{:<12} {:>8} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f}"
+        lines = ["{:<12} {:>8} {:>9} {:>9} {:>9} {:>9}".format(
+            "stage", "count", "p50 ms", "p90 ms", "p99 ms", "max ms")]
+        for name, s in summary["stages"].items():
+            lines.append(row.format(name, s["count"], s["p50_ms"], s["p90_ms"],
+                                    s["p99_ms"], s["max_ms"]))
+        lines.append("Profiler overhead: {:.3f}%".format(
+            summary["profiler_overhead_pct"]))
+        return "\n".join(lines)
+
+    def dump_json(self, path):
+        """
+        Writes the summary to a JSON file
+        """
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def dump_on_exit(self, path):
+        """
+        Prints the summary and writes it to path when the program exits
+        """
+        def dump():
+            if self.enabled and self._stages:
+                print(self.format_summary())
+                self.dump_json(path)
+                print("Profile saved to:", path)
+        atexit.register(dump)
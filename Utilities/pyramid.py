@@ -0,0 +1,186 @@
+"""
+Image Pyramid Sliding Window
+
+Runs a fixed-size sliding window over several scaled copies of each frame (an
+image pyramid) so that objects larger or smaller than the window can be found.
+A scale of 0.5 shrinks the frame to half size, so a 96x96 window covers a
+192x192 area of the original frame. Each level is resized once per frame into
+a buffer that is reused from frame to frame.
+
+Scanning every level can multiply the number of classify calls, so the scanner
+enforces a maximum number of windows per frame. Each frame, a share of the
+budget (max_windows divided by the number of levels) goes to the level that has
+waited longest, so no level is starved. The rest goes to levels in order of
+their hit rate (hits per window, the last time they were scanned) plus the
+number of frames since then (ties keep the order given in scales). When a level
+does not fit in its part of the budget, only part of it is scanned and the next
+frame continues where this one stopped, so every window is still visited over a
+few frames.
+
+Example:
+
+    scanner = PyramidScanner(classify_window, [1.0, 0.75, 0.5], 96, 96, 24,
+                             "dog", 0.6, max_windows=36)
+    bboxes = scanner.scan(img)
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import cv2
+import numpy as np
+from sliding_window import grid_size
+
+################################################################################
+# Classes
+
+class _Level:
+    """
+    One level of the pyramid and its reusable resize buffer
+    """
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.buffer = None
+        self.positions = []
+        self.offset = 0
+        self.hit_rate = 0.0
+        self.age = 0
+
+
+class PyramidScanner:
+    """
+    Scans window_width x window_height windows (moved by stride pixels) over
+    each level of an image pyramid. classify(window_img) must return a
+    dictionary of label probabilities.
+    """
+
+    def __init__(self, classify, scales, window_width, window_height, stride,
+                 target_label, target_threshold, max_windows=None,
+                 interpolation=cv2.INTER_AREA):
+        self.classify = classify
+        self.window_width = window_width
+        self.window_height = window_height
+        self.stride = stride
+        self.target_label = target_label
+        self.target_threshold = target_threshold
+        self.max_windows = max_windows
+        self.interpolation = interpolation
+        self._levels = [_Level(scale) for scale in scales]
+        self._frame_shape = None
+
+        # Statistics for the last frame
+        self.windows_evaluated = 0
+        self.windows_total = 0
+
+    def _prepare(self, shape):
+        """
+        (Re)allocate level buffers and window positions for a frame shape
+        """
+        self._frame_shape = shape
+        height, width = shape[:2]
+        for level in self._levels:
+            level_width = int(round(width * level.scale))
+            level_height = int(round(height * level.scale))
+            if level.scale != 1.0:
+                level.buffer = np.empty((level_height, level_width) + shape[2:],
+                                        dtype=np.uint8)
+            num_horizontal, num_vertical = grid_size(level_width,
+                                                     level_height,
+                                                     self.window_width,
+                                                     self.window_height,
+                                                     self.stride)
+            level.positions = [(col * self.stride, row * self.stride)
+                               for row in range(num_vertical)
+                               for col in range(num_horizontal)]
+            level.offset = 0
+        self.windows_total = sum(len(l.positions) for l in self._levels)
+
+    def _take(self, level, count):
+        """
+        Returns the next count window positions of a level (all of them if
+        count covers the level), continuing from where the last call stopped
+        """
+        positions = level.positions
+        if count >= len(positions):
+            return positions
+        start = level.offset % len(positions)
+        level.offset = start + count
+        return (positions[start:] + positions[:start])[:count]
+
+    def _schedule(self):
+        """
+        Returns a list of (level, positions) to scan this frame, trimmed to the
+        window budget
+        """
+        if self.max_windows is None:
+            plan = [(level, level.positions) for level in self._levels]
+        else:
+
+            # Reserve a share of the budget for the level that waited longest
+            budget = self.max_windows
+            share = max(1, budget // len(self._levels))
+            oldest = max(self._levels, key=lambda l: l.age)
+            selected = {oldest: self._take(oldest, min(share, budget))}
+            budget -= len(selected[oldest])
+
+            # Spend the rest on the most promising levels
+            order = sorted(self._levels, key=lambda l: -(l.hit_rate + l.age))
+            for level in order:
+                if budget <= 0:
+                    break
+                taken = selected.get(level, [])
+                count = min(budget, len(level.positions) - len(taken))
+                if count > 0:
+                    selected[level] = taken + self._take(level, count)
+                    budget -= count
+            plan = [(level, positions)
+                    for level, positions in selected.items() if positions]
+
+        # Levels left out this frame become more urgent
+        for level in self._levels:
+            level.age += 1
+        for level, _ in plan:
+            level.age = 0
+        return plan
+
+    def scan(self, img):
+        """
+        Returns (x, y, w, h, prob) boxes, in original frame coordinates, for
+        every scanned window whose target probability meets the threshold
+        """
+        if self._frame_shape != img.shape:
+            self._prepare(img.shape)
+
+        bboxes = []
+        self.windows_evaluated = 0
+        for level, positions in self._schedule():
+
+            # Resize the frame into this level's buffer (once per frame)
+            level_img = img
+            if level.buffer is not None:
+                cv2.resize(img,
+                           (level.buffer.shape[1], level.buffer.shape[0]),
+                           dst=level.buffer,
+                           interpolation=self.interpolation)
+                level_img = level.buffer
+
+            # Classify each window and map hits back to the original frame
+            hits = 0
+            for x, y in positions:
+                window_img = level_img[y:(y + self.window_height),
+                                       x:(x + self.window_width)]
+                predictions = self.classify(window_img)
+                prob = predictions[self.target_label]
+                if prob >= self.target_threshold:
+                    hits += 1
+                    bboxes.append((int(round(x / level.scale)),
+                                   int(round(y / level.scale)),
+                                   int(round(self.window_width / level.scale)),
+                                   int(round(self.window_height / level.scale)),
+                                   prob))
+            level.hit_rate = hits / len(positions)
+            self.windows_evaluated += len(positions)
+
+        return bboxes
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Run OpenMV Program on This Computer
+
+Runs one of the OpenMV programs with the OpenMV emulator (see
+openmv_emulator.py) for a fixed number of frames, then prints the frame time
+and how many times each emulated function was called per frame. Needs the
+TFLite interpreter (pip install tflite-runtime, or tensorflow) for programs
+that use tf.
+
+Set script_path and the other settings below, or give them on the command
+line:
+
+    python run_openmv.py "../1.4.2 - Inference (OpenMV)/dnn-live-inference.py" 100
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os, sys
+from openmv_emulator import run_script, format_stats
+
+# Settings
+dir_path = os.path.dirname(os.path.realpath(__file__))
+script_path = os.path.join(dir_path, "..", "1.4.2 - Inference (OpenMV)",
+                           "dnn-live-inference.py")
+frame_source = os.path.join(dir_path, "..", "Datasets",
+                            "electronic-components-png.zip")
+num_frames = 100                        # Snapshots to run before stopping
+show = False                            # Show the frame buffer in a window
+
+################################################################################
+# Main
+
+# Command line overrides the settings
+if len(sys.argv) > 1:
+    script_path = sys.argv[1]
+if len(sys.argv) > 2:
+    num_frames = int(sys.argv[2])
+
+print("Running:", script_path)
+stats = run_script(script_path, frame_source, num_frames, show=show)
+print(format_stats(stats))
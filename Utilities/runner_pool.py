@@ -0,0 +1,151 @@
+"""
+Edge Impulse Runner Pool
+
+Starts several Edge Impulse runners for the same .eim model so that a batch of
+samples (e.g. all sliding windows in a frame) can be classified on multiple CPU
+cores at once. Every runner starts its own model process, which loads the .eim
+file once and keeps it loaded. The batch is split into one contiguous shard per
+runner, each shard is sent to its runner from a separate thread, and the
+results are returned in the original order.
+
+The pool has a classify_batch() method, so it can be passed anywhere a runner
+is expected by BatchedWindowClassifier (see sliding_window.py). A program that
+already has a runner for the model can pass it in as the first worker, so only
+num_workers - 1 more model processes are started.
+
+Example:
+
+    pool = RunnerPool(model_path, num_workers=4, runner=runner)
+    results = pool.classify_batch(batch)
+    print(pool.format_utilization())
+    pool.stop()
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+################################################################################
+# Classes
+
+class RunnerPool:
+    """
+    A fixed set of num_workers runners (default: one per CPU core) that
+    classify shards of a batch in parallel. If runner (already initialized
+    for the same model) is given, it is the first worker; the pool does not
+    stop it. Not safe to call from more than one thread at a time.
+    """
+
+    def __init__(self, model_path, num_workers=None, runner_class=None,
+                 runner=None):
+        if runner_class is None:
+            from edge_impulse_linux.runner import ImpulseRunner
+            runner_class = ImpulseRunner
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+
+        # Start one model process per worker (except the one passed in)
+        self._shared = runner
+        self._runners = [] if runner is None else [runner]
+        self.model_info = None
+        try:
+            for i in range(len(self._runners), num_workers):
+                runner = runner_class(model_path)
+                self._runners.append(runner)
+                self.model_info = runner.init()
+        except Exception:
+            self.stop()
+            raise
+
+        # One thread per runner to wait on its model process
+        self._executor = ThreadPoolExecutor(max_workers=num_workers,
+                                            thread_name_prefix="RunnerPool")
+
+        # Per-worker statistics
+        self._start_ns = time.perf_counter_ns()
+        self._busy_ns = [0] * num_workers
+        self._samples = [0] * num_workers
+
+    @property
+    def num_workers(self):
+        return len(self._runners)
+
+    def _classify_shard(self, worker, rows):
+        """
+        Runs in a pool thread: classify every row of the shard on one runner
+        """
+        runner = self._runners[worker]
+        start_ns = time.perf_counter_ns()
+        results = [runner.classify(row.tolist()) for row in rows]
+        self._busy_ns[worker] += time.perf_counter_ns() - start_ns
+        self._samples[worker] += len(rows)
+        return results
+
+    def classify_batch(self, batch):
+        """
+        Classifies each row of batch and returns the list of results in the
+        same order as the rows
+        """
+        num_rows = len(batch)
+        num_shards = min(self.num_workers, num_rows)
+        if num_shards == 0:
+            return []
+
+        # Split rows into contiguous, nearly equal shards (one per worker)
+        futures = []
+        start = 0
+        for worker in range(num_shards):
+            end = start + (num_rows - start) // (num_shards - worker)
+            futures.append(self._executor.submit(self._classify_shard,
+                                                 worker,
+                                                 batch[start:end]))
+            start = end
+
+        # Gather results in shard order, which is the original row order
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def classify(self, features):
+        """
+        Classifies a single sample on the first runner
+        """
+        return self._runners[0].classify(features)
+
+    def utilization(self):
+        """
+        Returns a list with one dictionary per worker: samples classified and
+        fraction of wall time its runner was busy
+        """
+        elapsed_ns = max(1, time.perf_counter_ns() - self._start_ns)
+        return [{"worker": i,
+                 "samples": self._samples[i],
+                 "utilization": self._busy_ns[i] / elapsed_ns}
+                for i in range(self.num_workers)]
+
+    def format_utilization(self):
+        """
+        Returns the per-worker statistics as a printable string
+        """
+        return "\n".join("Worker {}: busy: {:5.1f}%  samples: {}".format(
+                             u["worker"], u["utilization"] * 100, u["samples"])
+                         for u in self.utilization())
+
+    def stop(self):
+        """
+        Stops all model processes (except the runner passed in)
+        """
+        if getattr(self, "_executor", None) is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for runner in self._runners:
+            if runner is not self._shared:
+                runner.stop()
+        self._runners = []
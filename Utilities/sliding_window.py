@@ -0,0 +1,281 @@
+"""
+Batched Sliding Window Inference
+
+Helpers for running an image classifier over a grid of windows. Instead of
+cropping each window and calling runner.get_features_from_image() on it, the
+whole frame is converted (grayscale/packed RGB, resized to the model's scale)
+once, and all windows are taken from it as a zero-copy strided view. Features
+for every window are then produced with a single NumPy reshape.
+
+The Edge Impulse .eim runner only classifies one sample per call. If the runner
+has a classify_batch() method (e.g. one of the in-process backends), the whole
+batch is sent in one call. Otherwise the windows are classified one after the
+other, but feature extraction is still done once per frame.
+
+Scores are returned as a dense grid of shape (rows, columns, labels).
+
+CoarseToFineScanner is an alternative for slow models: it scans with a large
+stride first and only re-scans with a small stride around windows that look
+interesting. The large stride must be a multiple of the small one, so every
+window it scans is also one the full small-stride scan would produce.
+
+Example:
+
+    windows = BatchedWindowClassifier(runner, model_info, 96, 96, 24)
+    scores = windows.classify(img)
+    bboxes = windows.to_bboxes(scores, "dog", 0.6)
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+################################################################################
+# Functions
+
+def grid_size(img_width, img_height, window_width, window_height, stride):
+    """
+    Returns the number of (horizontal, vertical) window positions
+    """
+    num_horizontal = (img_width - window_width) // stride + 1
+    num_vertical = (img_height - window_height) // stride + 1
+    return max(0, num_horizontal), max(0, num_vertical)
+
+
+def window_view(img, window_width, window_height, stride):
+    """
+    Returns a read-only strided view of all windows in img with shape
+    (rows, columns, window_height, window_width[, channels]). No pixels are
+    copied.
+    """
+    view = sliding_window_view(img, (window_height, window_width), axis=(0, 1))
+    view = view[::stride, ::stride]
+
+    # sliding_window_view puts the window axes last, move channels back to end
+    if img.ndim == 3:
+        view = np.moveaxis(view, 2, -1)
+    return view
+
+
+def pack_pixels(img, grayscale):
+    """
+    Converts an image to the packed integer pixel format used by Edge Impulse
+    image features (0xRRGGBB per pixel, grayscale is repeated in all 3 bytes)
+    """
+    if grayscale:
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return img.astype(np.int32) * 0x010101
+    img = img.astype(np.int32)
+    return (img[..., 0] << 16) | (img[..., 1] << 8) | img[..., 2]
+
+
+def classify_batch(runner, batch):
+    """
+    Classifies each row of batch and returns a list of results. Uses the
+    runner's classify_batch() if it has one, otherwise calls classify() once
+    per row.
+    """
+    if hasattr(runner, "classify_batch"):
+        return runner.classify_batch(batch)
+    return [runner.classify(row.tolist()) for row in batch]
+
+################################################################################
+# Classes
+
+class BatchedWindowClassifier:
+    """
+    Classifies every window_width x window_height window (moved by stride
+    pixels) in a frame with one feature extraction pass per frame
+    """
+
+    def __init__(self, runner, model_info, window_width, window_height, stride):
+        params = model_info['model_parameters']
+        self.runner = runner
+        self.labels = params['labels']
+        self.input_width = params['image_input_width']
+        self.input_height = params['image_input_height']
+        self.grayscale = params['image_channel_count'] == 1
+        self.window_width = window_width
+        self.window_height = window_height
+        self.stride = stride
+
+        # Windows are resized to the model input by scaling the whole frame
+        # once. Exact when the window already matches the model input size.
+        self.scale_x = self.input_width / window_width
+        self.scale_y = self.input_height / window_height
+
+        # Statistics
+        self.windows_classified = 0
+
+    def features(self, img):
+        """
+        Returns an array with one row of features per window (row-major window
+        order) and the (columns, rows) of the window grid
+        """
+        num_horizontal, num_vertical = grid_size(img.shape[1],
+                                                 img.shape[0],
+                                                 self.window_width,
+                                                 self.window_height,
+                                                 self.stride)
+
+        # Scale the frame so that a window becomes exactly the model input
+        if self.scale_x != 1.0 or self.scale_y != 1.0:
+            img = cv2.resize(img,
+                             (round(img.shape[1] * self.scale_x),
+                              round(img.shape[0] * self.scale_y)),
+                             interpolation=cv2.INTER_AREA)
+
+        # Convert all pixels once, then take every window as a strided view
+        packed = pack_pixels(img, self.grayscale)
+        stride_x = max(1, round(self.stride * self.scale_x))
+        stride_y = max(1, round(self.stride * self.scale_y))
+        view = sliding_window_view(packed,
+                                   (self.input_height, self.input_width))
+        view = view[::stride_y, ::stride_x][:num_vertical, :num_horizontal]
+        num_vertical, num_horizontal = view.shape[:2]
+
+        # Flatten each window into a feature row (the only copy we make)
+        batch = view.reshape(num_vertical * num_horizontal, -1)
+        return batch, (num_horizontal, num_vertical)
+
+    def classify(self, img):
+        """
+        Returns the scores for every window as an array of shape
+        (rows, columns, labels)
+        """
+        batch, (num_horizontal, num_vertical) = self.features(img)
+        results = classify_batch(self.runner, batch)
+        self.windows_classified += len(results)
+
+        # Gather the per-label scores into a dense grid
+        scores = np.empty((len(results), len(self.labels)), dtype=np.float32)
+        for i, res in enumerate(results):
+            predictions = res['result']['classification']
+            for j, label in enumerate(self.labels):
+                scores[i, j] = predictions[label]
+        return scores.reshape(num_vertical, num_horizontal, len(self.labels))
+
+    def to_bboxes(self, scores, label, threshold):
+        """
+        Returns (x, y, w, h, prob) for each window whose score for label is
+        greater than or equal to threshold (in the same order as a row by row
+        scan of the frame)
+        """
+        label_scores = scores[..., self.labels.index(label)]
+        bboxes = []
+        for row, col in np.argwhere(label_scores >= threshold):
+            bboxes.append((int(col) * self.stride,
+                           int(row) * self.stride,
+                           self.window_width,
+                           self.window_height,
+                           float(label_scores[row, col])))
+        return bboxes
+
+
+class CoarseToFineScanner:
+    """
+    Scans the frame with coarse_stride, then scans with fine_stride around
+    every coarse window whose target probability is at least
+    interest_threshold. coarse_stride must be a multiple of fine_stride. The
+    coarse pass also covers the last fine-grid window of each row and column,
+    so windows at the right and bottom edges are always checked.
+    classify(window_img) must return a dictionary of label probabilities.
+    """
+
+    def __init__(self, classify, window_width, window_height, coarse_stride,
+                 fine_stride, target_label, target_threshold,
+                 interest_threshold):
+        if fine_stride < 1 or coarse_stride % fine_stride != 0:
+            raise ValueError("coarse_stride must be a multiple of fine_stride")
+        self.classify = classify
+        self.window_width = window_width
+        self.window_height = window_height
+        self.coarse_stride = coarse_stride
+        self.fine_stride = fine_stride
+        self.target_label = target_label
+        self.target_threshold = target_threshold
+        self.interest_threshold = interest_threshold
+
+        # Statistics for the last frame
+        self.windows_evaluated = 0
+        self.windows_exhaustive = 0
+
+    def _positions(self, img_width, img_height, stride, x0=0, y0=0,
+                   x1=None, y1=None):
+        """
+        Returns the (x, y) window positions on the stride grid that fit in the
+        image and lie within [x0, x1] and [y0, y1]
+        """
+        max_x = img_width - self.window_width
+        max_y = img_height - self.window_height
+        x1 = max_x if x1 is None else min(x1, max_x)
+        y1 = max_y if y1 is None else min(y1, max_y)
+        x0 = -(-max(0, x0) // stride) * stride
+        y0 = -(-max(0, y0) // stride) * stride
+        return [(x, y)
+                for y in range(y0, y1 + 1, stride)
+                for x in range(x0, x1 + 1, stride)]
+
+    def scan(self, img):
+        """
+        Returns (x, y, w, h, prob) for every evaluated window whose target
+        probability meets the threshold, in row by row order
+        """
+        img_height, img_width = img.shape[:2]
+        scores = {}
+
+        def evaluate(x, y):
+            if (x, y) not in scores:
+                window_img = img[y:(y + self.window_height),
+                                 x:(x + self.window_width)]
+                predictions = self.classify(window_img)
+                scores[(x, y)] = predictions[self.target_label]
+            return scores[(x, y)]
+
+        # Coarse pass over the whole frame, plus the last fine-grid window of
+        # each row and column (which the coarse grid may step over)
+        max_x = img_width - self.window_width
+        max_y = img_height - self.window_height
+        last_x = max_x - max_x % self.fine_stride
+        last_y = max_y - max_y % self.fine_stride
+        xs = sorted(set(range(0, max_x + 1, self.coarse_stride)) | {last_x})
+        ys = sorted(set(range(0, max_y + 1, self.coarse_stride)) | {last_y})
+        interesting = []
+        for y in ys:
+            for x in xs:
+                if evaluate(x, y) >= self.interest_threshold:
+                    interesting.append((x, y))
+
+        # Fine pass in the neighborhood of each interesting coarse window
+        reach = self.coarse_stride - 1
+        for cx, cy in interesting:
+            for x, y in self._positions(img_width, img_height,
+                                        self.fine_stride,
+                                        cx - reach, cy - reach,
+                                        cx + reach, cy + reach):
+                evaluate(x, y)
+
+        # Report how much work we saved compared to a full fine scan
+        num_horizontal, num_vertical = grid_size(img_width,
+                                                 img_height,
+                                                 self.window_width,
+                                                 self.window_height,
+                                                 self.fine_stride)
+        self.windows_evaluated = len(scores)
+        self.windows_exhaustive = num_horizontal * num_vertical
+
+        # Boxes in the same order as a row by row scan of the frame
+        bboxes = []
+        for (x, y) in sorted(scores, key=lambda p: (p[1], p[0])):
+            if scores[(x, y)] >= self.target_threshold:
+                bboxes.append((x,
+                               y,
+                               self.window_width,
+                               self.window_height,
+                               scores[(x, y)]))
+        return bboxes
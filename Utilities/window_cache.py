@@ -0,0 +1,101 @@
+"""
+Window Score Cache
+
+With a still camera, most sliding windows see (nearly) the same pixels from one
+frame to the next, so classifying them again gives the same answer. This cache
+remembers the last prediction for each window position together with a tiny
+thumbnail (e.g. 8x8 pixels) of the window. If the new thumbnail differs from the
+stored one by less than change_threshold (mean absolute difference in pixel
+values, 0-255), the cached prediction is reused instead of running the model.
+
+A cached prediction is never reused more than max_age frames in a row, so every
+window is re-classified periodically even if it looks unchanged.
+
+Example:
+
+    cache = WindowScoreCache(change_threshold=4.0, max_age=30)
+    predictions = cache.classify((x, y), window_img, classify_window)
+    print(cache.hits, cache.misses)
+
+Author: EdgeImpulse, Inc.
+Date: October 17, 2026
+License: Apache-2.0 (apache.org/licenses/LICENSE-2.0)
+"""
+
+import cv2
+import numpy as np
+
+################################################################################
+# Classes
+
+class _Entry:
+    """
+    Cached result for one window position
+    """
+
+    def __init__(self, thumbnail, predictions):
+        self.thumbnail = thumbnail
+        self.predictions = predictions
+        self.age = 0
+
+
+class WindowScoreCache:
+    """
+    Reuses a window's last prediction while its downsampled pixels stay within
+    change_threshold of the pixels that were classified
+    """
+
+    def __init__(self, change_threshold=4.0, max_age=30, thumbnail_size=8):
+        self.change_threshold = change_threshold
+        self.max_age = max_age
+        self.thumbnail_size = thumbnail_size
+        self._entries = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def thumbnail(self, window_img):
+        """
+        Returns a small int16 copy of the window used to detect changes
+        """
+        thumbnail = cv2.resize(window_img,
+                               (self.thumbnail_size, self.thumbnail_size),
+                               interpolation=cv2.INTER_AREA)
+        return thumbnail.astype(np.int16)
+
+    def classify(self, key, window_img, classify):
+        """
+        Returns the predictions for the window at key (e.g. its (x, y)
+        position). Calls classify(window_img) only if the window changed, has
+        not been seen before, or its cached result is too old.
+        """
+        thumbnail = self.thumbnail(window_img)
+        entry = self._entries.get(key)
+
+        # Reuse the cached prediction if the window looks the same
+        if entry is not None and entry.age < self.max_age:
+            change = np.mean(np.abs(thumbnail - entry.thumbnail))
+            if change < self.change_threshold:
+                entry.age += 1
+                self.hits += 1
+                return entry.predictions
+
+        # Otherwise classify it and remember the result
+        predictions = classify(window_img)
+        self._entries[key] = _Entry(thumbnail, predictions)
+        self.misses += 1
+        return predictions
+
+    def hit_rate(self):
+        """
+        Returns the fraction of lookups that skipped inference
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def clear(self):
+        """
+        Forget all cached predictions (e.g. after the camera moved)
+        """
+        self._entries.clear()